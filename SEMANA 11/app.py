@@ -1,43 +1,98 @@
 import sqlite3
-from flask import Flask, render_template, request, redirect, url_for, flash, session, g, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, session, g, jsonify, Response, stream_with_context
 from functools import wraps
-from datetime import datetime
-import hashlib 
+from datetime import datetime, date, timedelta, timezone
+import codecs
+import click
 # IMPORTANTE: Asegúrate de que 'database.connection' y sus funciones (get_db, init_db) sean accesibles
-from database.connection import get_db, init_db 
+from database.connection import get_db, init_db, init_app as init_db_app, get_pool
+from database.ventas_writer import get_escritor, VentaRechazada
+from database.busqueda import buscar_productos, condicion_busqueda, reconstruir_indice
+from database.cache import CacheLRU, normalizar_consulta
+from database.version_catalogo import leer_version_catalogo
+from database.paginacion import pagina_keyset
+from database.reportes import reporte_rango, reconstruir_resumenes
+from database.importacion import importar_csv, exportar_csv, COLUMNAS_CSV
+from database.bajo_stock import productos_bajo_stock, contar_bajo_stock
+from database.referencias import CacheReferencias, leer_version_referencias, leer_version_tabla
+from database.catalogo_pos import snapshot_catalogo, delta_catalogo, como_json
+from models.inventario import Inventario
+import metricas
+from database import consultas_lentas
+from contrasenas import calcular_hash, verificar_password, get_pool_hash, PoolOcupado
+from cache_http import etag_de, no_modificada, con_etag
+import estaticos
+import compresion
 
 # --- Configuración de Flask ---
 app = Flask(__name__)
 # Usar una clave secreta segura es crucial en producción
 app.config['SECRET_KEY'] = 'una_clave_secreta_muy_larga_y_segura_aqui_va_otra' 
+# Una conexión del pool por petición; se devuelve al pool en el teardown
+init_db_app(app)
+# Latencia, errores y SQL por ruta (expuestos en /metrics); se registra antes que el resto de hooks
+metricas.init_app(app)
+# gzip/brotli según Accept-Encoding; registrada aquí para correr después de los demás after_request
+compresion.init_app(app)
+# Sentencias por encima de DB_SLOW_QUERY_MS van a logs/consultas_lentas.<pid>.log con su EXPLAIN QUERY PLAN
+consultas_lentas.init_app(app)
+# url_for('static') con huella (static/dist, generado por `python -m estaticos`) y caché inmutable
+estaticos.init_app(app)
+
+# Caché (por worker) de resultados del autocompletado del POS
+cache_busqueda = CacheLRU(max_items=1024, ttl=300)
+# Snapshot serializado del catálogo para la búsqueda local del POS (uno por versión, compartido por las cajas)
+cache_snapshot_pos = CacheLRU(max_items=6, ttl=300)
+# Totales de los listados paginados (por versión del catálogo / de proveedores)
+cache_conteos = CacheLRU(max_items=256, ttl=300)
+cache_conteo_proveedores = CacheLRU(max_items=1, ttl=60)
+# Categorías, proveedores y empleados de los desplegables (recargados al cambiar referencias_version)
+referencias = CacheReferencias()
+# Catálogo en memoria compartido por las peticiones del worker (carga perezosa, write-through)
+inventario = Inventario()
 
 # --------------------------------------------------------------------------
 # --- FUNCIONES DE SEGURIDAD Y PERMISOS ---
 # --------------------------------------------------------------------------
 
-def hash_password_sha256(password, length=24):
-    """Encripta la contraseña usando SHA256 y recorta el resultado a 24 caracteres."""
-    hashed = hashlib.sha256(password.encode('utf-8')).hexdigest()
-    return hashed[:length]
+# Principal de la sesión (id, email, nombre, role) cacheado por worker.
+# Con el TTL corto, una baja o cambio de rol hecho en otro worker se aplica en <= 60 s.
+cache_usuarios = CacheLRU(max_items=256, ttl=60)
+
+def invalidar_usuario(email):
+    """Descarta el principal cacheado (llamar tras eliminar un usuario o cambiar su rol)."""
+    cache_usuarios.descartar(email)
 
 @app.before_request
 def load_logged_in_user():
     """Carga el objeto del usuario en la variable global 'g' si hay una sesión activa."""
+    if request.endpoint == 'static':
+        # Los estáticos no dependen del usuario; sin leer la sesión tampoco llevan Vary: Cookie
+        g.user = None
+        return
     user_email = session.get('email')
 
     if user_email is None:
         g.user = None
-    else:
+        return
+
+    # La mayoría de las peticiones se resuelven desde la caché, sin tocar la base de datos
+    user_data = cache_usuarios.get(user_email, 0)
+    if user_data is None:
         db = get_db()
         # Nota: Asumo que la tabla se llama 'usuario'
-        user_data = db.execute("SELECT id_usuario, email, nombre, role FROM usuario WHERE email = ?", (user_email,)).fetchone()
+        row = db.execute("SELECT id_usuario, email, nombre, role FROM usuario WHERE email = ?", (user_email,)).fetchone()
         db.close()
-        
-        if user_data:
-            g.user = dict(user_data) 
-        else:
-            g.user = None
-            session.pop('email', None)
+        if row:
+            user_data = dict(row)
+            cache_usuarios.set(user_email, user_data, 0)
+    
+    if user_data:
+        # Copia: las rutas no deben modificar la entrada compartida de la caché
+        g.user = dict(user_data)
+    else:
+        g.user = None
+        session.pop('email', None)
 
 def role_required(allowed_roles):
     """Restringe el acceso a una lista de roles."""
@@ -81,12 +136,27 @@ def login():
         password = request.form['password']
         
         db = get_db()
-        user = db.execute("SELECT email, password_hash FROM usuario WHERE email = ?", (email,)).fetchone()
+        user = db.execute("SELECT id_usuario, email, password_hash FROM usuario WHERE email = ?", (email,)).fetchone()
         db.close()
         
-        password_attempt_hash = hash_password_sha256(password) 
+        # El hash se verifica en el pool acotado; sin usuario se verifica un señuelo (mismo tiempo)
+        try:
+            correcta, nuevo_hash = verificar_password(password, user['password_hash'] if user else None)
+        except PoolOcupado:
+            flash('Hay muchos inicios de sesión en este momento. Intenta de nuevo en unos segundos.', 'warning')
+            return render_template('login.html'), 503
         
-        if user and user['password_hash'] == password_attempt_hash: 
+        if user and correcta: 
+            if nuevo_hash:
+                # Hash antiguo o con otro costo: se guarda recalculado (si nadie lo cambió mientras tanto)
+                try:
+                    db = get_db()
+                    db.execute("UPDATE usuario SET password_hash = ? WHERE id_usuario = ? AND password_hash = ?",
+                               (nuevo_hash, user['id_usuario'], user['password_hash']))
+                    db.commit()
+                    db.close()
+                except sqlite3.Error as e:
+                    app.logger.warning("No se pudo actualizar el hash de %s: %s", email, e)
             session['email'] = user['email']
             flash(f'¡Bienvenido, {email.split("@")[0].capitalize()}!', 'success')
             
@@ -99,7 +169,9 @@ def login():
 
 @app.route('/logout')
 def logout():
-    session.pop('email', None) 
+    email = session.pop('email', None) 
+    if email:
+        invalidar_usuario(email)
     flash('Has cerrado sesión correctamente.', 'info')
     return redirect(url_for('login'))
 
@@ -107,7 +179,46 @@ def logout():
 @app.route('/dashboard')
 @login_required 
 def dashboard():
-    return render_template('dashboard.html')
+    alertas = []
+    total_alertas = 0
+    proveedores = []
+    categorias = []
+    try:
+        db = get_db()
+        # Sólo recorre el índice parcial de productos bajo mínimo, no el catálogo
+        alertas = productos_bajo_stock(db, limite=10)
+        total_alertas = contar_bajo_stock(db)
+        proveedores = referencias.obtener(db, 'proveedores')
+        categorias = referencias.obtener(db, 'categorias')
+        db.close()
+    except sqlite3.Error as e:
+        flash(f'Error al cargar las alertas de stock: {e}', 'danger')
+
+    return render_template('dashboard.html',
+                           alertas=alertas,
+                           total_alertas=total_alertas,
+                           proveedores=proveedores,
+                           categorias=categorias)
+
+@app.route('/api/bajo_stock')
+@login_required
+def bajo_stock_api():
+    """Productos bajo stock mínimo ordenados por déficit; filtros opcionales ?proveedor=, ?categoria=, ?limite=."""
+    id_proveedor = request.args.get('proveedor', type=int)
+    id_categoria = request.args.get('categoria', type=int)
+    limite = request.args.get('limite', 50, type=int)
+    limite = max(1, min(limite, 500))
+
+    try:
+        db = get_db()
+        productos = productos_bajo_stock(db, id_proveedor, id_categoria, limite)
+        total = contar_bajo_stock(db, id_proveedor, id_categoria)
+        db.close()
+    except sqlite3.Error:
+        app.logger.exception("Error de base de datos en bajo stock")
+        return jsonify({'productos': [], 'total': 0}), 500
+
+    return jsonify({'productos': [dict(p) for p in productos], 'total': total})
 
 # --------------------------------------------------------------------------
 # --- MÓDULO: REALIZAR VENTA (PUNTO DE VENTA) ---
@@ -119,162 +230,288 @@ def punto_de_venta():
     """Ruta principal para la interfaz de Punto de Venta (POS)."""
     return render_template('ventas/punto_de_venta.html') 
 
+def respuesta_busqueda(db, query):
+    """JSON (o 304) de una búsqueda del POS. Compartida con el modo ASGI (asgi.py)."""
+    # La versión del catálogo cambia con cualquier alta, edición, baja o venta (en cualquier worker)
+    version = leer_version_catalogo(db)
+    clave = normalizar_consulta(query)
+
+    # El POS repite búsquedas: si ya tiene el resultado de esta versión, 304 sin buscar
+    etag = etag_de('buscar', version, clave)
+    respuesta = no_modificada(etag)
+    if respuesta is not None:
+        return respuesta
+
+    resultados = cache_busqueda.get(clave, version)
+    if resultados is None:
+        productos = buscar_productos(db, query, limite=10)
+        resultados = [
+            {
+                'id': p['id_producto'],
+                'codigo': p['codigo_producto'],
+                'nombre': p['nombre_producto'],
+                'precio': p['precio_venta'],
+                'stock': p['stock_actual']
+            } 
+            for p in productos
+        ]
+        cache_busqueda.set(clave, resultados, version)
+    return con_etag(jsonify(resultados), etag)
+
 @app.route('/api/buscar_productos', methods=['GET'])
 @role_required(['Administrador', 'Vendedor']) 
 def buscar_productos_api():
-    """API que busca productos por código o nombre y devuelve los resultados en JSON."""
+    """API que busca productos (índice FTS5) y devuelve los resultados en JSON, ordenados por relevancia."""
     query = request.args.get('q', '').strip()
     
     if not query:
         return jsonify([])
 
-    search_term = '%' + query + '%'
-    
     try:
         db = get_db()
-        productos = db.execute(
-            """
-            SELECT 
-                id_producto, codigo_producto, nombre_producto, precio_venta, stock_actual
-            FROM productos 
-            WHERE codigo_producto LIKE ? OR nombre_producto LIKE ? 
-            LIMIT 10
-            """,
-            (search_term, search_term)
-        ).fetchall()
-        
+        respuesta = respuesta_busqueda(db, query)
         db.close()
+        return respuesta
         
-        resultados = [
-            {
-                'id': p['id_producto'],
-                'codigo': p['codigo_producto'],
-                'nombre': p['nombre_producto'],
-                'precio': p['precio_venta'],
-                'stock': p['stock_actual']
-            } 
-            for p in productos
-        ]
-        
-        return jsonify(resultados)
-        
-    except sqlite3.Error as e:
-        print(f"Error de base de datos en búsqueda: {e}")
+    except sqlite3.Error:
+        app.logger.exception("Error de base de datos en búsqueda")
         return jsonify([]), 500
 
-@app.route('/api/finalizar_venta', methods=['POST'])
-@role_required(['Administrador', 'Vendedor']) 
-def finalizar_venta():
-    """Recibe los datos del carrito, registra la venta, el detalle y actualiza el stock."""
-    db = None
+@app.route('/api/catalogo/snapshot')
+@role_required(['Administrador', 'Vendedor'])
+def catalogo_snapshot_api():
+    """Catálogo completo (id, código, nombre, precio, stock) con su versión, para la búsqueda local del POS."""
     try:
-        data = request.get_json()
-        carrito = data.get('carrito')
-        total_venta_str = data.get('total') 
-        cedula_cliente = data.get('cedula_cliente', '9999999999') 
-        
-        if not carrito or not total_venta_str:
-            return jsonify({'success': False, 'message': 'Datos de venta incompletos.'}), 400
+        db = get_db()
+        version = leer_version_catalogo(db)
+        # Cuerpos distintos por codificación: cada uno con su propio ETag fuerte
+        codificacion = compresion.elegir_codificacion(request.accept_encodings)
+        etag = etag_de('snapshot', version, codificacion)
+        respuesta = no_modificada(etag)
+        if respuesta is not None:
+            db.close()
+            return respuesta
+
+        cuerpo = cache_snapshot_pos.get('snapshot', version)
+        if cuerpo is None:
+            cuerpo = como_json(snapshot_catalogo(db, version))
+            cache_snapshot_pos.set('snapshot', cuerpo, version)
+        db.close()
 
-        # CRÍTICO: Conversión de string a float (Soluciona el error de formato)
+        # ~1 MB de JSON: se comprime una vez por versión y codificación, no en cada descarga
+        respuesta = Response(cuerpo, mimetype='application/json')
+        if codificacion is not None:
+            comprimido = cache_snapshot_pos.get(('snapshot', codificacion), version)
+            if comprimido is None:
+                comprimido = compresion.comprimir(cuerpo, codificacion)
+                cache_snapshot_pos.set(('snapshot', codificacion), comprimido, version)
+            respuesta.set_data(comprimido)
+            respuesta.headers['Content-Encoding'] = codificacion
+        respuesta.vary.add('Accept-Encoding')
+        return con_etag(respuesta, etag)
+
+    except sqlite3.Error:
+        app.logger.exception("Error de base de datos en snapshot del catálogo")
+        return jsonify({'error': 'Error de base de datos.'}), 500
+
+@app.route('/api/catalogo/delta')
+@role_required(['Administrador', 'Vendedor'])
+def catalogo_delta_api():
+    """Productos cambiados y eliminados después de ?since=<versión> (la del snapshot o del último delta)."""
+    desde = request.args.get('since', type=int)
+    if desde is None or desde < 0:
+        return jsonify({'error': 'Parámetro since inválido.'}), 400
+
+    try:
+        db = get_db()
+        version = leer_version_catalogo(db)
+        etag = etag_de('delta', version, desde)
+        respuesta = no_modificada(etag)
+        if respuesta is not None:
+            db.close()
+            return respuesta
+
+        delta = delta_catalogo(db, desde, version)
+        db.close()
+    except sqlite3.Error:
+        app.logger.exception("Error de base de datos en delta del catálogo")
+        return jsonify({'error': 'Error de base de datos.'}), 500
+
+    if delta is None:
+        # La base es anterior a la versión del cliente (restaurada o recreada): debe descargar el snapshot
+        return jsonify({'error': 'Versión del catálogo desconocida.', 'version': version}), 410
+    return con_etag(jsonify(delta), etag)
+
+def fecha_offline(valor):
+    """Fecha ISO 8601 del POS -> 'YYYY-MM-DD HH:MM:SS' en UTC, como CURRENT_TIMESTAMP.
+
+    Una fecha futura (reloj del navegador adelantado) se reemplaza por la
+    actual. Lanza ValueError si no es una fecha válida.
+    """
+    if not isinstance(valor, str):
+        raise ValueError(valor)
+    # fromisoformat no acepta el sufijo 'Z' de toISOString() antes de Python 3.11
+    fecha = datetime.fromisoformat(valor[:-1] + '+00:00' if valor.endswith('Z') else valor)
+    if fecha.tzinfo is not None:
+        fecha = fecha.astimezone(timezone.utc).replace(tzinfo=None)
+    return min(fecha, datetime.now(timezone.utc).replace(tzinfo=None)).strftime('%Y-%m-%d %H:%M:%S')
+
+def venta_del_carrito(data):
+    """Arma la venta a partir del JSON del POS. Devuelve (venta, None) o (None, respuesta 400)."""
+    carrito = data.get('carrito')
+    cedula_cliente = data.get('cedula_cliente') or '9999999999'
+    # Ventas encoladas sin conexión: el reintento con la misma clave no registra otra venta
+    clave_offline = data.get('clave_offline')
+    
+    if not carrito:
+        return None, (jsonify({'success': False, 'message': 'Datos de venta incompletos.'}), 400)
+    if clave_offline is not None and (not isinstance(clave_offline, str) or not 0 < len(clave_offline) <= 64):
+        return None, (jsonify({'success': False, 'message': 'Clave de venta offline inválida.'}), 400)
+
+    # Una venta cobrada sin conexión se registra con la fecha en que se cobró, no la del reenvío
+    fecha_venta = None
+    if clave_offline is not None and data.get('fecha') is not None:
         try:
-            total_venta = float(total_venta_str)
+            fecha_venta = fecha_offline(data['fecha'])
         except ValueError:
-            return jsonify({'success': False, 'message': 'El total de la venta no es un número válido.'}), 400
+            return None, (jsonify({'success': False, 'message': 'Fecha de venta offline inválida.'}), 400)
 
-        db = get_db()
-        
-        # 1. Registrar la Venta Maestra (Tabla 'ventas')
-        id_empleado = g.user['id_usuario']
-        id_local = 1 # Asumo un valor por defecto o base
-        estado_venta = 'completada'
-
-        result = db.execute(
-            """
-            INSERT INTO ventas (
-                cedula_cliente, id_empleado, id_local, fecha_venta, total, estado,
-                periodo_pago, metodo_pago
-            )
-            VALUES (?, ?, ?, CURRENT_TIMESTAMP, ?, ?, 'Contado', 'Efectivo')
-            """,
-            (cedula_cliente, id_empleado, id_local, total_venta, estado_venta)
-        )
-        id_venta = result.lastrowid
-        
-        # 2. Registrar el Detalle de Venta y Actualizar Stock
-        for item in carrito:
-            id_producto = item['id']
-            cantidad = item['cantidad']
-            precio_unitario = item['precio']
-            subtotal_item = item['subtotal']
-            
-            try:
-                cantidad = int(cantidad)
-                precio_unitario = float(precio_unitario)
-                subtotal_item = float(subtotal_item)
-            except ValueError:
-                raise Exception("Error en el formato numérico de los ítems del carrito.")
-            
-            db.execute(
-                """
-                INSERT INTO detalle_venta (id_venta, id_producto, cantidad, precio_unitario, subtotal)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (id_venta, id_producto, cantidad, precio_unitario, subtotal_item)
-            )
-            
-            # CRÍTICO: Descontar stock
-            db.execute(
-                """
-                UPDATE productos SET stock_actual = stock_actual - ? WHERE id_producto = ?
-                """,
-                (cantidad, id_producto)
-            )
+    # Sólo se aceptan id y cantidad: precio y subtotal se calculan en el servidor
+    items = []
+    for item in carrito:
+        try:
+            items.append({'id': int(item['id']), 'cantidad': int(item['cantidad'])})
+        except (KeyError, TypeError, ValueError):
+            return None, (jsonify({'success': False, 'message': 'Error en el formato numérico de los ítems del carrito.'}), 400)
+
+    venta = {
+        'cedula_cliente': cedula_cliente,
+        'id_empleado': g.user['id_usuario'],
+        'id_local': 1, # Asumo un valor por defecto o base
+        'estado': 'completada',
+        'items': items,
+        'clave_offline': clave_offline,
+        'fecha_venta': fecha_venta,
+    }
+    return venta, None
+
+def venta_confirmada(venta, resultado):
+    """Actualiza las cachés del worker tras registrar la venta y arma la respuesta del POS."""
+    id_venta = resultado['id_venta']
+    if resultado.get('repetida'):
+        # Reintento de una venta offline ya registrada: no hay stock que descontar de nuevo
+        return jsonify({'success': True, 'id_venta': id_venta, 'total': resultado['total'], 'repetida': True})
+
+    # El inventario en memoria no se toca: el UPDATE de stock registró los productos en
+    # catalogo_cambios y la próxima sincronizar() vuelve a leer justo esas filas
+    cache_busqueda.invalidar()
+    
+    flash(f'Nota de Venta #{id_venta} registrada exitosamente. Total: ${resultado["total"]:.2f}', 'success')
+    return jsonify({'success': True, 'id_venta': id_venta, 'total': resultado['total']})
 
-        db.commit()
-        
-        # CRÍTICO: Usamos el total_venta (float) en el mensaje flash
-        flash(f'Nota de Venta #{id_venta} registrada exitosamente. Total: ${total_venta:.2f}', 'success')
-        return jsonify({'success': True, 'id_venta': id_venta})
+@app.route('/api/finalizar_venta', methods=['POST'])
+@role_required(['Administrador', 'Vendedor']) 
+def finalizar_venta():
+    """Recibe el carrito y lo registra como una sola operación de conjunto (precios del servidor)."""
+    try:
+        venta, error = venta_del_carrito(request.get_json())
+        if error is not None:
+            return error
+
+        # La venta, su detalle y el descuento de stock se escriben en el lote del escritor
+        try:
+            resultado = get_escritor().enviar(venta)
+        except VentaRechazada as e:
+            return jsonify({'success': False, 'message': str(e), 'lineas_fallidas': e.lineas}), 409
+        return venta_confirmada(venta, resultado)
 
     except sqlite3.Error as e:
-        if db: db.rollback() 
-        print(f"Error de base de datos en finalizar_venta: {e}")
+        app.logger.exception("Error de base de datos en finalizar_venta")
         return jsonify({'success': False, 'message': f'Error de base de datos: {e}'}), 500
     except Exception as e:
-        if db: db.rollback()
-        print(f"Error desconocido al finalizar la venta: {e}")
+        app.logger.exception("Error desconocido al finalizar la venta")
         return jsonify({'success': False, 'message': f'Error desconocido: {e}'}), 500
-    finally:
-        if db: db.close()
 
 # --------------------------------------------------------------------------
 # --- MÓDULO: VER HISTORIAL DE VENTAS ---
 # --------------------------------------------------------------------------
 
+def _filtros_historial(args):
+    """Traduce los filtros del historial (desde, hasta, empleado, cliente) a SQL."""
+    condiciones, params = [], []
+    desde = args.get('desde', '').strip()
+    hasta = args.get('hasta', '').strip()
+    empleado = args.get('empleado', '').strip()
+    cliente = args.get('cliente', '').strip()
+
+    # Rangos sobre la columna (sin funciones) para que usen idx_ventas_fecha
+    if desde:
+        condiciones.append("v.fecha_venta >= ?")
+        params.append(desde)
+    if hasta:
+        condiciones.append("v.fecha_venta < date(?, '+1 day')")
+        params.append(hasta)
+    if empleado.isdigit():
+        condiciones.append("v.id_empleado = ?")
+        params.append(int(empleado))
+    if cliente:
+        condiciones.append("v.cedula_cliente = ?")
+        params.append(cliente)
+
+    filtros = {'desde': desde, 'hasta': hasta, 'empleado': empleado, 'cliente': cliente}
+    return ' AND '.join(condiciones), params, filtros
+
+def _consultar_historial(db, args, per_page=25):
+    """Una página del historial por clave (fecha_venta, id_venta), de la más reciente a la más antigua."""
+    where_sql, params, filtros = _filtros_historial(args)
+    ventas, cursor_siguiente, cursor_anterior = pagina_keyset(
+        db,
+        """
+        SELECT 
+            v.id_venta, v.fecha_venta, v.total, v.estado, 
+            COALESCE(c.nombres || ' ' || c.apellidos, 'Público General') AS nombre_cliente,
+            u.nombre AS nombre_empleado
+        FROM ventas v
+        LEFT JOIN clientes c ON v.cedula_cliente = c.cedula
+        JOIN usuario u ON v.id_empleado = u.id_usuario
+        """,
+        where_sql, params,
+        orden=('v.fecha_venta', 'v.id_venta'), por_pagina=per_page,
+        despues=args.get('despues'), antes=args.get('antes'), descendente=True)
+    return ventas, cursor_siguiente, cursor_anterior, filtros
+
 @app.route('/historial_ventas')
 @role_required(['Administrador', 'Vendedor']) 
 def ver_historial_ventas():
     ventas = []
+    cursor_siguiente = cursor_anterior = None
+    filtros = {}
+    empleados = []
     try:
         db = get_db()
-        ventas = db.execute(
-            """
-            SELECT 
-                v.id_venta, v.fecha_venta, v.total, v.estado, 
-                COALESCE(c.nombres || ' ' || c.apellidos, 'Público General') AS nombre_cliente,
-                u.nombre AS nombre_empleado
-            FROM ventas v
-            LEFT JOIN clientes c ON v.cedula_cliente = c.cedula
-            JOIN usuario u ON v.id_empleado = u.id_usuario
-            ORDER BY v.fecha_venta DESC
-            """
-        ).fetchall()
+        ventas, cursor_siguiente, cursor_anterior, filtros = _consultar_historial(db, request.args)
+        empleados = referencias.obtener(db, 'empleados')
         db.close()
     except sqlite3.Error as e:
         flash(f'Error al cargar el historial de ventas: {e}', 'danger')
 
-    return render_template('ventas/historial.html', ventas=ventas, user_role=g.user.get('role'))
+    return render_template('ventas/historial.html', ventas=ventas, user_role=g.user.get('role'),
+                           filtros=filtros, empleados=empleados,
+                           cursor_siguiente=cursor_siguiente, cursor_anterior=cursor_anterior)
+
+@app.route('/api/historial_ventas')
+@role_required(['Administrador', 'Vendedor']) 
+def historial_ventas_api():
+    """Variante JSON del historial para carga incremental (mismos filtros y cursor 'despues')."""
+    try:
+        db = get_db()
+        ventas, cursor_siguiente, _, _ = _consultar_historial(db, request.args)
+        db.close()
+    except sqlite3.Error:
+        app.logger.exception("Error de base de datos en historial")
+        return jsonify({'ventas': [], 'siguiente': None}), 500
+
+    return jsonify({'ventas': [dict(v) for v in ventas], 'siguiente': cursor_siguiente})
 
 @app.route('/ventas/detalle/<int:id_venta>')
 @role_required(['Administrador', 'Vendedor']) 
@@ -314,53 +551,53 @@ def listar_productos():
         from_table = "productos p"
     
     query = request.args.get('q', '').strip() 
-    try:
-        page = int(request.args.get('page', 1))
-    except ValueError:
-        page = 1
+    despues = request.args.get('despues')
+    antes = request.args.get('antes')
     per_page = 10
-    offset = (page - 1) * per_page
     
     productos = []
     total_productos = 0
     
     try:
         db = get_db()
-        params = []
-        if query:
-            search_pattern = f'%{query}%'
-            sql_productos = f"""
-                SELECT {select_cols} FROM {from_table}
-                WHERE p.nombre_producto LIKE ? OR p.codigo_producto LIKE ? 
-                LIMIT ? OFFSET ?
-            """
-            params = (search_pattern, search_pattern, per_page, offset)
-            
-            sql_count = "SELECT COUNT(*) FROM productos WHERE nombre_producto LIKE ? OR codigo_producto LIKE ?"
-            total_productos = db.execute(sql_count, (search_pattern, search_pattern)).fetchone()[0]
-        else:
-            sql_productos = f"SELECT {select_cols} FROM {from_table} LIMIT ? OFFSET ?"
-            params = (per_page, offset)
-            
-            sql_count = "SELECT COUNT(*) FROM productos"
-            total_productos = db.execute(sql_count).fetchone()[0]
-            
-        productos = db.execute(sql_productos, params).fetchall()
-        db.close()
+        version = leer_version_catalogo(db)
+        # La página depende del catálogo, de los parámetros y de quién la ve (columnas por rol, navbar);
+        # la vista de administrador muestra además nombres de proveedor y categoría
+        version_referencias = leer_version_referencias(db) if user_role == 'Administrador' else None
+        etag = etag_de('productos', version, sorted(request.args.items(multi=True)), version_referencias,
+                       g.user['id_usuario'], g.user.get('nombre'), user_role)
+        respuesta = no_modificada(etag)
+        if respuesta is not None:
+            db.close()
+            return respuesta
+
+        filtro_sql, filtro_params = condicion_busqueda(query) if query else ('', [])
         
-        total_pages = (total_productos + per_page - 1) // per_page 
-
-        return render_template('productos/lista.html', 
-                               productos=productos,
-                               query=query,
-                               page=page,
-                               total_pages=total_pages,
-                               total_productos=total_productos,
-                               user_role=user_role)
+        # Paginación por clave (nombre_producto, id_producto): cada página cuesta lo mismo
+        productos, cursor_siguiente, cursor_anterior = pagina_keyset(
+            db, f"SELECT {select_cols} FROM {from_table}", filtro_sql, filtro_params,
+            orden=('p.nombre_producto', 'p.id_producto'), por_pagina=per_page,
+            despues=despues, antes=antes)
+
+        # El total se cuenta una vez por versión del catálogo y filtro, no en cada página
+        total_productos = cache_conteos.get(('productos', query.lower()), version)
+        if total_productos is None:
+            sql_count = f"SELECT COUNT(*) FROM productos p {'WHERE ' + filtro_sql if filtro_sql else ''}"
+            total_productos = db.execute(sql_count, filtro_params).fetchone()[0]
+            cache_conteos.set(('productos', query.lower()), total_productos, version)
+        db.close()
+
+        return con_etag(render_template('productos/lista.html', 
+                                        productos=productos,
+                                        query=query,
+                                        cursor_siguiente=cursor_siguiente,
+                                        cursor_anterior=cursor_anterior,
+                                        total_productos=total_productos,
+                                        user_role=user_role), etag)
                                
     except sqlite3.Error as e:
         flash(f'Error al cargar productos: {e}', 'danger')
-        print(f"DEBUG SQLITE ERROR: {e}") 
+        app.logger.exception("Error de base de datos en la lista de productos")
         return redirect(url_for('dashboard'))
 
 
@@ -373,8 +610,8 @@ def agregar_producto():
     
     try:
         db = get_db()
-        categorias = db.execute("SELECT id_categoria, nombre_categoria FROM categorias").fetchall()
-        proveedores = db.execute("SELECT id_proveedor, nombre_empresa FROM proveedores").fetchall()
+        categorias = referencias.obtener(db, 'categorias')
+        proveedores = referencias.obtener(db, 'proveedores')
     except sqlite3.Error as e:
         flash(f'Error al cargar datos auxiliares (Categorías/Proveedores): {e}', 'danger')
         return redirect(url_for('listar_productos'))
@@ -417,12 +654,8 @@ def agregar_producto():
 
         # 3. VERIFICACIÓN EXPLÍCITA DE CÓDIGO ÚNICO
         try:
-            db = get_db()
-            
-            producto_existente = db.execute(
-                "SELECT id_producto FROM productos WHERE codigo_producto = ?", 
-                (codigo,)
-            ).fetchone()
+            # Índice en memoria por código (sin consulta a la base de datos)
+            producto_existente = inventario.obtener_por_codigo(codigo)
 
             if producto_existente:
                 flash(f'Error: El código de producto "{codigo}" ya existe.', 'danger')
@@ -431,20 +664,16 @@ def agregar_producto():
                                        proveedores=proveedores,
                                        form_data=request.form) 
 
-            # 4. INSERCIÓN DEL PRODUCTO
-            db.execute(
-                """
-                INSERT INTO productos (
-                    codigo_producto, nombre_producto, descripcion, material, tipo_rosca, medida,
-                    unidad_medida, precio_compra, precio_venta, stock_actual, stock_minimo, 
-                    id_proveedor, id_categoria)  
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (codigo, nombre, descripcion, material, tipo_rosca, medida,
-                 unidad_medida, precio_compra, precio_venta, stock_actual, stock_minimo, 
-                 id_proveedor, id_categoria)
-            )
-            db.commit()
+            # 4. INSERCIÓN DEL PRODUCTO (write-through: base de datos + inventario en memoria)
+            inventario.añadir_producto({
+                'codigo_producto': codigo, 'nombre_producto': nombre, 'descripcion': descripcion,
+                'material': material, 'tipo_rosca': tipo_rosca, 'medida': medida,
+                'unidad_medida': unidad_medida, 'precio_compra': precio_compra,
+                'precio_venta': precio_venta, 'stock_actual': stock_actual,
+                'stock_minimo': stock_minimo, 'id_proveedor': id_proveedor,
+                'id_categoria': id_categoria,
+            })
+            cache_busqueda.invalidar()
             flash(f'Producto {nombre} agregado exitosamente.', 'success')
             return redirect(url_for('listar_productos'))
         
@@ -454,8 +683,6 @@ def agregar_producto():
                                    categorias=categorias, 
                                    proveedores=proveedores,
                                    form_data=request.form)
-        finally:
-             if db: db.close()
         
     # --- RENDERIZACIÓN (Método GET) ---
     return render_template('productos/agregar.html', categorias=categorias, proveedores=proveedores)
@@ -472,19 +699,11 @@ def editar_producto(id_producto):
     # Intenta obtener la conexión y los datos iniciales
     try:
         db = get_db()
-        categorias = db.execute("SELECT id_categoria, nombre_categoria FROM categorias").fetchall()
-        proveedores = db.execute("SELECT id_proveedor, nombre_empresa FROM proveedores").fetchall()
-
-        producto = db.execute(
-            """
-            SELECT id_producto, codigo_producto, nombre_producto, descripcion, precio_compra,
-                   precio_venta, stock_actual, stock_minimo, id_categoria, id_proveedor, 
-                   unidad_medida, material, medida, tipo_rosca
-            FROM productos 
-            WHERE id_producto = ?
-            """,
-            (id_producto,)
-        ).fetchone()
+        categorias = referencias.obtener(db, 'categorias')
+        proveedores = referencias.obtener(db, 'proveedores')
+
+        # Lectura desde el inventario en memoria (sincronizado por versión del catálogo)
+        producto = inventario.obtener_producto(id_producto)
 
         if producto is None:
             flash(f'Producto con ID {id_producto} no encontrado.', 'danger')
@@ -531,38 +750,27 @@ def editar_producto(id_producto):
                                    form_data=request.form)
 
         try:
-            db = get_db()
             # 3. VERIFICAR UNICIDAD DEL CÓDIGO
-            producto_existente = db.execute(
-                "SELECT id_producto FROM productos WHERE codigo_producto = ? AND id_producto != ?",
-                (codigo, id_producto)
-            ).fetchone()
+            producto_existente = inventario.obtener_por_codigo(codigo)
 
-            if producto_existente:
+            if producto_existente and producto_existente.id_producto != id_producto:
                 flash(f'Error: El código de producto "{codigo}" ya existe en otro producto.', 'danger')
             else:
-                # 4. Actualizar la base de datos (TODOS LOS CAMPOS DE LA TABLA)
-                db.execute(
-                    """
-                    UPDATE productos 
-                    SET codigo_producto=?, nombre_producto=?, descripcion=?, material=?, 
-                        tipo_rosca=?, medida=?, unidad_medida=?, precio_compra=?, 
-                        precio_venta=?, stock_actual=?, stock_minimo=?, id_proveedor=?, 
-                        id_categoria=?
-                    WHERE id_producto=?
-                    """,
-                    (codigo, nombre, descripcion, material, tipo_rosca, medida, 
-                     unidad_medida, precio_compra, precio_venta, stock_actual, stock_minimo, 
-                     id_proveedor, id_categoria, id_producto)
-                )
-                db.commit()
+                # 4. Actualizar la base de datos (TODOS LOS CAMPOS DE LA TABLA) y el inventario en memoria
+                inventario.actualizar_producto(
+                    id_producto,
+                    codigo_producto=codigo, nombre_producto=nombre, descripcion=descripcion,
+                    material=material, tipo_rosca=tipo_rosca, medida=medida,
+                    unidad_medida=unidad_medida, precio_compra=precio_compra,
+                    precio_venta=precio_venta, stock_actual=stock_actual,
+                    stock_minimo=stock_minimo, id_proveedor=id_proveedor,
+                    id_categoria=id_categoria)
+                cache_busqueda.invalidar()
                 flash(f'Producto "{nombre}" actualizado exitosamente.', 'success')
                 return redirect(url_for('listar_productos'))
             
         except sqlite3.Error as e:
             flash(f'Error al guardar el producto: {e}', 'danger')
-        finally:
-            if db: db.close()
             
     # --- RENDERIZACIÓN (GET o POST fallido) ---
     return render_template('productos/editar.html', 
@@ -576,10 +784,8 @@ def editar_producto(id_producto):
 @admin_required 
 def eliminar_producto(id_producto):
     try:
-        db = get_db()
-        db.execute("DELETE FROM productos WHERE id_producto = ?", (id_producto,))
-        db.commit()
-        db.close()
+        inventario.eliminar_producto(id_producto)
+        cache_busqueda.invalidar()
         flash('Producto eliminado correctamente.', 'info')
     except sqlite3.IntegrityError:
         flash('Error: No se puede eliminar el producto porque tiene ventas o registros asociados.', 'danger')
@@ -588,6 +794,48 @@ def eliminar_producto(id_producto):
         
     return redirect(url_for('listar_productos'))
 
+@app.route('/productos/importar', methods=['GET', 'POST'])
+@admin_required
+def importar_productos():
+    """Importación masiva por CSV: se lee en streaming y se hace upsert por codigo_producto."""
+    resultado = None
+    if request.method == 'POST':
+        archivo = request.files.get('archivo')
+        if not archivo or not archivo.filename:
+            flash('Seleccione un archivo CSV.', 'warning')
+            return render_template('productos/importar.html', columnas=COLUMNAS_CSV)
+
+        # utf-8-sig: tolera el BOM que agrega Excel al guardar como CSV. Se decodifica línea a
+        # línea sobre el stream binario: TextIOWrapper no acepta el SpooledTemporaryFile de
+        # Werkzeug en Python < 3.11 (no tiene readable())
+        texto = codecs.iterdecode(archivo.stream, 'utf-8-sig')
+        try:
+            db = get_db()
+            resultado = importar_csv(db, texto)
+            db.close()
+        except (UnicodeDecodeError, sqlite3.Error) as e:
+            flash(f'Error al importar el archivo: {e}', 'danger')
+            return render_template('productos/importar.html', columnas=COLUMNAS_CSV)
+
+        cache_busqueda.invalidar()
+        categoria = 'success' if not resultado['con_error'] else 'warning'
+        flash(f"Importación terminada: {resultado['importadas']} productos importados, "
+              f"{resultado['con_error']} filas con error.", categoria)
+
+    return render_template('productos/importar.html', columnas=COLUMNAS_CSV, resultado=resultado)
+
+
+@app.route('/productos/exportar')
+@admin_required
+def exportar_productos():
+    """Descarga del catálogo completo en CSV, generado en streaming."""
+    db = get_db()
+    return Response(
+        stream_with_context(exportar_csv(db)),
+        mimetype='text/csv',
+        headers={'Content-Disposition': 'attachment; filename=productos.csv'}
+    )
+
 # --------------------------------------------------------------------------
 # --- MÓDULO: ADMINISTRAR USUARIOS Y PERMISOS (ADMIN ONLY) ---
 # --------------------------------------------------------------------------
@@ -626,13 +874,18 @@ def agregar_usuario():
                 flash('El email ya está registrado.', 'warning')
                 return render_template('usuarios/agregar.html')
 
-            password_hash = hash_password_sha256(password)
+            try:
+                password_hash = calcular_hash(password)
+            except PoolOcupado:
+                flash('El servidor está ocupado calculando contraseñas. Intenta de nuevo en unos segundos.', 'warning')
+                return render_template('usuarios/agregar.html')
             
             db.execute(
                 "INSERT INTO usuario (email, password_hash, nombre, role) VALUES (?, ?, ?, ?)",
                 (email, password_hash, nombre, role)
             )
             db.commit()
+            referencias.invalidar()
             flash(f'Usuario {nombre} ({role}) agregado exitosamente. Contraseña encriptada.', 'success')
             return redirect(url_for('listar_usuarios'))
             
@@ -656,9 +909,13 @@ def eliminar_usuario(id_usuario):
         
     try:
         db = get_db()
+        usuario = db.execute("SELECT email FROM usuario WHERE id_usuario = ?", (id_usuario,)).fetchone()
         db.execute("DELETE FROM usuario WHERE id_usuario = ?", (id_usuario,))
         db.commit()
         db.close()
+        referencias.invalidar()
+        if usuario:
+            invalidar_usuario(usuario['email'])
         flash('Usuario eliminado correctamente.', 'info')
             
     except sqlite3.Error as e:
@@ -673,8 +930,106 @@ def eliminar_usuario(id_usuario):
 @app.route('/reportes')
 @admin_required
 def generar_reportes():
-    flash("Módulo de Reportes. Implementar lógica de extracción de datos y gráficos aquí.", 'info')
-    return render_template('reportes/index.html')
+    """Ingresos, unidades y margen por rango de fechas, leídos de las tablas resumen."""
+    hoy = date.today()
+    desde = request.args.get('desde') or (hoy - timedelta(days=30)).isoformat()
+    hasta = request.args.get('hasta') or hoy.isoformat()
+
+    try:
+        datetime.strptime(desde, '%Y-%m-%d')
+        datetime.strptime(hasta, '%Y-%m-%d')
+    except ValueError:
+        flash('Las fechas deben tener el formato AAAA-MM-DD.', 'warning')
+        desde, hasta = (hoy - timedelta(days=30)).isoformat(), hoy.isoformat()
+
+    reporte = None
+    try:
+        db = get_db()
+        reporte = reporte_rango(db, desde, hasta)
+        db.close()
+    except sqlite3.Error as e:
+        flash(f'Error al generar el reporte: {e}', 'danger')
+
+    return render_template('reportes/index.html', reporte=reporte, desde=desde, hasta=hasta)
+
+# --------------------------------------------------------------------------
+# --- MÓDULO: MONITOREO (ADMIN ONLY) ---
+# --------------------------------------------------------------------------
+
+@app.route('/api/monitoreo/pool_db')
+@admin_required
+def estado_pool_db():
+    """Estadísticas del pool de conexiones SQLite de este worker."""
+    return jsonify(get_pool().snapshot())
+
+@app.route('/api/monitoreo/escritor_ventas')
+@admin_required
+def estado_escritor_ventas():
+    """Estadísticas del escritor de ventas (group commit) de este worker."""
+    return jsonify(get_escritor().snapshot())
+
+@app.route('/api/monitoreo/inventario')
+@admin_required
+def estado_inventario():
+    """Tamaño, versión y sincronizaciones del inventario en memoria de este worker."""
+    return jsonify(inventario.snapshot())
+
+@app.route('/api/monitoreo/pool_hash')
+@admin_required
+def estado_pool_hash():
+    """Hashes de contraseña en curso, ejecutados y rechazados por cola llena en este worker."""
+    return jsonify(get_pool_hash().snapshot())
+
+@app.route('/metrics')
+@admin_required
+def metricas_prometheus():
+    """Métricas de este worker en formato de texto de Prometheus."""
+    pool = get_pool().snapshot()
+    escritor = get_escritor().snapshot()
+    busqueda = cache_busqueda.snapshot()
+    hash_pool = get_pool_hash().snapshot()
+    compresion_stats = compresion.estadisticas.snapshot()
+    extras = [
+        ('db_pool_open', 'gauge', 'Conexiones abiertas en el pool.', pool['open']),
+        ('db_pool_in_use', 'gauge', 'Conexiones prestadas a peticiones.', pool['in_use']),
+        ('db_pool_waits_total', 'counter', 'Esperas por una conexión libre.', pool['waits']),
+        ('db_pool_timeouts_total', 'counter', 'Esperas que agotaron el timeout.', pool['timeouts']),
+        ('ventas_pendientes', 'gauge', 'Ventas en cola del escritor.', escritor['pendientes']),
+        ('cache_busqueda_items', 'gauge', 'Entradas en la caché de búsqueda.', busqueda['items']),
+        ('ventas_escritor_lotes_total', 'counter', 'Lotes confirmados por el escritor de ventas.', escritor['lotes']),
+        ('ventas_escritor_ventas_total', 'counter', 'Ventas confirmadas por el escritor.', escritor['ventas']),
+        ('ventas_escritor_fallidas_total', 'counter', 'Ventas rechazadas o fallidas.', escritor['fallidas']),
+        ('cache_busqueda_hits_total', 'counter', 'Aciertos de la caché de búsqueda.', busqueda['hits']),
+        ('cache_busqueda_misses_total', 'counter', 'Fallos de la caché de búsqueda.', busqueda['misses']),
+        ('password_hash_en_curso', 'gauge', 'Hashes de contraseña en curso o en cola.', hash_pool['en_curso']),
+        ('password_hash_rechazados_total', 'counter', 'Hashes rechazados por cola llena.', hash_pool['rechazados']),
+        ('compresion_bytes_originales_total', 'counter', 'Bytes de respuestas comprimidas antes de comprimir.',
+         compresion_stats['bytes_originales']),
+        ('compresion_bytes_enviados_total', 'counter', 'Bytes de respuestas comprimidas enviados.',
+         compresion_stats['bytes_enviados']),
+    ]
+    return Response(metricas.registro.exportar(extras), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/monitoreo/cache_busqueda')
+@admin_required
+def estado_cache_busqueda():
+    """Aciertos, fallos y desalojos de la caché de búsqueda del POS en este worker."""
+    return jsonify(cache_busqueda.snapshot())
+
+@app.route('/monitoreo/consultas_lentas')
+@admin_required
+def ver_consultas_lentas():
+    """Últimas consultas lentas (de todos los workers) con su plan de ejecución."""
+    limite = max(1, min(request.args.get('limite', 100, type=int), 1000))
+    solo_scan = request.args.get('solo_scan') == '1'
+    entradas = consultas_lentas.leer_registro(limite)
+    if solo_scan:
+        entradas = [e for e in entradas if e.get('scan_completo')]
+    return render_template('monitoreo/consultas_lentas.html',
+                           entradas=entradas,
+                           limite=limite,
+                           solo_scan=solo_scan,
+                           umbral_ms=consultas_lentas.UMBRAL_MS)
 
 # --------------------------------------------------------------------------
 # --- MÓDULO: PROVEEDORES (COMPLETO) ---
@@ -683,30 +1038,35 @@ def generar_reportes():
 @app.route('/proveedores')
 @role_required(['Administrador', 'Vendedor']) 
 def listar_proveedores():
-    """Muestra la lista de proveedores con paginación."""
-    
-    try:
-        page = int(request.args.get('page', 1))
-    except ValueError:
-        page = 1
-        
+    """Muestra la lista de proveedores con paginación por clave (nombre_empresa, id_proveedor)."""
+    despues = request.args.get('despues')
+    antes = request.args.get('antes')
     per_page = 10
-    offset = (page - 1) * per_page
     
     proveedores = []
     total_proveedores = 0
-    total_pages = 0
     
     try:
         db = get_db()
+        # Cambia con cualquier alta, baja o edición de proveedores (triggers de referencias_version)
+        version = leer_version_tabla(db, 'proveedores')
+        etag = etag_de('proveedores', version, sorted(request.args.items(multi=True)),
+                       g.user['id_usuario'], g.user.get('nombre'), g.user.get('role'))
+        respuesta = no_modificada(etag)
+        if respuesta is not None:
+            db.close()
+            return respuesta
         
-        sql_count = "SELECT COUNT(*) FROM proveedores"
-        total_proveedores = db.execute(sql_count).fetchone()[0]
-        
-        total_pages = (total_proveedores + per_page - 1) // per_page 
-
-        sql_proveedores = "SELECT * FROM proveedores LIMIT ? OFFSET ?"
-        proveedores = db.execute(sql_proveedores, (per_page, offset)).fetchall()
+        proveedores, cursor_siguiente, cursor_anterior = pagina_keyset(
+            db, "SELECT * FROM proveedores", '', [],
+            orden=('nombre_empresa', 'id_proveedor'), por_pagina=per_page,
+            despues=despues, antes=antes)
+
+        # El total se cuenta una vez por versión de proveedores en cada worker
+        total_proveedores = cache_conteo_proveedores.get('proveedores', version)
+        if total_proveedores is None:
+            total_proveedores = db.execute("SELECT COUNT(*) FROM proveedores").fetchone()[0]
+            cache_conteo_proveedores.set('proveedores', total_proveedores, version)
         
         db.close()
         
@@ -714,12 +1074,12 @@ def listar_proveedores():
         flash(f'Error al cargar proveedores: {e}', 'danger')
         return redirect(url_for('dashboard')) 
         
-    return render_template('proveedores/lista.html', 
-                           proveedores=proveedores, 
-                           user_role=g.user.get('role'),
-                           page=page,  
-                           total_pages=total_pages, 
-                           total_proveedores=total_proveedores)
+    return con_etag(render_template('proveedores/lista.html', 
+                                    proveedores=proveedores, 
+                                    user_role=g.user.get('role'),
+                                    cursor_siguiente=cursor_siguiente,
+                                    cursor_anterior=cursor_anterior,
+                                    total_proveedores=total_proveedores), etag)
 
 
 @app.route('/proveedores/agregar', methods=['GET', 'POST'])
@@ -748,6 +1108,8 @@ def agregar_proveedor():
                 (ruc, nombre_empresa, contacto, telefono, email, direccion)
             )
             db.commit()
+            cache_conteo_proveedores.invalidar()
+            referencias.invalidar()
             flash(f'Proveedor "{nombre_empresa}" agregado exitosamente.', 'success')
             return redirect(url_for('listar_proveedores'))
             
@@ -778,6 +1140,8 @@ def eliminar_proveedor(id_proveedor):
         db = get_db()
         db.execute("DELETE FROM proveedores WHERE id_proveedor = ?", (id_proveedor,))
         db.commit()
+        cache_conteo_proveedores.invalidar()
+        referencias.invalidar()
         db.close()
         flash('Proveedor eliminado correctamente.', 'info')
     except sqlite3.IntegrityError:
@@ -787,6 +1151,72 @@ def eliminar_proveedor(id_proveedor):
         
     return redirect(url_for('listar_proveedores'))
 
+# --------------------------------------------------------------------------
+# --- DATOS DE REFERENCIA (DESPLEGABLES) ---
+# --------------------------------------------------------------------------
+
+@app.route('/api/referencias')
+@login_required
+def referencias_api():
+    """Categorías, proveedores y empleados para los formularios del cliente (cacheable por versión)."""
+    try:
+        db = get_db()
+        version = leer_version_referencias(db)
+        etag = etag_de('referencias', version)
+        respuesta = no_modificada(etag, max_age=60)
+        if respuesta is None:
+            _, cuerpo = referencias.como_json(db, version)
+            respuesta = con_etag(Response(cuerpo, mimetype='application/json'), etag, max_age=60)
+        db.close()
+    except sqlite3.Error:
+        app.logger.exception("Error de base de datos en referencias")
+        return jsonify({}), 500
+
+    return respuesta
+
+# --------------------------------------------------------------------------
+# --- COMANDOS DE ADMINISTRACIÓN (flask --app app <comando>) ---
+# --------------------------------------------------------------------------
+
+@app.cli.command('reindexar-busqueda')
+def reindexar_busqueda_command():
+    """Reconstruye el índice FTS5 de búsqueda de productos."""
+    db = get_db()
+    reconstruir_indice(db)
+    total = db.execute("SELECT COUNT(*) FROM productos").fetchone()[0]
+    print(f"Índice de búsqueda reconstruido ({total} productos).")
+
+@app.cli.command('reconstruir-reportes')
+def reconstruir_reportes_command():
+    """Recalcula las tablas resumen de ventas a partir de todo el historial."""
+    db = get_db()
+    reconstruir_resumenes(db)
+    dias = db.execute("SELECT COUNT(*) FROM resumen_ventas_dia").fetchone()[0]
+    print(f"Resúmenes de ventas reconstruidos ({dias} días con ventas).")
+
+@app.cli.command('importar-productos')
+@click.argument('archivo', type=click.Path(exists=True, dir_okay=False))
+@click.option('--lote', default=1000, show_default=True, help='Filas por transacción.')
+def importar_productos_command(archivo, lote):
+    """Importa productos desde un CSV (upsert por codigo_producto)."""
+    db = get_db()
+    with open(archivo, encoding='utf-8-sig', newline='') as f:
+        resultado = importar_csv(db, f, tamano_lote=lote)
+    for numero, mensaje in resultado['errores']:
+        print(f"Fila {numero}: {mensaje}")
+    print(f"{resultado['procesadas']} filas procesadas, {resultado['importadas']} importadas, "
+          f"{resultado['con_error']} con error.")
+
+@app.cli.command('exportar-productos')
+@click.argument('archivo', type=click.Path(dir_okay=False))
+def exportar_productos_command(archivo):
+    """Exporta el catálogo completo a un CSV."""
+    db = get_db()
+    with open(archivo, 'w', encoding='utf-8', newline='') as f:
+        for trozo in exportar_csv(db):
+            f.write(trozo)
+    print(f"Catálogo exportado a {archivo}.")
+
 # --------------------------------------------------------------------------
 # --- INICIALIZACIÓN DE LA APLICACIÓN (CORREGIDO) ---
 # --------------------------------------------------------------------------
@@ -0,0 +1,217 @@
+"""Modo ASGI opcional: las APIs del POS atendidas como corrutinas.
+
+    uvicorn asgi:app --workers 2
+    gunicorn asgi:app -k uvicorn.workers.UvicornWorker -w 2
+
+Con workers sync, cada terminal que busca o cobra ocupa un worker entero
+mientras espera. Aquí /api/buscar_productos y /api/finalizar_venta corren en
+el event loop: la búsqueda se ejecuta en los hilos de BaseAsincrona y el
+cobro espera la confirmación del escritor de ventas con enviar_async, sin
+retener hilo ni conexión durante el group commit (la conexión que los
+before_request toman para cargar g.user se devuelve al pool antes de la
+vista). Así un solo proceso mantiene atendidas a decenas de terminales a la
+vez.
+
+Todo lo demás (páginas, formularios, reportes) pasa sin cambios a la app
+Flask a través de WsgiToAsgi, un hilo por petición como en modo sync.
+
+Las corrutinas se ejecutan dentro del contexto de petición de Flask: la
+sesión, g.user, flash, los before/after_request (métricas, compresión) y los
+ETag funcionan igual que en las vistas sync, y la lógica de ambas rutas es
+la misma (respuesta_busqueda, venta_del_carrito, venta_confirmada).
+"""
+import io
+import sqlite3
+import sys
+from functools import wraps
+
+from asgiref.wsgi import WsgiToAsgi
+from flask import request, jsonify
+
+from app import app as app_flask, role_required, respuesta_busqueda, venta_del_carrito, venta_confirmada
+from database.asincrono import get_base_asincrona
+from database.connection import close_db
+from database.ventas_writer import get_escritor, VentaRechazada
+
+
+def requiere_rol(roles):
+    """role_required de app.py para corrutinas."""
+    comprobar = role_required(roles)(lambda: None)
+
+    def decorador(corrutina):
+        @wraps(corrutina)
+        async def envoltura():
+            denegado = comprobar()
+            if denegado is not None:
+                return denegado
+            return await corrutina()
+        return envoltura
+    return decorador
+
+
+@requiere_rol(['Administrador', 'Vendedor'])
+async def buscar_productos_api():
+    query = request.args.get('q', '').strip()
+
+    if not query:
+        return jsonify([])
+
+    try:
+        return await get_base_asincrona().ejecutar(respuesta_busqueda, query)
+    except sqlite3.Error:
+        app_flask.logger.exception("Error de base de datos en búsqueda")
+        return jsonify([]), 500
+
+
+@requiere_rol(['Administrador', 'Vendedor'])
+async def finalizar_venta():
+    try:
+        venta, error = venta_del_carrito(request.get_json())
+        if error is not None:
+            return error
+
+        try:
+            resultado = await get_escritor().enviar_async(venta)
+        except VentaRechazada as e:
+            return jsonify({'success': False, 'message': str(e), 'lineas_fallidas': e.lineas}), 409
+        return venta_confirmada(venta, resultado)
+
+    except sqlite3.Error as e:
+        app_flask.logger.exception("Error de base de datos en finalizar_venta")
+        return jsonify({'success': False, 'message': f'Error de base de datos: {e}'}), 500
+    except Exception as e:
+        app_flask.logger.exception("Error desconocido al finalizar la venta")
+        return jsonify({'success': False, 'message': f'Error desconocido: {e}'}), 500
+
+
+# endpoint de Flask -> corrutina que lo reemplaza en modo ASGI
+VISTAS_ASINCRONAS = {
+    'buscar_productos_api': buscar_productos_api,
+    'finalizar_venta': finalizar_venta,
+}
+
+
+def _environ(scope, cuerpo):
+    """Environ WSGI equivalente a un scope HTTP de ASGI (para el contexto de petición de Flask)."""
+    raiz = scope.get('root_path', '')
+    ruta = scope['path']
+    if raiz and ruta.startswith(raiz):
+        ruta = ruta[len(raiz):]
+    servidor = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': raiz.encode('utf-8').decode('latin-1'),
+        'PATH_INFO': ruta.encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': str(servidor[0]),
+        'SERVER_PORT': str(servidor[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': scope['client'][0] if scope.get('client') else '',
+        'CONTENT_LENGTH': str(len(cuerpo)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(cuerpo),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for nombre, valor in scope.get('headers', []):
+        nombre, valor = nombre.decode('latin-1'), valor.decode('latin-1')
+        if nombre == 'content-type':
+            environ['CONTENT_TYPE'] = valor
+        elif nombre != 'content-length':
+            clave = 'HTTP_' + nombre.upper().replace('-', '_')
+            environ[clave] = f'{environ[clave]},{valor}' if clave in environ else valor
+    return environ
+
+
+async def _leer_cuerpo(receive):
+    partes = []
+    while True:
+        mensaje = await receive()
+        if mensaje['type'] == 'http.disconnect':
+            break
+        partes.append(mensaje.get('body', b''))
+        if not mensaje.get('more_body'):
+            break
+    return b''.join(partes)
+
+
+async def _enviar(respuesta, environ, send):
+    cabeceras = respuesta.get_wsgi_headers(environ)
+    await send({
+        'type': 'http.response.start',
+        'status': respuesta.status_code,
+        'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in cabeceras.items()],
+    })
+    try:
+        for parte in respuesta.get_app_iter(environ):
+            await send({'type': 'http.response.body', 'body': parte, 'more_body': True})
+    finally:
+        respuesta.close()
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+def _preprocesar(flask_app):
+    """before_request de Flask; devuelve al pool la conexión que hayan tomado (g.db).
+
+    Si g.user no estaba en caché, load_logged_in_user toma la conexión de la
+    petición; sin esto quedaría prestada mientras la vista espera al escritor.
+    La vista pide la suya por BaseAsincrona y los after_request que la
+    necesiten vuelven a tomarla con get_db().
+    """
+    try:
+        return flask_app.preprocess_request()
+    finally:
+        close_db()
+
+
+class AppASGI:
+    """Despacha las rutas de VISTAS_ASINCRONAS a sus corrutinas y el resto a Flask."""
+
+    def __init__(self, flask_app):
+        self.flask = flask_app
+        self.wsgi = WsgiToAsgi(flask_app)
+        self.rutas = {
+            regla.rule: (VISTAS_ASINCRONAS[regla.endpoint], regla.methods)
+            for regla in flask_app.url_map.iter_rules() if regla.endpoint in VISTAS_ASINCRONAS
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] == 'http':
+            ruta = self.rutas.get(scope['path'][len(scope.get('root_path', '')):])
+            if ruta is not None and scope['method'] in ruta[1]:
+                return await self._atender(ruta[0], scope, receive, send)
+        await self.wsgi(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            mensaje = await receive()
+            if mensaje['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif mensaje['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _atender(self, vista, scope, receive, send):
+        environ = _environ(scope, await _leer_cuerpo(receive))
+        # Mismo flujo que Flask.full_dispatch_request, con la vista y los before_request esperados
+        with self.flask.request_context(environ):
+            try:
+                try:
+                    # before_request (sesión -> g.user, métricas) en un hilo: puede consultar la base
+                    rv = await get_base_asincrona().en_hilo(_preprocesar, self.flask)
+                    if rv is None:
+                        rv = await vista()
+                except Exception as e:
+                    rv = self.flask.handle_user_exception(e)
+                respuesta = self.flask.finalize_request(rv)
+            except Exception as e:
+                respuesta = self.flask.handle_exception(e)
+            await _enviar(respuesta, environ, send)
+
+
+app = AppASGI(app_flask)
@@ -0,0 +1 @@
+"""Mediciones de rendimiento del sistema (se ejecutan a mano, no forman parte de la app)."""
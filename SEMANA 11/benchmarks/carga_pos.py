@@ -0,0 +1,202 @@
+"""Carga de muchas terminales POS: gunicorn (sync y gthread) contra modo ASGI (uvicorn).
+
+Levanta cada servidor sobre una copia desechable de la base, con los mismos
+workers, y simula `--terminales` cajas a la vez durante `--duracion`
+segundos. Cada caja escribe un término (una búsqueda por tecla, con la
+pausa del debounce entre teclas) y cada `--busquedas-por-venta` búsquedas
+cobra un carrito. Reporta peticiones/s, p50/p95/p99 por ruta y errores
+(incluye conexiones rechazadas o que superan `--timeout`).
+
+Uso (desde la carpeta del proyecto; requiere gunicorn y uvicorn):
+    python -m benchmarks.dataset benchmarks/bench.db              # una vez
+    python -m benchmarks.carga_pos benchmarks/bench.db --terminales 60 --workers 2
+    python -m benchmarks.carga_pos benchmarks/bench.db --modos asgi --duracion 30 -o asgi.json
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import quote_plus
+
+from benchmarks.ejecutar import PERCENTILES, percentil
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODOS = {
+    'sync': lambda puerto, workers: [sys.executable, '-m', 'gunicorn', 'app:app', '-w', str(workers),
+                                     '-b', f'127.0.0.1:{puerto}', '--log-level', 'warning'],
+    # El despliegue actual de render.yaml
+    'gthread': lambda puerto, workers: [sys.executable, '-m', 'gunicorn', 'app:app', '-w', str(workers),
+                                        '-k', 'gthread', '--threads', '4',
+                                        '-b', f'127.0.0.1:{puerto}', '--log-level', 'warning'],
+    'asgi': lambda puerto, workers: [sys.executable, '-m', 'uvicorn', 'asgi:app', '--workers', str(workers),
+                                     '--port', str(puerto), '--log-level', 'warning'],
+}
+
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def esperar_servidor(puerto, limite=30):
+    fin = time.monotonic() + limite
+    while time.monotonic() < fin:
+        try:
+            with socket.create_connection(('127.0.0.1', puerto), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"El servidor no abrió el puerto {puerto} en {limite}s")
+
+
+def datos_de_prueba(ruta):
+    conn = sqlite3.connect(ruta)
+    nombres = [row[0] for row in conn.execute("SELECT nombre_producto FROM productos ORDER BY random() LIMIT 300")]
+    vendibles = [row[0] for row in conn.execute(
+        "SELECT id_producto FROM productos WHERE stock_actual >= 1000 LIMIT 2000")]
+    conn.close()
+    return nombres, vendibles
+
+
+def cookie_de_sesion(email):
+    """Cookie de sesión firmada con la SECRET_KEY de la app (evita pasar por el login)."""
+    from app import app
+    return app.session_interface.get_signing_serializer(app).dumps({'email': email})
+
+
+class Terminal(threading.Thread):
+    def __init__(self, puerto, cookie, nombres, vendibles, args, fin, semilla):
+        super().__init__(daemon=True)
+        self.puerto, self.cookie, self.args, self.fin = puerto, cookie, args, fin
+        self.nombres, self.vendibles = nombres, vendibles
+        self.rng = random.Random(semilla)
+        self.latencias = {'buscar_productos': [], 'finalizar_venta': []}
+        self.errores = 0
+        self.conn = None
+
+    def peticion(self, ruta, metodo, url, cuerpo=None):
+        cabeceras = {'Cookie': f'session={self.cookie}', 'Accept-Encoding': 'gzip, br'}
+        if cuerpo is not None:
+            cabeceras['Content-Type'] = 'application/json'
+        inicio = time.perf_counter()
+        try:
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection('127.0.0.1', self.puerto, timeout=self.args.timeout)
+            self.conn.request(metodo, url, body=cuerpo, headers=cabeceras)
+            respuesta = self.conn.getresponse()
+            respuesta.read()
+            if respuesta.status >= 400 and respuesta.status != 409:
+                self.errores += 1
+                return
+        except (OSError, http.client.HTTPException):
+            self.errores += 1
+            self.conn = None
+            return
+        self.latencias[ruta].append((time.perf_counter() - inicio) * 1000)
+
+    def run(self):
+        busquedas = 0
+        while not self.fin.is_set():
+            termino = self.rng.choice(self.nombres)[:self.rng.randint(3, 8)]
+            for largo in range(2, len(termino) + 1):
+                if self.fin.is_set():
+                    return
+                self.peticion('buscar_productos', 'GET',
+                              f"/api/buscar_productos?q={quote_plus(termino[:largo])}")
+                busquedas += 1
+                time.sleep(self.args.pausa / 1000)
+            if busquedas >= self.args.busquedas_por_venta:
+                busquedas = 0
+                carrito = [{'id': i, 'cantidad': self.rng.randint(1, 3)}
+                           for i in self.rng.sample(self.vendibles, self.rng.randint(1, 5))]
+                self.peticion('finalizar_venta', 'POST', '/api/finalizar_venta', json.dumps({'carrito': carrito}))
+
+
+def medir_modo(modo, args, nombres, vendibles, cookie):
+    carpeta = tempfile.mkdtemp(prefix='carga_pos_')
+    base = os.path.join(carpeta, 'carga.db')
+    shutil.copy(args.ruta, base)
+    puerto = puerto_libre()
+    servidor = subprocess.Popen(MODOS[modo](puerto, args.workers), cwd=RAIZ,
+                                env={**os.environ, 'PERNOTODO_DB': base})
+    try:
+        esperar_servidor(puerto)
+        fin = threading.Event()
+        terminales = [Terminal(puerto, cookie, nombres, vendibles, args, fin, args.semilla + i)
+                      for i in range(args.terminales)]
+        inicio = time.perf_counter()
+        for terminal in terminales:
+            terminal.start()
+        time.sleep(args.duracion)
+        fin.set()
+        for terminal in terminales:
+            terminal.join()
+        total = time.perf_counter() - inicio
+    finally:
+        servidor.terminate()
+        servidor.wait()
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+    resultado = {'errores': sum(t.errores for t in terminales), 'rutas': {}}
+    peticiones = 0
+    for ruta in ('buscar_productos', 'finalizar_venta'):
+        latencias = sorted(x for t in terminales for x in t.latencias[ruta])
+        peticiones += len(latencias)
+        r = {f'p{p}_ms': round(percentil(latencias, p), 1) if latencias else None for p in PERCENTILES}
+        r['n'] = len(latencias)
+        resultado['rutas'][ruta] = r
+    resultado['peticiones_por_s'] = round(peticiones / total, 1)
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('ruta', help='base generada con benchmarks.dataset (se usa una copia)')
+    parser.add_argument('--modos', nargs='*', default=list(MODOS), choices=list(MODOS))
+    parser.add_argument('--terminales', type=int, default=60, help='cajas simultáneas')
+    parser.add_argument('--workers', type=int, default=2, help='procesos de cada servidor')
+    parser.add_argument('--duracion', type=float, default=20, help='segundos de carga por modo')
+    parser.add_argument('--pausa', type=float, default=150, help='ms entre teclas (debounce del POS)')
+    parser.add_argument('--busquedas-por-venta', type=int, default=12)
+    parser.add_argument('--timeout', type=float, default=10, help='s antes de contar una petición como error')
+    parser.add_argument('--semilla', type=int, default=7)
+    parser.add_argument('-o', '--salida', help='archivo JSON donde guardar los resultados')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.ruta):
+        sys.exit(f"No existe {args.ruta}; créala con: python -m benchmarks.dataset {args.ruta}")
+
+    os.environ.setdefault('PERNOTODO_DB', args.ruta)
+    cookie = cookie_de_sesion('vendedor@pernotodo.com')
+    nombres, vendibles = datos_de_prueba(args.ruta)
+
+    print(f"{args.terminales} terminales, {args.workers} workers, {args.duracion:.0f}s por modo, {os.cpu_count()} CPUs")
+    print(f"{'modo':<8}{'ruta':<18}{'n':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'pet/s':>9}{'errores':>9}")
+    resultados = {}
+    for modo in args.modos:
+        r = medir_modo(modo, args, nombres, vendibles, cookie)
+        resultados[modo] = r
+        for ruta, x in r['rutas'].items():
+            fila = f"{modo:<8}{ruta:<18}{x['n']:>7}"
+            fila += ''.join(f"{x[f'p{p}_ms']:>9.1f}" if x[f'p{p}_ms'] is not None else f"{'-':>9}" for p in PERCENTILES)
+            print(fila + f"{r['peticiones_por_s']:>9.1f}{r['errores']:>9}")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump({'parametros': vars(args), 'resultados': resultados}, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados guardados en {args.salida}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Bytes enviados y CPU por petición según la codificación y el nivel de compresión.
+
+Pide las páginas más pesadas a la app sin comprimir (Accept-Encoding:
+identity) y comprime cada cuerpo con gzip y brotli a varios niveles. Para
+cada combinación reporta bytes en el cable, proporción respecto al original
+y el tiempo de CPU de comprimir una respuesta (media de `--repeticiones`),
+que es lo que la compresión le suma a la latencia del worker.
+
+Uso (desde la carpeta del proyecto):
+    python -m benchmarks.dataset benchmarks/bench.db              # una vez
+    python -m benchmarks.compresion benchmarks/bench.db
+    python -m benchmarks.compresion benchmarks/bench.db --solo productos exportar_csv -o compresion.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+NIVELES = [('gzip', 1), ('gzip', 6), ('gzip', 9), ('br', 1), ('br', 4), ('br', 6), ('br', 11)]
+
+PAGINAS = (
+    ('productos', 'admin', '/productos', None),
+    ('productos_busqueda', 'admin', '/productos', {'q': 'tornillo'}),
+    ('historial_ventas', 'admin', '/historial_ventas', None),
+    ('punto_de_venta', 'vendedor', '/punto_de_venta', None),
+    ('buscar_productos', 'vendedor', '/api/buscar_productos', {'q': 'to'}),
+    ('exportar_csv', 'admin', '/productos/exportar', None),
+)
+
+
+def cuerpos(app):
+    """Cuerpo sin comprimir de cada página, pedido como lo haría el navegador."""
+    usuarios = {'admin': 'admin@pernotodo.com', 'vendedor': 'vendedor@pernotodo.com'}
+    resultado = {}
+    for nombre, rol, url, parametros in PAGINAS:
+        cliente = app.test_client()
+        with cliente.session_transaction() as sesion:
+            sesion['email'] = usuarios[rol]
+        respuesta = cliente.get(url, query_string=parametros, headers={'Accept-Encoding': 'identity'})
+        if respuesta.status_code != 200:
+            print(f"  {nombre}: HTTP {respuesta.status_code}, se omite")
+            continue
+        resultado[nombre] = respuesta.get_data()
+    return resultado
+
+
+def medir(datos, codificacion, nivel, repeticiones):
+    from compresion import comprimir
+    comprimido = comprimir(datos, codificacion, nivel)
+    inicio = time.process_time()
+    for _ in range(repeticiones):
+        comprimir(datos, codificacion, nivel)
+    cpu_ms = (time.process_time() - inicio) / repeticiones * 1000
+    return {
+        'bytes': len(comprimido),
+        'proporcion': round(len(comprimido) / len(datos), 4),
+        'cpu_ms': round(cpu_ms, 3),
+        'mb_por_s': round(len(datos) / 1e6 / (cpu_ms / 1000), 1) if cpu_ms else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('ruta', help='base generada con benchmarks.dataset')
+    parser.add_argument('--repeticiones', type=int, default=20, help='compresiones cronometradas por combinación')
+    parser.add_argument('--solo', nargs='*', help='medir sólo estas páginas')
+    parser.add_argument('-o', '--salida', help='archivo JSON donde guardar los resultados')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.ruta):
+        sys.exit(f"No existe {args.ruta}; créala con: python -m benchmarks.dataset {args.ruta}")
+
+    # La app lee PERNOTODO_DB al importarse
+    os.environ['PERNOTODO_DB'] = args.ruta
+    from app import app
+    from compresion import brotli
+
+    niveles = [(c, n) for c, n in NIVELES if c != 'br' or brotli is not None]
+    if len(niveles) < len(NIVELES):
+        print("(sin el paquete brotli: sólo gzip)")
+
+    resultados = {}
+    for nombre, datos in cuerpos(app).items():
+        if args.solo and nombre not in args.solo:
+            continue
+        print(f"\n{nombre}: {len(datos):,} bytes sin comprimir")
+        print(f"  {'codificación':<14}{'bytes':>12}{'proporción':>12}{'CPU ms':>10}{'MB/s':>9}")
+        resultados[nombre] = {'original': len(datos), 'codificaciones': {}}
+        for codificacion, nivel in niveles:
+            r = medir(datos, codificacion, nivel, max(1, args.repeticiones // (10 if nivel >= 9 else 1)))
+            resultados[nombre]['codificaciones'][f'{codificacion}-{nivel}'] = r
+            print(f"  {codificacion + '-' + str(nivel):<14}{r['bytes']:>12,}{r['proporcion']:>12.3f}"
+                  f"{r['cpu_ms']:>10.2f}{r['mb_por_s'] or 0:>9.1f}")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump({'niveles': niveles, 'resultados': resultados}, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados guardados en {args.salida}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+"""Base de datos sintética de ferretería para los benchmarks.
+
+Genera proveedores, categorías, clientes, productos y un historial de
+ventas/detalle_venta con distribuciones parecidas a las reales:
+  - popularidad de productos y clientes tipo Zipf (pocos concentran las ventas)
+  - ventas repartidas en horario comercial, con más movimiento los sábados
+  - 1 a 12 líneas por venta (la mayoría 1-3) y cantidades sueltas o por caja
+  - ~40 % de las ventas a consumidor final
+
+La generación es determinista para una misma semilla y tamaños.
+
+Uso (desde la carpeta del proyecto):
+    python -m benchmarks.dataset benchmarks/bench.db --productos 20000 --ventas 2000000
+"""
+import argparse
+import itertools
+import os
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+TAMANOS_POR_DEFECTO = {
+    'proveedores': 200,
+    'categorias': 40,
+    'clientes': 50_000,
+    'productos': 20_000,
+    'ventas': 200_000,
+}
+
+CONSUMIDOR_FINAL = '9999999999'
+LOTE = 10_000
+
+FAMILIAS = (
+    ('PER', 'Perno hexagonal'), ('PEC', 'Perno carrocero'), ('TUE', 'Tuerca hexagonal'),
+    ('TUS', 'Tuerca de seguridad'), ('ARA', 'Arandela plana'), ('ARP', 'Arandela de presión'),
+    ('TOR', 'Tornillo autorroscante'), ('TOM', 'Tornillo para madera'), ('TAC', 'Taco fischer'),
+    ('VAR', 'Varilla roscada'), ('ESP', 'Espárrago'), ('REM', 'Remache pop'),
+)
+MATERIALES = ('acero', 'acero inoxidable', 'acero galvanizado', 'bronce', 'nylon', 'zincado')
+ROSCAS = ('métrica', 'métrica fina', 'UNC', 'UNF', None)
+MEDIDAS = tuple(f'M{d}x{l}' for d in (3, 4, 5, 6, 8, 10, 12, 14, 16, 20) for l in (10, 16, 20, 25, 30, 40, 50, 60, 80, 100))
+NOMBRES = ('Juan', 'María', 'Carlos', 'Ana', 'Luis', 'Rosa', 'Jorge', 'Lucía', 'Pedro', 'Elena', 'Diego', 'Sofía')
+APELLIDOS = ('Pérez', 'García', 'Torres', 'Vera', 'Mora', 'Castro', 'Zambrano', 'Andrade', 'Ruiz', 'León')
+CANTIDADES = (1, 2, 3, 4, 5, 6, 10, 12, 20, 25, 50, 100)
+PESOS_CANTIDADES = (30, 18, 10, 9, 7, 4, 8, 3, 4, 2, 3, 2)
+# Lunes a domingo; el sábado es el día más fuerte y el domingo casi no hay ventas
+PESOS_DIA_SEMANA = (1.0, 1.0, 1.0, 1.0, 1.1, 1.6, 0.3)
+PESOS_HORA = {h: p for h, p in zip(range(8, 20), (3, 6, 9, 10, 8, 5, 6, 8, 9, 8, 5, 2))}
+
+
+def pesos_zipf(n, s=1.1):
+    """Pesos acumulados de una distribución Zipf (rango 1 = el más popular)."""
+    return list(itertools.accumulate(1 / (rango ** s) for rango in range(1, n + 1)))
+
+
+def _por_lotes(filas, tamano=LOTE):
+    filas = iter(filas)
+    while True:
+        lote = list(itertools.islice(filas, tamano))
+        if not lote:
+            return
+        yield lote
+
+
+def _fechas_ventas(rng, n, dias, hasta):
+    """n marcas de tiempo ordenadas en los últimos `dias`, con el patrón semanal y horario."""
+    desde = hasta - timedelta(days=dias)
+    dias_posibles = [desde + timedelta(days=d) for d in range(dias)]
+    pesos_dias = [PESOS_DIA_SEMANA[d.weekday()] for d in dias_posibles]
+    horas, pesos_horas = list(PESOS_HORA), list(PESOS_HORA.values())
+    fechas = []
+    for dia, hora in zip(rng.choices(dias_posibles, pesos_dias, k=n), rng.choices(horas, pesos_horas, k=n)):
+        fechas.append(dia.replace(hour=hora, minute=rng.randrange(60), second=rng.randrange(60)))
+    fechas.sort()
+    return [f.strftime('%Y-%m-%d %H:%M:%S') for f in fechas]
+
+
+def generar_referencias(conn, rng, tamanos):
+    conn.executemany(
+        "INSERT INTO proveedores (ruc, nombre_empresa, contacto, telefono, email, direccion) VALUES (?, ?, ?, ?, ?, ?)",
+        ((f'{1790000000001 + i:013d}', f'Distribuidora {rng.choice(APELLIDOS)} {i} S.A.',
+          f'{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)}', f'09{rng.randrange(10**8):08d}',
+          f'ventas{i}@proveedor.ec', f'Av. Industrial {i}')
+         for i in range(1, tamanos['proveedores'] + 1))
+    )
+    conn.executemany(
+        "INSERT INTO categorias (nombre_categoria, descripcion) VALUES (?, ?)",
+        ((f'{FAMILIAS[i % len(FAMILIAS)][1]} - línea {i // len(FAMILIAS) + 1}', None)
+         for i in range(tamanos['categorias']))
+    )
+    conn.execute("INSERT OR IGNORE INTO clientes (cedula, nombres, apellidos) VALUES (?, 'Consumidor', 'Final')",
+                 (CONSUMIDOR_FINAL,))
+    for lote in _por_lotes(
+        (f'{1700000000 + i:010d}', rng.choice(NOMBRES), f'{rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}',
+         f'09{rng.randrange(10**8):08d}', f'cliente{i}@correo.ec', None)
+        for i in range(1, tamanos['clientes'] + 1)
+    ):
+        conn.executemany(
+            "INSERT INTO clientes (cedula, nombres, apellidos, telefono, email, direccion) VALUES (?, ?, ?, ?, ?, ?)",
+            lote)
+
+
+def generar_productos(conn, rng, tamanos):
+    def filas():
+        for i in range(1, tamanos['productos'] + 1):
+            prefijo, familia = FAMILIAS[i % len(FAMILIAS)]
+            material, medida = rng.choice(MATERIALES), rng.choice(MEDIDAS)
+            precio_compra = round(rng.lognormvariate(-1.5, 1.0), 2) + 0.01
+            stock_minimo = rng.choice((5, 10, 10, 20, 50, 100))
+            # ~5 % de los productos quedan por debajo del mínimo
+            stock = rng.randrange(stock_minimo) if rng.random() < 0.05 else rng.randrange(stock_minimo, 5000)
+            yield (f'{prefijo}-{i:06d}', f'{familia} {material} {medida}', f'{familia} de {material}, {medida}',
+                   material, rng.choice(ROSCAS), medida, 'unidad', precio_compra,
+                   round(precio_compra * rng.uniform(1.3, 2.2), 2), stock, stock_minimo,
+                   rng.randrange(1, tamanos['proveedores'] + 1), rng.randrange(1, tamanos['categorias'] + 1))
+
+    for lote in _por_lotes(filas()):
+        conn.executemany(
+            """
+            INSERT INTO productos (codigo_producto, nombre_producto, descripcion, material, tipo_rosca, medida,
+                                   unidad_medida, precio_compra, precio_venta, stock_actual, stock_minimo,
+                                   id_proveedor, id_categoria)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            lote)
+
+
+def generar_ventas(conn, rng, tamanos, dias):
+    productos = conn.execute("SELECT id_producto, precio_venta FROM productos").fetchall()
+    rng.shuffle(productos)  # el rango de popularidad no depende del id
+    pesos_productos = pesos_zipf(len(productos))
+    clientes = [row[0] for row in conn.execute("SELECT cedula FROM clientes WHERE cedula <> ?", (CONSUMIDOR_FINAL,))]
+    pesos_clientes = pesos_zipf(len(clientes), s=0.8) if clientes else None
+    empleados = [row[0] for row in conn.execute("SELECT id_usuario FROM usuario")]
+    fechas = _fechas_ventas(rng, tamanos['ventas'], dias, datetime.now())
+    inicio = (conn.execute("SELECT COALESCE(MAX(id_venta), 0) FROM ventas").fetchone()[0]) + 1
+
+    def filas():
+        for id_venta, fecha in enumerate(fechas, start=inicio):
+            num_lineas = min(12, 1 + int(rng.expovariate(0.7)))
+            lineas = {}
+            for id_producto, precio in rng.choices(productos, cum_weights=pesos_productos, k=num_lineas):
+                cantidad = rng.choices(CANTIDADES, PESOS_CANTIDADES)[0]
+                lineas[id_producto] = (cantidad, precio)
+            detalle = [(id_venta, id_producto, cantidad, precio, round(cantidad * precio, 2))
+                       for id_producto, (cantidad, precio) in lineas.items()]
+            if clientes and rng.random() >= 0.4:
+                cedula = rng.choices(clientes, cum_weights=pesos_clientes)[0]
+            else:
+                cedula = CONSUMIDOR_FINAL
+            estado = 'anulada' if rng.random() < 0.01 else 'completada'
+            venta = (id_venta, cedula, rng.choice(empleados), 1, fecha,
+                     round(sum(linea[4] for linea in detalle), 2), estado, 'Contado',
+                     rng.choices(('Efectivo', 'Tarjeta', 'Transferencia'), (6, 3, 1))[0])
+            yield venta, detalle
+
+    for lote in _por_lotes(filas()):
+        conn.executemany(
+            """
+            INSERT INTO ventas (id_venta, cedula_cliente, id_empleado, id_local, fecha_venta, total, estado,
+                                periodo_pago, metodo_pago)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (venta for venta, _ in lote))
+        conn.executemany(
+            "INSERT INTO detalle_venta (id_venta, id_producto, cantidad, precio_unitario, subtotal) VALUES (?, ?, ?, ?, ?)",
+            (linea for _, detalle in lote for linea in detalle))
+        conn.commit()
+
+
+def generar_base(ruta, tamanos=None, dias=365, semilla=42, verbose=True):
+    """Crea (desde cero) la base sintética en `ruta` y devuelve los tamaños usados."""
+    tamanos = {**TAMANOS_POR_DEFECTO, **(tamanos or {})}
+    for sufijo in ('', '-wal', '-shm'):
+        if os.path.exists(ruta + sufijo):
+            os.remove(ruta + sufijo)
+
+    # init_db (migraciones) lee la ruta de PERNOTODO_DB al importar database.connection
+    os.environ['PERNOTODO_DB'] = ruta
+    from database.connection import init_db
+    from database.reportes import reconstruir_resumenes
+
+    init_db()
+
+    rng = random.Random(semilla)
+    conn = sqlite3.connect(ruta)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    pasos = (
+        ('referencias', lambda: generar_referencias(conn, rng, tamanos)),
+        ('productos', lambda: generar_productos(conn, rng, tamanos)),
+        ('ventas', lambda: generar_ventas(conn, rng, tamanos, dias)),
+        ('resumenes', lambda: reconstruir_resumenes(conn)),
+        ('analyze', lambda: conn.execute("ANALYZE")),
+    )
+    for nombre, paso in pasos:
+        inicio = time.perf_counter()
+        paso()
+        conn.commit()
+        if verbose:
+            print(f"  {nombre:<12} {time.perf_counter() - inicio:8.1f} s")
+    conn.close()
+    return tamanos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('ruta', help='archivo SQLite a crear (se sobrescribe)')
+    for nombre, valor in TAMANOS_POR_DEFECTO.items():
+        parser.add_argument(f'--{nombre}', type=int, default=valor)
+    parser.add_argument('--dias', type=int, default=365, help='días de historial de ventas')
+    parser.add_argument('--semilla', type=int, default=42)
+    args = parser.parse_args()
+
+    tamanos = {nombre: getattr(args, nombre) for nombre in TAMANOS_POR_DEFECTO}
+    print(f"Generando {args.ruta} con {tamanos}")
+    generar_base(args.ruta, tamanos, dias=args.dias, semilla=args.semilla)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+"""Mide las rutas más usadas con el cliente de pruebas de Flask.
+
+Para cada escenario hace unas peticiones de calentamiento y luego `n`
+peticiones cronometradas; reporta p50/p95/p99 (ms) y consultas SQL por
+petición, y guarda el resultado en JSON para comparar corridas.
+
+Uso (desde la carpeta del proyecto):
+    python -m benchmarks.dataset benchmarks/bench.db              # una vez
+    python -m benchmarks.ejecutar benchmarks/bench.db -n 300 -o antes.json
+    ... cambio ...
+    python -m benchmarks.ejecutar benchmarks/bench.db -n 300 -o despues.json --comparar antes.json
+
+/api/finalizar_venta escribe en la base: usar siempre una copia desechable.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+PERCENTILES = (50, 95, 99)
+
+
+class ContadorConsultas:
+    """Cuenta las sentencias SQL ejecutadas (pool de la app y escritor de ventas).
+
+    Las sentencias anidadas (triggers, tablas sombra de FTS5) se cuentan
+    aparte: SQLite las reporta con el prefijo "--" o sobre 'main'.<tabla>.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.internas = 0
+
+    def __call__(self, sql):
+        if sql.startswith('--') or "'main'." in sql:
+            self.internas += 1
+        else:
+            self.total += 1
+
+
+def percentil(valores_ordenados, p):
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    indice = max(0, min(len(valores_ordenados) - 1, round(p / 100 * len(valores_ordenados)) - 1))
+    return valores_ordenados[indice]
+
+
+def escenarios(conn, rng):
+    """Escenarios (nombre, rol, función que arma la petición) con datos reales de la base."""
+    nombres = [row[0] for row in conn.execute(
+        "SELECT nombre_producto FROM productos ORDER BY random() LIMIT 200")]
+    codigos = [row[0] for row in conn.execute(
+        "SELECT codigo_producto FROM productos ORDER BY random() LIMIT 200")]
+    # Productos con stock de sobra para que las ventas del benchmark no sean rechazadas
+    vendibles = [row[0] for row in conn.execute(
+        "SELECT id_producto FROM productos WHERE stock_actual >= 1000 LIMIT 2000")]
+    empleados = [row[0] for row in conn.execute("SELECT id_usuario FROM usuario")]
+    ultima_fecha = conn.execute("SELECT date(MAX(fecha_venta)) FROM ventas").fetchone()[0] or ''
+
+    def termino_busqueda():
+        if rng.random() < 0.3:
+            return rng.choice(codigos)[:rng.randint(3, 6)]
+        palabras = rng.choice(nombres).split()
+        return ' '.join(palabras[:rng.randint(1, len(palabras))])
+
+    def carrito():
+        return [{'id': id_producto, 'cantidad': rng.randint(1, 3)}
+                for id_producto in rng.sample(vendibles, rng.randint(1, 5))]
+
+    return (
+        ('buscar_productos', 'vendedor',
+         lambda c: c.get('/api/buscar_productos', query_string={'q': termino_busqueda()})),
+        ('finalizar_venta', 'vendedor',
+         lambda c: c.post('/api/finalizar_venta', json={'carrito': carrito()})),
+        ('productos', 'admin',
+         lambda c: c.get('/productos')),
+        ('productos_busqueda', 'admin',
+         lambda c: c.get('/productos', query_string={'q': termino_busqueda()})),
+        ('historial_ventas', 'admin',
+         lambda c: c.get('/historial_ventas')),
+        ('historial_ventas_filtrado', 'admin',
+         lambda c: c.get('/historial_ventas', query_string={
+             'empleado': rng.choice(empleados), 'desde': ultima_fecha[:8] + '01', 'hasta': ultima_fecha})),
+        ('proveedores', 'admin',
+         lambda c: c.get('/proveedores')),
+    )
+
+
+def medir(app, contador, email, peticion, n, calentamiento):
+    cliente = app.test_client()
+    with cliente.session_transaction() as sesion:
+        sesion['email'] = email
+
+    for _ in range(calentamiento):
+        peticion(cliente)
+
+    latencias, consultas, errores = [], [], 0
+    internas_antes = contador.internas
+    for _ in range(n):
+        antes = contador.total
+        inicio = time.perf_counter()
+        respuesta = peticion(cliente)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        consultas.append(contador.total - antes)
+        if respuesta.status_code >= 400:
+            errores += 1
+
+    latencias.sort()
+    resultado = {f'p{p}_ms': round(percentil(latencias, p), 3) for p in PERCENTILES}
+    resultado.update({
+        'media_ms': round(sum(latencias) / n, 3),
+        'max_ms': round(latencias[-1], 3),
+        'consultas_por_peticion': round(sum(consultas) / n, 2),
+        'consultas_max': max(consultas),
+        'sentencias_internas_por_peticion': round((contador.internas - internas_antes) / n, 2),
+        'errores': errores,
+        'n': n,
+    })
+    return resultado
+
+
+def metadatos(ruta):
+    conn = sqlite3.connect(ruta)
+    tamanos = {tabla: conn.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0]
+               for tabla in ('productos', 'proveedores', 'categorias', 'clientes', 'ventas', 'detalle_venta')}
+    conn.close()
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'plataforma': platform.platform(),
+        'base': os.path.abspath(ruta),
+        'tamanos': tamanos,
+    }
+
+
+def comparar(actual, anterior):
+    print(f"\n{'escenario':<28}{'p50 antes':>11}{'p50 ahora':>11}{'Δ%':>8}{'p95 antes':>11}{'p95 ahora':>11}{'Δ%':>8}")
+    for nombre, r in actual['resultados'].items():
+        previo = anterior['resultados'].get(nombre)
+        if previo is None:
+            continue
+        fila = f'{nombre:<28}'
+        for clave in ('p50_ms', 'p95_ms'):
+            delta = (r[clave] - previo[clave]) / previo[clave] * 100 if previo[clave] else 0.0
+            fila += f'{previo[clave]:>11.2f}{r[clave]:>11.2f}{delta:>+8.1f}'
+        print(fila)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('ruta', help='base generada con benchmarks.dataset')
+    parser.add_argument('-n', type=int, default=200, help='peticiones cronometradas por escenario')
+    parser.add_argument('--calentamiento', type=int, default=20)
+    parser.add_argument('--solo', nargs='*', help='ejecutar sólo estos escenarios')
+    parser.add_argument('--semilla', type=int, default=7)
+    parser.add_argument('-o', '--salida', help='archivo JSON donde guardar los resultados')
+    parser.add_argument('--comparar', help='JSON de una corrida anterior')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.ruta):
+        sys.exit(f"No existe {args.ruta}; créala con: python -m benchmarks.dataset {args.ruta}")
+
+    # La app lee PERNOTODO_DB al importarse
+    os.environ['PERNOTODO_DB'] = args.ruta
+    from database.connection import observar_consultas
+    contador = ContadorConsultas()
+    observar_consultas(contador)
+    from app import app
+
+    usuarios = {'admin': 'admin@pernotodo.com', 'vendedor': 'vendedor@pernotodo.com'}
+    conn = sqlite3.connect(args.ruta)
+    lista = escenarios(conn, random.Random(args.semilla))
+    conn.close()
+
+    resultado = {'metadatos': metadatos(args.ruta), 'resultados': {}}
+    print(f"{'escenario':<28}{'p50':>9}{'p95':>9}{'p99':>9}{'consultas':>11}{'errores':>9}")
+    for nombre, rol, peticion in lista:
+        if args.solo and nombre not in args.solo:
+            continue
+        r = medir(app, contador, usuarios[rol], peticion, args.n, args.calentamiento)
+        resultado['resultados'][nombre] = r
+        print(f"{nombre:<28}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}"
+              f"{r['consultas_por_peticion']:>11.1f}{r['errores']:>9}")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados guardados en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            comparar(resultado, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
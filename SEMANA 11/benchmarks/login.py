@@ -0,0 +1,121 @@
+"""Throughput de login según el algoritmo y el costo del hash de contraseñas.
+
+Simula el pico de cambio de turno: `--terminales` hilos inician sesión a la
+vez, `--logins` veces cada uno, y todas las verificaciones pasan por un
+PoolHash como el de la app (mismos hilos y cola). Para cada configuración
+reporta el costo de un hash aislado, logins/s, latencia p50/p95/p99 (incluye
+la espera en la cola) y cuántos fueron rechazados por cola llena.
+
+Uso (desde la carpeta del proyecto):
+    python -m benchmarks.login --terminales 30 --logins 5 --hilos 2 --cola 16
+    python -m benchmarks.login --solo scrypt_n14 pbkdf2_600k -o login.json
+"""
+import argparse
+import json
+import os
+import threading
+import time
+
+from benchmarks.ejecutar import PERCENTILES, percentil
+from contrasenas import (Contrasenas, HasherPBKDF2, HasherScrypt, HasherSHA256Legado, PoolHash,
+                         PoolOcupado, argon2, HasherArgon2)
+
+PASSWORD = 'cambio-de-turno-2024'
+
+CONFIGURACIONES = {
+    'sha256_24 (legado)': lambda: HasherSHA256Legado(),
+    'pbkdf2_100k': lambda: HasherPBKDF2(100_000),
+    'pbkdf2_300k': lambda: HasherPBKDF2(300_000),
+    'pbkdf2_600k': lambda: HasherPBKDF2(600_000),
+    'scrypt_n13': lambda: HasherScrypt(n=2 ** 13),
+    'scrypt_n14': lambda: HasherScrypt(n=2 ** 14),
+    'scrypt_n15': lambda: HasherScrypt(n=2 ** 15),
+    'scrypt_n16': lambda: HasherScrypt(n=2 ** 16),
+}
+if argon2 is not None:
+    CONFIGURACIONES['argon2id_t2_m19'] = lambda: HasherArgon2(tiempo=2, memoria_kib=19 * 1024)
+    CONFIGURACIONES['argon2id_t3_m64'] = lambda: HasherArgon2(tiempo=3, memoria_kib=64 * 1024)
+
+
+def medir(hasher, terminales, logins, hilos, cola, espera):
+    contrasenas = Contrasenas(hasher)
+    guardado = hasher.calcular(PASSWORD)
+
+    inicio = time.perf_counter()
+    for _ in range(3):
+        contrasenas.verificar(PASSWORD, guardado)
+    hash_ms = (time.perf_counter() - inicio) / 3 * 1000
+
+    pool = PoolHash(hilos=hilos, max_cola=cola, espera=espera)
+    latencias, rechazados = [], [0]
+    lock = threading.Lock()
+    salida = threading.Barrier(terminales + 1)
+
+    def terminal():
+        salida.wait()
+        for _ in range(logins):
+            t0 = time.perf_counter()
+            try:
+                correcta, _ = pool.ejecutar(contrasenas.verificar, PASSWORD, guardado)
+                assert correcta
+            except PoolOcupado:
+                with lock:
+                    rechazados[0] += 1
+                continue
+            with lock:
+                latencias.append((time.perf_counter() - t0) * 1000)
+
+    hilos_terminales = [threading.Thread(target=terminal) for _ in range(terminales)]
+    for hilo in hilos_terminales:
+        hilo.start()
+    salida.wait()
+    inicio = time.perf_counter()
+    for hilo in hilos_terminales:
+        hilo.join()
+    total = time.perf_counter() - inicio
+    pool._executor.shutdown()
+
+    latencias.sort()
+    resultado = {f'p{p}_ms': round(percentil(latencias, p), 1) if latencias else None for p in PERCENTILES}
+    resultado.update({
+        'hash_ms': round(hash_ms, 2),
+        'logins_por_s': round(len(latencias) / total, 1),
+        'rechazados': rechazados[0],
+        'logins': terminales * logins,
+        'duracion_s': round(total, 2),
+    })
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--terminales', type=int, default=30, help='logins simultáneos')
+    parser.add_argument('--logins', type=int, default=3, help='logins por terminal')
+    parser.add_argument('--hilos', type=int, default=2, help='hilos del pool (PASSWORD_POOL_HILOS)')
+    parser.add_argument('--cola', type=int, default=16, help='cola del pool (PASSWORD_POOL_COLA)')
+    parser.add_argument('--espera', type=float, default=2, help='espera máxima por un cupo (PASSWORD_POOL_ESPERA)')
+    parser.add_argument('--solo', nargs='*', help='medir sólo estas configuraciones')
+    parser.add_argument('-o', '--salida', help='archivo JSON donde guardar los resultados')
+    args = parser.parse_args()
+
+    print(f"{args.terminales} terminales x {args.logins} logins, pool de {args.hilos} hilos + cola {args.cola}, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'configuración':<22}{'hash ms':>9}{'logins/s':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'rechazados':>12}")
+    resultados = {}
+    for nombre, fabrica in CONFIGURACIONES.items():
+        if args.solo and nombre not in args.solo:
+            continue
+        r = medir(fabrica(), args.terminales, args.logins, args.hilos, args.cola, args.espera)
+        resultados[nombre] = r
+        fila = f"{nombre:<22}{r['hash_ms']:>9.2f}{r['logins_por_s']:>10.1f}"
+        fila += ''.join(f"{r[f'p{p}_ms']:>9.1f}" if r[f'p{p}_ms'] is not None else f"{'-':>9}" for p in PERCENTILES)
+        print(fila + f"{r['rechazados']:>12}")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump({'parametros': vars(args), 'resultados': resultados}, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados guardados en {args.salida}")
+
+
+if __name__ == '__main__':
+    main()
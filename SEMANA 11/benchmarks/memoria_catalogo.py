@@ -0,0 +1,82 @@
+"""Memoria que ocupa el catálogo en memoria según la representación de cada producto.
+
+Compara, para N productos sintéticos:
+  - dict(sqlite3.Row) por producto
+  - la clase Producto anterior (atributos en __dict__)
+  - Producto con __slots__ (construido con Producto.desde_fila, que interna
+    las columnas repetidas)
+
+Uso (desde la carpeta del proyecto):
+    python -m benchmarks.memoria_catalogo 10000 100000 1000000
+"""
+import gc
+import sqlite3
+import sys
+import tracemalloc
+
+from models.producto import Producto
+
+MATERIALES = ('acero', 'acero inoxidable', 'bronce', 'galvanizado', 'nylon')
+ROSCAS = ('métrica', 'UNC', 'UNF', None)
+MEDIDAS = tuple(f'M{d}x{l}' for d in (4, 5, 6, 8, 10, 12) for l in (10, 20, 30, 40, 50))
+
+
+class ProductoConDict:
+    """Copia de la representación anterior de Producto (una __dict__ por instancia)."""
+
+    def __init__(self, *valores):
+        for columna, valor in zip(Producto.COLUMNAS, valores):
+            setattr(self, columna, valor)
+
+
+def base_sintetica(n):
+    """Crea una base en memoria con n productos."""
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"CREATE TABLE productos ({', '.join(Producto.COLUMNAS)})")
+    conn.executemany(
+        f"INSERT INTO productos VALUES ({', '.join('?' * len(Producto.COLUMNAS))})",
+        (
+            (i, f'PER-{i:07d}', f'Perno hexagonal {MEDIDAS[i % len(MEDIDAS)]} #{i}', None,
+             MATERIALES[i % len(MATERIALES)], ROSCAS[i % len(ROSCAS)], MEDIDAS[i % len(MEDIDAS)],
+             'unidad', round(0.05 + (i % 500) / 100, 2), round(0.10 + (i % 500) / 80, 2),
+             i % 300, 10, 1 + i % 20, 1 + i % 8)
+            for i in range(1, n + 1)
+        )
+    )
+    return conn
+
+
+def medir(construir, conn):
+    """Bytes que siguen asignados tras cargar el catálogo (diccionario por id), cadenas incluidas."""
+    gc.collect()
+    tracemalloc.start()
+    cursor = conn.execute(f"SELECT {', '.join(Producto.COLUMNAS)} FROM productos")
+    catalogo = {fila['id_producto']: construir(fila) for fila in cursor}
+    del cursor
+    actual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del catalogo
+    gc.collect()
+    return actual
+
+
+REPRESENTACIONES = (
+    ('dict(sqlite3.Row)', dict),
+    ('Producto con __dict__', lambda fila: ProductoConDict(*(fila[c] for c in Producto.COLUMNAS))),
+    ('Producto con __slots__', Producto.desde_fila),
+)
+
+
+def main(tamanos):
+    print(f"{'productos':>10} | " + ' | '.join(f'{nombre:>24}' for nombre, _ in REPRESENTACIONES))
+    for n in tamanos:
+        conn = base_sintetica(n)
+        resultados = [medir(construir, conn) for _, construir in REPRESENTACIONES]
+        conn.close()
+        print(f'{n:>10} | ' + ' | '.join(f'{r / 2**20:>20.1f} MiB' for r in resultados))
+        print(f"{'B/producto':>10} | " + ' | '.join(f'{r / n:>24.0f}' for r in resultados))
+
+
+if __name__ == '__main__':
+    main([int(n) for n in sys.argv[1:]] or [10_000, 100_000])
@@ -0,0 +1,285 @@
+"""Regresión de planes: EXPLAIN QUERY PLAN de todo el SQL que ejecuta la app.
+
+Recorre las rutas con el cliente de pruebas de Flask sobre una base
+sembrada, recoge cada sentencia que llega a SQLite (conexiones del pool y
+escritor de ventas) y pide su plan. Termina con código 1 si una sentencia
+de una ruta caliente (búsqueda, cobro, historial, listados):
+  - hace SCAN de una tabla grande sin índice (recorrido completo), o
+  - usa un B-tree temporal para el ORDER BY sobre una tabla grande,
+salvo que figure en PERMITIDOS con su motivo. Las demás rutas se informan
+pero no fallan. Los recorridos de un índice en orden ("SCAN ... USING
+INDEX", típicos de la primera página de un listado con LIMIT) no cuentan
+como scan.
+
+Uso (desde la carpeta del proyecto):
+    python -m benchmarks.dataset benchmarks/bench.db              # una vez
+    python -m benchmarks.planes benchmarks/bench.db               # -v: todos los planes
+
+/api/finalizar_venta escribe en la base: usar siempre una copia desechable.
+tests/test_planes.py ejecuta esta misma revisión con pytest sobre una base
+sintética pequeña.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sqlite3
+import sys
+import threading
+
+# Endpoints cuyo SQL no puede degradarse; el escritor de ventas trabaja para finalizar_venta
+RUTAS_CALIENTES = {
+    'buscar_productos_api', 'finalizar_venta', 'listar_productos', 'ver_historial_ventas',
+    'historial_ventas_api', 'listar_proveedores', 'dashboard', 'bajo_stock_api',
+    'catalogo_snapshot_api', 'catalogo_delta_api',
+}
+HILOS = {'escritor-ventas': 'finalizar_venta'}
+
+# Excepciones intencionales: (endpoint, regla 'scan' | 'orden', fragmento del SQL normalizado, motivo)
+PERMITIDOS = (
+    ('buscar_productos_api', 'orden', 'productos_fts MATCH',
+     'ordena por relevancia sólo las coincidencias del índice FTS, no el catálogo'),
+    ('listar_productos', 'orden', 'productos_fts MATCH',
+     'con filtro de búsqueda se ordenan las coincidencias de FTS; recorrer el índice por nombre sería peor'),
+    ('*', 'scan', 'id_proveedor, id_categoria FROM productos',
+     'carga perezosa del Inventario en memoria: una vez por worker'),
+    ('catalogo_snapshot_api', 'scan', 'FROM productos p ORDER BY p.id_producto',
+     'snapshot completo del catálogo para el POS: una vez por versión (cacheado); las cajas piden deltas'),
+)
+
+# Tablas con al menos estas filas se consideran grandes
+FILAS_TABLA_GRANDE = 1000
+
+_SENTENCIAS_SIN_PLAN = re.compile(r'^\s*(PRAGMA|BEGIN|COMMIT|END|ROLLBACK|SAVEPOINT|RELEASE|ANALYZE)\b', re.I)
+_LITERALES = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+# El alias va en un lookahead para no consumir el JOIN siguiente ("FROM a JOIN b x")
+_ORIGENES = re.compile(r'\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?=(?:\s+(?:AS\s+)?(\w+))?)', re.I)
+_NO_ALIAS = {'WHERE', 'LEFT', 'INNER', 'CROSS', 'JOIN', 'ON', 'USING', 'ORDER', 'GROUP', 'LIMIT',
+             'INDEXED', 'NOT', 'SET', 'VALUES', 'SELECT', 'DEFAULT', 'HAVING', 'UNION', 'AS'}
+_PASO = re.compile(r'^(SCAN|SEARCH) (\S+)(.*)$')
+
+
+def normalizar(sql):
+    """SQL sin literales ni espacios repetidos: agrupa las ejecuciones de una misma sentencia."""
+    return _LITERALES.sub('?', ' '.join(sql.split()))
+
+
+def alias_de(sql):
+    """{alias o nombre: tabla} de los FROM/JOIN/UPDATE/INTO de la sentencia."""
+    alias = {}
+    for tabla, nombre in _ORIGENES.findall(sql):
+        alias[tabla] = tabla
+        if nombre and nombre.upper() not in _NO_ALIAS:
+            alias[nombre] = tabla
+    return alias
+
+
+class Recolector:
+    """Observador de SQL: guarda la primera ejecución de cada sentencia, por endpoint."""
+
+    def __init__(self):
+        self.sentencias = {}  # (endpoint, sql normalizado) -> [sql expandido, ejecuciones]
+        self._lock = threading.Lock()
+
+    def __call__(self, sql):
+        # Sentencias anidadas (triggers, tablas sombra de FTS5) y control de transacciones
+        if sql.startswith('--') or "'main'." in sql or _SENTENCIAS_SIN_PLAN.match(sql):
+            return
+        from flask import has_request_context, request
+        if has_request_context():
+            ruta = request.endpoint or request.path
+        else:
+            nombre = threading.current_thread().name
+            ruta = HILOS.get(nombre, nombre)
+        clave = (ruta, normalizar(sql))
+        with self._lock:
+            entrada = self.sentencias.setdefault(clave, [sql, 0])
+            entrada[1] += 1
+
+
+def tamanos_tablas(conn):
+    tablas = [fila[0] for fila in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' AND sql NOT LIKE '%VIRTUAL%'")]
+    return {tabla: conn.execute(f'SELECT COUNT(*) FROM "{tabla}"').fetchone()[0] for tabla in tablas}
+
+
+def analizar(plan, sql, tamanos, umbral):
+    """Problemas del plan: [(regla, detalle)] con regla 'scan' u 'orden'."""
+    alias = alias_de(sql)
+    problemas, lee_tabla_grande = [], False
+    for linea in plan:
+        paso = _PASO.match(linea)
+        if not paso:
+            continue
+        tabla = alias.get(paso.group(2), paso.group(2))
+        if tamanos.get(tabla, 0) < umbral:
+            continue
+        lee_tabla_grande = True
+        if paso.group(1) == 'SCAN' and not paso.group(3).strip():
+            problemas.append(('scan', f'SCAN {tabla} ({tamanos[tabla]} filas)'))
+    if lee_tabla_grande:
+        problemas.extend(('orden', linea) for linea in plan
+                         if linea.startswith('USE TEMP B-TREE') and 'ORDER BY' in linea)
+    return problemas
+
+
+def permitido(ruta, regla, sql_normalizado):
+    for ruta_permitida, regla_permitida, fragmento, _ in PERMITIDOS:
+        if ruta_permitida in (ruta, '*') and regla_permitida == regla and fragmento in sql_normalizado:
+            return True
+    return False
+
+
+def recorrido(conn, rng):
+    """Peticiones (rol, función) que cubren las rutas y sus variantes de filtros y páginas."""
+    from database.paginacion import codificar_cursor
+
+    nombres = [fila[0] for fila in conn.execute(
+        "SELECT nombre_producto FROM productos ORDER BY random() LIMIT 20")]
+    codigos = [fila[0] for fila in conn.execute(
+        "SELECT codigo_producto FROM productos ORDER BY random() LIMIT 20")]
+    vendibles = [fila[0] for fila in conn.execute(
+        "SELECT id_producto FROM productos WHERE stock_actual >= 1000 LIMIT 50")]
+    producto = conn.execute(
+        "SELECT id_producto, nombre_producto FROM productos ORDER BY random() LIMIT 1").fetchone()
+    proveedor = conn.execute(
+        "SELECT id_proveedor, nombre_empresa FROM proveedores ORDER BY random() LIMIT 1").fetchone()
+    venta = conn.execute(
+        "SELECT id_venta, fecha_venta, cedula_cliente, id_empleado FROM ventas "
+        "WHERE cedula_cliente != '9999999999' ORDER BY random() LIMIT 1").fetchone()
+    id_categoria = conn.execute("SELECT id_categoria FROM categorias LIMIT 1").fetchone()[0]
+    version_catalogo = conn.execute("SELECT version FROM catalogo_version").fetchone()[0]
+
+    cursor_producto = codificar_cursor(producto[1:] + producto[:1])
+    cursor_proveedor = codificar_cursor(proveedor[1:] + proveedor[:1])
+    cursor_venta = codificar_cursor((venta[1], venta[0]))
+    dia = venta[1][:10]
+
+    def get(url, **query):
+        return lambda c: c.get(url, query_string=query)
+
+    peticiones = [
+        ('vendedor', get('/dashboard')),
+        ('vendedor', get('/api/bajo_stock')),
+        ('vendedor', get('/api/bajo_stock', proveedor=proveedor[0])),
+        ('vendedor', get('/api/bajo_stock', categoria=id_categoria)),
+        ('vendedor', get('/api/bajo_stock', proveedor=proveedor[0], categoria=id_categoria)),
+        ('vendedor', get('/punto_de_venta')),
+        ('vendedor', get('/api/catalogo/snapshot')),
+        ('vendedor', get('/api/catalogo/delta', since=max(0, version_catalogo - 50))),
+        ('vendedor', lambda c: c.post('/api/finalizar_venta', json={'carrito': [
+            {'id': id_producto, 'cantidad': 1} for id_producto in rng.sample(vendibles, 3)]})),
+        ('vendedor', lambda c: c.post('/api/finalizar_venta', json={'carrito': [
+            {'id': vendibles[0], 'cantidad': 10 ** 9}]})),
+    ]
+    for termino in [nombres[0], nombres[1].split()[0], codigos[0][:4], codigos[1]]:
+        peticiones.append(('vendedor', get('/api/buscar_productos', q=termino)))
+    for rol in ('admin', 'vendedor'):
+        peticiones += [
+            (rol, get('/productos')),
+            (rol, get('/productos', despues=cursor_producto)),
+            (rol, get('/productos', antes=cursor_producto)),
+            (rol, get('/productos', q=nombres[2].split()[0])),
+            (rol, get('/productos', q=codigos[2][:4], despues=cursor_producto)),
+            (rol, get('/proveedores')),
+            (rol, get('/proveedores', despues=cursor_proveedor)),
+            (rol, get('/proveedores', antes=cursor_proveedor)),
+        ]
+    for filtros in ({}, {'despues': cursor_venta}, {'antes': cursor_venta},
+                    {'desde': dia, 'hasta': dia}, {'empleado': venta[3]}, {'cliente': venta[2]},
+                    {'empleado': venta[3], 'desde': dia[:8] + '01', 'hasta': dia, 'despues': cursor_venta}):
+        peticiones.append(('admin', get('/historial_ventas', **filtros)))
+        peticiones.append(('vendedor', get('/api/historial_ventas', **filtros)))
+    peticiones += [
+        ('admin', get('/reportes')),
+        ('admin', get('/reportes', desde=dia[:8] + '01', hasta=dia)),
+        ('admin', get('/usuarios')),
+        ('admin', get('/productos/agregar')),
+        ('admin', get(f'/productos/editar/{producto[0]}')),
+        ('admin', get('/productos/exportar')),
+        ('admin', get('/api/monitoreo/inventario')),
+        ('admin', get('/metrics')),
+        ('admin', get('/monitoreo/consultas_lentas')),
+    ]
+    return peticiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('ruta', help='base generada con benchmarks.dataset')
+    parser.add_argument('--filas-grande', type=int, default=FILAS_TABLA_GRANDE,
+                        help='filas a partir de las cuales una tabla es grande')
+    parser.add_argument('--semilla', type=int, default=7)
+    parser.add_argument('-v', '--verbose', action='store_true', help='mostrar el plan de cada sentencia')
+    parser.add_argument('-o', '--salida', help='archivo JSON con las sentencias y sus planes')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.ruta):
+        sys.exit(f"No existe {args.ruta}; créala con: python -m benchmarks.dataset {args.ruta}")
+
+    # La app lee PERNOTODO_DB al importarse; el observador debe estar antes de abrir conexiones
+    os.environ['PERNOTODO_DB'] = args.ruta
+    from database.connection import observar_consultas
+    recolector = Recolector()
+    observar_consultas(recolector)
+    from app import app
+
+    conn = sqlite3.connect(args.ruta)
+    peticiones = recorrido(conn, random.Random(args.semilla))
+    usuarios = {'admin': 'admin@pernotodo.com', 'vendedor': 'vendedor@pernotodo.com'}
+    clientes = {}
+    for rol, email in usuarios.items():
+        clientes[rol] = app.test_client()
+        with clientes[rol].session_transaction() as sesion:
+            sesion['email'] = email
+    for rol, peticion in peticiones:
+        respuesta = peticion(clientes[rol])
+        if respuesta.status_code >= 500:
+            print(f"Aviso: {respuesta.request.path} respondió {respuesta.status_code}")
+
+    tamanos = tamanos_tablas(conn)
+    fallos, avisos, informe = [], [], []
+    for (ruta, sql_normalizado), (sql, ejecuciones) in sorted(recolector.sentencias.items()):
+        try:
+            plan = [fila[3] for fila in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+        except sqlite3.Error as e:
+            plan = [f'(sin plan: {e})']
+        caliente = ruta in RUTAS_CALIENTES
+        problemas = [(regla, detalle) for regla, detalle in analizar(plan, sql, tamanos, args.filas_grande)
+                     if not permitido(ruta, regla, sql_normalizado)]
+        for regla, detalle in problemas:
+            (fallos if caliente else avisos).append((ruta, regla, detalle, sql_normalizado))
+        informe.append({'ruta': ruta, 'caliente': caliente, 'sql': sql_normalizado,
+                        'ejecuciones': ejecuciones, 'plan': plan, 'problemas': problemas})
+        if args.verbose:
+            print(f"\n[{ruta}] x{ejecuciones}{'' if caliente else ' (no caliente)'}\n  {sql_normalizado}")
+            for linea in plan:
+                print(f"    {linea}")
+    conn.close()
+
+    rutas_vistas = {entrada['ruta'] for entrada in informe}
+    sin_sql = sorted(endpoint for endpoint in app.view_functions
+                     if endpoint not in rutas_vistas and endpoint != 'static')
+    print(f"\n{len(informe)} sentencias distintas en {len(rutas_vistas)} rutas/hilos "
+          f"(tablas grandes: >= {args.filas_grande} filas).")
+    print(f"Rutas sin SQL observado: {', '.join(sin_sql) or '-'}")
+
+    for titulo, lista in (('Avisos (rutas no calientes)', avisos), ('FALLOS (rutas calientes)', fallos)):
+        if lista:
+            print(f"\n{titulo}:")
+            for ruta, regla, detalle, sql_normalizado in lista:
+                print(f"  [{ruta}] {regla}: {detalle}\n      {sql_normalizado[:200]}")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False)
+        print(f"\nPlanes guardados en {args.salida}")
+
+    if fallos:
+        sys.exit(1)
+    print("\nSin regresiones de plan en las rutas calientes.")
+
+
+if __name__ == '__main__':
+    main()
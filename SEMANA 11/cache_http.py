@@ -0,0 +1,49 @@
+"""GET condicional (ETag / If-None-Match) a partir de versiones baratas de los datos.
+
+Las rutas de catálogo leen primero la versión de sus datos (catalogo_version
+o referencias_version: una lectura por clave primaria) y arman un ETag
+fuerte con esa versión, la ruta, los parámetros de la consulta y lo que
+cambie la respuesta según quién la pide (usuario, rol). Si el navegador o
+el POS ya tienen esa representación se responde 304 sin ejecutar las
+consultas ni renderizar la plantilla.
+
+Las respuestas llevan Cache-Control "private, no-cache": cada vista se
+revalida con el servidor, pero la repetida cuesta una lectura de versión.
+No se responde 304 si la sesión tiene mensajes flash pendientes: la
+plantilla es la que los muestra y los consume.
+"""
+import hashlib
+
+from flask import request, session, make_response
+
+
+def etag_de(nombre, version, *partes):
+    """ETag fuerte: '<nombre>-<version>-<hash de las partes>'."""
+    if isinstance(version, tuple):
+        version = '.'.join(map(str, version))
+    resumen = hashlib.blake2b(repr(partes).encode('utf-8'), digest_size=8).hexdigest()
+    return f'{nombre}-{version}-{resumen}'
+
+
+def no_modificada(etag, max_age=0):
+    """Respuesta 304 si el cliente ya tiene `etag`; None si hay que generar la respuesta."""
+    if request.method not in ('GET', 'HEAD') or '_flashes' in session:
+        return None
+    # Comparación débil: compresion.py convierte el ETag en W/"..." al comprimir
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    respuesta = make_response('', 304)
+    return con_etag(respuesta, etag, max_age)
+
+
+def con_etag(respuesta, etag, max_age=0):
+    """Añade el ETag y las cabeceras de caché privada a una respuesta (o a lo que devuelve una vista)."""
+    respuesta = make_response(respuesta)
+    respuesta.set_etag(etag)
+    respuesta.cache_control.private = True
+    if max_age:
+        respuesta.cache_control.max_age = max_age
+    else:
+        respuesta.cache_control.no_cache = True
+    respuesta.vary.add('Cookie')
+    return respuesta
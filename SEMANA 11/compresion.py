@@ -0,0 +1,178 @@
+"""Compresión gzip/brotli de las respuestas HTML, JSON y CSV según Accept-Encoding.
+
+El listado de productos, el historial y el punto de venta son páginas de
+decenas de KB de HTML muy repetitivo (filas de tabla), y el autocompletado
+del POS devuelve JSON en cada tecla; comprimidos viajan 5-10 veces más
+livianos, que es lo que se nota en las terminales con mala conexión.
+
+Se elige brotli si el cliente lo acepta y el paquete está instalado (es
+opcional), si no gzip. No se comprime:
+  - lo que ya trae Content-Encoding (estáticos precomprimidos de dist/)
+  - los archivos servidos con send_file (direct_passthrough)
+  - los cuerpos de menos de COMPRESION_MINIMO bytes o que no se achican
+  - tipos que no están en TIPOS_COMPRIMIBLES (imágenes, etc.)
+  - respuestas sin cuerpo (204, 304), parciales (206) o con no-transform
+
+Las respuestas en streaming (exportación CSV) se comprimen por partes sin
+cargarlas enteras en memoria. Los ETag fuertes pasan a débiles al comprimir
+(el cuerpo ya no es idéntico byte a byte); If-None-Match usa la comparación
+débil, así que los 304 de cache_http siguen funcionando.
+
+Los niveles se configuran con COMPRESION_NIVEL_GZIP (1-9) y
+COMPRESION_NIVEL_BROTLI (0-11); los valores por defecto son los que dan
+mejor relación tamaño/CPU según `python -m benchmarks.compresion`.
+"""
+import os
+import threading
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # opcional: sin él sólo se ofrece gzip
+    brotli = None
+
+ACTIVA = os.environ.get('COMPRESION', '1') != '0'
+NIVEL_GZIP = int(os.environ.get('COMPRESION_NIVEL_GZIP', 6))
+NIVEL_BROTLI = int(os.environ.get('COMPRESION_NIVEL_BROTLI', 4))
+MINIMO = int(os.environ.get('COMPRESION_MINIMO', 1024))
+
+TIPOS_COMPRIMIBLES = {
+    'text/html', 'text/plain', 'text/csv', 'text/css', 'text/javascript',
+    'application/json', 'application/javascript', 'image/svg+xml',
+}
+
+
+class Estadisticas:
+    """Bytes antes/después por codificación (para /metrics)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats = {'respuestas': 0, 'bytes_originales': 0, 'bytes_enviados': 0, 'omitidas_pequenas': 0}
+
+    def registrar(self, original, enviado):
+        with self._lock:
+            self.stats['respuestas'] += 1
+            self.stats['bytes_originales'] += original
+            self.stats['bytes_enviados'] += enviado
+
+    def omitida(self):
+        with self._lock:
+            self.stats['omitidas_pequenas'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats)
+
+
+estadisticas = Estadisticas()
+
+
+def compresor(codificacion, nivel=None):
+    """Objeto con process(bytes) -> bytes y flush() -> bytes para la codificación dada."""
+    if codificacion == 'br':
+        return _CompresorBrotli(NIVEL_BROTLI if nivel is None else nivel)
+    return _CompresorGzip(NIVEL_GZIP if nivel is None else nivel)
+
+
+class _CompresorGzip:
+    def __init__(self, nivel):
+        # wbits=31: formato gzip (cabecera y CRC), no zlib crudo
+        self._obj = zlib.compressobj(nivel, zlib.DEFLATED, 31)
+
+    def process(self, datos):
+        return self._obj.compress(datos)
+
+    def flush(self):
+        return self._obj.flush()
+
+
+class _CompresorBrotli:
+    def __init__(self, nivel):
+        self._obj = brotli.Compressor(quality=nivel)
+
+    def process(self, datos):
+        return self._obj.process(datos)
+
+    def flush(self):
+        return self._obj.finish()
+
+
+def comprimir(datos, codificacion, nivel=None):
+    c = compresor(codificacion, nivel)
+    return c.process(datos) + c.flush()
+
+
+def elegir_codificacion(aceptadas):
+    """'br', 'gzip' o None según el Accept-Encoding del cliente (respetando q=0)."""
+    if brotli is not None and aceptadas['br'] and aceptadas['br'] >= aceptadas['gzip']:
+        return 'br'
+    if aceptadas['gzip']:
+        return 'gzip'
+    return None
+
+
+def _en_partes(iterable, codificacion):
+    """Comprime un cuerpo en streaming; lo que el compresor suelta se envía enseguida."""
+    c = compresor(codificacion)
+    original = enviado = 0
+    try:
+        for parte in iterable:
+            if isinstance(parte, str):
+                parte = parte.encode('utf-8')
+            original += len(parte)
+            salida = c.process(parte)
+            if salida:
+                enviado += len(salida)
+                yield salida
+        salida = c.flush()
+        enviado += len(salida)
+        yield salida
+    finally:
+        if hasattr(iterable, 'close'):
+            iterable.close()
+        estadisticas.registrar(original, enviado)
+
+
+def comprimir_respuesta(response):
+    """Hook after_request: comprime la respuesta si conviene."""
+    if (request.method == 'HEAD'
+            or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in TIPOS_COMPRIMIBLES
+            or response.cache_control.no_transform):
+        return response
+
+    # El cuerpo depende del Accept-Encoding aunque esta vez no se comprima
+    response.vary.add('Accept-Encoding')
+    codificacion = elegir_codificacion(request.accept_encodings)
+    if codificacion is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _en_partes(response.response, codificacion)
+        response.headers.pop('Content-Length', None)
+    else:
+        datos = response.get_data()
+        if len(datos) < MINIMO:
+            estadisticas.omitida()
+            return response
+        comprimido = comprimir(datos, codificacion)
+        if len(comprimido) >= len(datos):
+            return response
+        response.set_data(comprimido)
+        estadisticas.registrar(len(datos), len(comprimido))
+
+    response.headers['Content-Encoding'] = codificacion
+    etag, debil = response.get_etag()
+    if etag and not debil:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_app(app):
+    """Registra la compresión. Registrarla antes que otros after_request la hace correr después."""
+    if ACTIVA:
+        app.after_request(comprimir_respuesta)
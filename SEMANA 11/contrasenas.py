@@ -0,0 +1,286 @@
+"""Hash de contraseñas intercambiable, con costo configurable y un pool acotado.
+
+El valor guardado en usuario.password_hash lleva el algoritmo y su costo:
+    scrypt$n=16384,r=8,p=1$<sal>$<hash>
+    pbkdf2_sha256$i=600000$<sal>$<hash>
+    $argon2id$v=19$m=65536,t=3,p=4$...      (si argon2-cffi está instalado)
+Los hashes antiguos (SHA-256 sin sal recortado a 24 caracteres) se siguen
+aceptando y se recalculan con el algoritmo actual en el siguiente login.
+
+Un hash con costo alto ocupa decenas de ms de CPU (y memoria, en scrypt).
+Con workers que atienden varias peticiones a la vez (gthread, como en
+render.yaml, o el modo ASGI), un pico de logins del cambio de turno
+calcularía todos esos hashes en paralelo y dejaría sin CPU a las demás
+rutas del proceso. Por eso se calculan en un pool de hilos acotado
+(hashlib libera el GIL en scrypt y PBKDF2) con un límite de cola: si está
+lleno se lanza PoolOcupado y la ruta responde 503 en lugar de acumular
+peticiones. Con workers sync (una petición por proceso) el pool nunca hace
+cola y no aporta nada.
+
+Configuración (variables de entorno):
+    PASSWORD_HASHER        scrypt | pbkdf2_sha256 | argon2id   (scrypt)
+    PASSWORD_SCRYPT_N      costo de scrypt, potencia de 2       (16384 -> 16 MiB con r=8)
+    PASSWORD_PBKDF2_ITER   iteraciones de PBKDF2                (600000)
+    PASSWORD_POOL_HILOS    hashes en paralelo por worker        (2)
+    PASSWORD_POOL_COLA     hashes en espera antes de rechazar   (16)
+    PASSWORD_POOL_ESPERA   segundos máximos esperando un cupo   (2)
+"""
+import base64
+import hashlib
+import hmac
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import argon2
+except ImportError:  # argon2-cffi es opcional
+    argon2 = None
+
+HASHER = os.environ.get('PASSWORD_HASHER', 'scrypt')
+SCRYPT_N = int(os.environ.get('PASSWORD_SCRYPT_N', 2 ** 14))
+PBKDF2_ITERACIONES = int(os.environ.get('PASSWORD_PBKDF2_ITER', 600_000))
+POOL_HILOS = int(os.environ.get('PASSWORD_POOL_HILOS', 2))
+POOL_COLA = int(os.environ.get('PASSWORD_POOL_COLA', 16))
+POOL_ESPERA = float(os.environ.get('PASSWORD_POOL_ESPERA', 2))
+
+BYTES_SAL = 16
+
+
+class PoolOcupado(Exception):
+    """No hay cupo en el pool de hash: demasiados logins a la vez en este worker."""
+
+
+def _b64(datos):
+    return base64.b64encode(datos).decode('ascii').rstrip('=')
+
+
+def _de_b64(texto):
+    return base64.b64decode(texto + '=' * (-len(texto) % 4))
+
+
+def _parametros(texto):
+    """'n=16384,r=8,p=1' -> {'n': 16384, 'r': 8, 'p': 1}."""
+    return {clave: int(valor) for clave, valor in (par.split('=') for par in texto.split(','))}
+
+
+# --- Algoritmos ---
+
+class HasherSHA256Legado:
+    """SHA-256 sin sal recortado a 24 caracteres: el formato anterior. Sólo verifica."""
+
+    nombre = 'sha256_24'
+
+    def calcular(self, password):
+        return hashlib.sha256(password.encode('utf-8')).hexdigest()[:24]
+
+    def reconoce(self, codificado):
+        return len(codificado) == 24 and '$' not in codificado
+
+    def verificar(self, password, codificado):
+        return hmac.compare_digest(self.calcular(password), codificado)
+
+    def necesita_rehash(self, codificado):
+        return True
+
+
+class HasherScrypt:
+    """scrypt de hashlib: costo en CPU y en memoria (128 * r * n bytes)."""
+
+    nombre = 'scrypt'
+
+    def __init__(self, n=SCRYPT_N, r=8, p=1):
+        self.n, self.r, self.p = n, r, p
+
+    def _derivar(self, password, sal, n, r, p):
+        return hashlib.scrypt(password.encode('utf-8'), salt=sal, n=n, r=r, p=p,
+                              maxmem=256 * r * n, dklen=32)
+
+    def calcular(self, password):
+        sal = os.urandom(BYTES_SAL)
+        clave = self._derivar(password, sal, self.n, self.r, self.p)
+        return f'scrypt$n={self.n},r={self.r},p={self.p}${_b64(sal)}${_b64(clave)}'
+
+    def reconoce(self, codificado):
+        return codificado.startswith('scrypt$')
+
+    def verificar(self, password, codificado):
+        _, parametros, sal, clave = codificado.split('$')
+        costo = _parametros(parametros)
+        calculada = self._derivar(password, _de_b64(sal), costo['n'], costo['r'], costo['p'])
+        return hmac.compare_digest(calculada, _de_b64(clave))
+
+    def necesita_rehash(self, codificado):
+        return codificado.split('$')[1] != f'n={self.n},r={self.r},p={self.p}'
+
+
+class HasherPBKDF2:
+    """PBKDF2-HMAC-SHA256 de hashlib: sólo costo en CPU."""
+
+    nombre = 'pbkdf2_sha256'
+
+    def __init__(self, iteraciones=PBKDF2_ITERACIONES):
+        self.iteraciones = iteraciones
+
+    def calcular(self, password):
+        sal = os.urandom(BYTES_SAL)
+        clave = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), sal, self.iteraciones)
+        return f'pbkdf2_sha256$i={self.iteraciones}${_b64(sal)}${_b64(clave)}'
+
+    def reconoce(self, codificado):
+        return codificado.startswith('pbkdf2_sha256$')
+
+    def verificar(self, password, codificado):
+        _, parametros, sal, clave = codificado.split('$')
+        calculada = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), _de_b64(sal),
+                                        _parametros(parametros)['i'])
+        return hmac.compare_digest(calculada, _de_b64(clave))
+
+    def necesita_rehash(self, codificado):
+        return codificado.split('$')[1] != f'i={self.iteraciones}'
+
+
+class HasherArgon2:
+    """Argon2id (argon2-cffi): costo en CPU y memoria, el recomendado si está disponible."""
+
+    nombre = 'argon2id'
+
+    def __init__(self, tiempo=3, memoria_kib=65536, paralelismo=1):
+        if argon2 is None:
+            raise RuntimeError("PASSWORD_HASHER=argon2id requiere el paquete argon2-cffi")
+        self._ph = argon2.PasswordHasher(time_cost=tiempo, memory_cost=memoria_kib, parallelism=paralelismo)
+
+    def calcular(self, password):
+        return self._ph.hash(password)
+
+    def reconoce(self, codificado):
+        return codificado.startswith('$argon2')
+
+    def verificar(self, password, codificado):
+        try:
+            return self._ph.verify(codificado, password)
+        except argon2.exceptions.VerificationError:
+            return False
+
+    def necesita_rehash(self, codificado):
+        return self._ph.check_needs_rehash(codificado)
+
+
+ALGORITMOS = {
+    'scrypt': HasherScrypt,
+    'pbkdf2_sha256': HasherPBKDF2,
+    'argon2id': HasherArgon2,
+}
+
+
+def crear_hasher(nombre=HASHER, **costo):
+    try:
+        clase = ALGORITMOS[nombre]
+    except KeyError:
+        raise ValueError(f"Algoritmo de contraseñas desconocido: {nombre!r} (opciones: {', '.join(ALGORITMOS)})")
+    return clase(**costo)
+
+
+class Contrasenas:
+    """Calcula con el hasher actual y verifica cualquier formato conocido."""
+
+    def __init__(self, hasher):
+        self.hasher = hasher
+        self.verificadores = [hasher, HasherScrypt(), HasherPBKDF2(), HasherSHA256Legado()]
+        if argon2 is not None and not isinstance(hasher, HasherArgon2):
+            self.verificadores.append(HasherArgon2())
+        # Se verifica contra este hash cuando el email no existe, para que tarde lo mismo
+        self._hash_senuelo = None
+
+    def calcular(self, password):
+        return self.hasher.calcular(password)
+
+    def _verificador(self, codificado):
+        for verificador in self.verificadores:
+            if verificador.reconoce(codificado):
+                return verificador
+        return None
+
+    def verificar(self, password, codificado):
+        """Devuelve (correcta, nuevo_hash): nuevo_hash no es None si hay que guardarlo recalculado."""
+        if not codificado:
+            if self._hash_senuelo is None:
+                self._hash_senuelo = self.hasher.calcular(os.urandom(BYTES_SAL).hex())
+            self.hasher.verificar(password, self._hash_senuelo)
+            return False, None
+
+        verificador = self._verificador(codificado)
+        try:
+            correcta = verificador is not None and verificador.verificar(password, codificado)
+        except (ValueError, KeyError, IndexError):
+            # Hash malformado en la base: se trata como contraseña incorrecta
+            return False, None
+        if not correcta:
+            return False, None
+        if verificador is not self.hasher or self.hasher.necesita_rehash(codificado):
+            return True, self.hasher.calcular(password)
+        return True, None
+
+
+# --- Pool acotado ---
+
+class PoolHash:
+    """Hilos dedicados al hash, con un máximo de trabajos en curso + en espera."""
+
+    def __init__(self, hilos=POOL_HILOS, max_cola=POOL_COLA, espera=POOL_ESPERA):
+        self.hilos = hilos
+        self.max_cola = max_cola
+        self.espera = espera
+        self.pid = os.getpid()
+        self._executor = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix='hash-contrasenas')
+        self._cupos = threading.BoundedSemaphore(hilos + max_cola)
+        self._lock = threading.Lock()
+        self.stats = {'ejecutados': 0, 'rechazados': 0, 'en_curso': 0, 'max_en_curso': 0}
+
+    def ejecutar(self, funcion, *args):
+        """Ejecuta funcion(*args) en el pool y espera su resultado; PoolOcupado si no hay cupo."""
+        if not self._cupos.acquire(timeout=self.espera):
+            with self._lock:
+                self.stats['rechazados'] += 1
+            raise PoolOcupado("Demasiados inicios de sesión simultáneos.")
+        with self._lock:
+            self.stats['en_curso'] += 1
+            self.stats['max_en_curso'] = max(self.stats['max_en_curso'], self.stats['en_curso'])
+        try:
+            return self._executor.submit(funcion, *args).result()
+        finally:
+            with self._lock:
+                self.stats['en_curso'] -= 1
+                self.stats['ejecutados'] += 1
+            self._cupos.release()
+
+    def snapshot(self):
+        with self._lock:
+            data = dict(self.stats)
+        data.update({'hilos': self.hilos, 'max_cola': self.max_cola, 'pid': self.pid})
+        return data
+
+
+_contrasenas = Contrasenas(crear_hasher())
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool_hash():
+    """Pool de hash del proceso actual (se recrea tras un fork de gunicorn)."""
+    global _pool
+    if _pool is None or _pool.pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool.pid != os.getpid():
+                _pool = PoolHash()
+    return _pool
+
+
+def calcular_hash(password):
+    """Hash de `password` con el algoritmo configurado, calculado en el pool."""
+    return get_pool_hash().ejecutar(_contrasenas.calcular, password)
+
+
+def verificar_password(password, codificado):
+    """(correcta, nuevo_hash) calculado en el pool; ver Contrasenas.verificar."""
+    return get_pool_hash().ejecutar(_contrasenas.verificar, password, codificado)
@@ -0,0 +1,67 @@
+"""Acceso a la base desde corrutinas (modo ASGI) sin bloquear el event loop.
+
+sqlite3 no tiene API asíncrona, así que cada operación corre en un pool de
+hilos propio (DB_ASYNC_HILOS, por defecto del tamaño del pool de conexiones)
+con una conexión del pool prestada sólo mientras dura esa llamada: una
+petición que después espera otra cosa (la confirmación del escritor de
+ventas) no retiene ni hilo ni conexión.
+
+Las funciones se ejecutan con una copia del contexto de la corrutina
+(contextvars), así que dentro de ellas siguen disponibles request, session
+y g de Flask, y las métricas de SQL se acumulan en la petición correcta.
+"""
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from database.connection import POOL_SIZE, get_pool
+
+ASYNC_HILOS = int(os.environ.get('DB_ASYNC_HILOS', POOL_SIZE))
+
+
+class BaseAsincrona:
+    """Ejecuta funciones bloqueantes de base de datos en hilos y las espera con await."""
+
+    def __init__(self, hilos=ASYNC_HILOS):
+        self.hilos = hilos
+        self.pid = os.getpid()
+        self._executor = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix='db-async')
+
+    async def en_hilo(self, funcion, *args):
+        """Ejecuta `funcion(*args)` en un hilo del pool con el contexto actual."""
+        contexto = contextvars.copy_context()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(contexto.run, funcion, *args))
+
+    async def ejecutar(self, funcion, *args):
+        """Ejecuta `funcion(conn, *args)` en un hilo con una conexión prestada del pool."""
+        return await self.en_hilo(self._con_conexion, funcion, args)
+
+    async def consultar(self, sql, parametros=()):
+        """fetchall() de una consulta."""
+        return await self.ejecutar(lambda conn: conn.execute(sql, parametros).fetchall())
+
+    def _con_conexion(self, funcion, args):
+        pool = get_pool()
+        conn = pool.acquire()
+        try:
+            return funcion(conn, *args)
+        finally:
+            pool.release(conn)
+
+
+_base = None
+_base_lock = threading.Lock()
+
+
+def get_base_asincrona():
+    """BaseAsincrona del proceso actual (se recrea tras un fork)."""
+    global _base
+    if _base is None or _base.pid != os.getpid():
+        with _base_lock:
+            if _base is None or _base.pid != os.getpid():
+                _base = BaseAsincrona()
+    return _base
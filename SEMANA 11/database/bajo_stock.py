@@ -0,0 +1,51 @@
+"""Alertas de stock bajo (stock_actual < stock_minimo).
+
+Un índice parcial guarda sólo los productos por debajo del mínimo, ordenados
+por (stock_actual - stock_minimo): el más negativo es el de mayor déficit.
+Las consultas de este módulo repiten exactamente la condición del índice para
+que SQLite lo use, así que su costo depende de cuántos productos están bajo
+mínimo y no del tamaño del catálogo.
+"""
+
+CONDICION_BAJO_STOCK = "p.stock_actual < p.stock_minimo"
+
+
+def _filtros(id_proveedor, id_categoria):
+    condiciones = [CONDICION_BAJO_STOCK]
+    params = []
+    if id_proveedor is not None:
+        condiciones.append("p.id_proveedor = ?")
+        params.append(id_proveedor)
+    if id_categoria is not None:
+        condiciones.append("p.id_categoria = ?")
+        params.append(id_categoria)
+    return ' AND '.join(condiciones), params
+
+
+def productos_bajo_stock(conn, id_proveedor=None, id_categoria=None, limite=None):
+    """Productos bajo mínimo ordenados por déficit (mayor primero), con proveedor y categoría."""
+    where_sql, params = _filtros(id_proveedor, id_categoria)
+    sql = f"""
+        SELECT p.id_producto, p.codigo_producto, p.nombre_producto, p.stock_actual, p.stock_minimo,
+               p.stock_minimo - p.stock_actual AS deficit,
+               p.id_proveedor, prov.nombre_empresa AS nombre_proveedor,
+               p.id_categoria, c.nombre_categoria
+        FROM productos p INDEXED BY idx_productos_bajo_stock
+        LEFT JOIN proveedores prov ON prov.id_proveedor = p.id_proveedor
+        LEFT JOIN categorias c ON c.id_categoria = p.id_categoria
+        WHERE {where_sql}
+        ORDER BY p.stock_actual - p.stock_minimo, p.id_producto
+    """
+    if limite is not None:
+        sql += " LIMIT ?"
+        params.append(limite)
+    return conn.execute(sql, params).fetchall()
+
+
+def contar_bajo_stock(conn, id_proveedor=None, id_categoria=None):
+    """Cuántos productos están bajo mínimo (recorre sólo el índice parcial)."""
+    where_sql, params = _filtros(id_proveedor, id_categoria)
+    return conn.execute(
+        f"SELECT COUNT(*) FROM productos p INDEXED BY idx_productos_bajo_stock WHERE {where_sql}",
+        params
+    ).fetchone()[0]
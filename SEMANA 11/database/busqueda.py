@@ -0,0 +1,99 @@
+"""Índice de búsqueda FTS5 (tokenizador trigram) sobre la tabla productos.
+
+El índice es una tabla "external content": no duplica los datos, sólo guarda
+los trigramas de codigo_producto, nombre_producto, descripcion, material y
+medida. Los triggers lo mantienen sincronizado con cada INSERT/UPDATE/DELETE.
+"""
+
+# Columnas de productos_fts (migración 0002)
+COLUMNAS_INDICE = ('codigo_producto', 'nombre_producto', 'descripcion', 'material', 'medida')
+
+# Pesos bm25 por columna (mismo orden que COLUMNAS_INDICE)
+PESOS_BM25 = (10.0, 5.0, 1.0, 1.0, 1.0)
+
+# El tokenizador trigram no puede buscar términos de menos de 3 caracteres
+MIN_TRIGRAMA = 3
+
+
+def reconstruir_indice(conn):
+    """Reconstruye el índice completo a partir de la tabla productos."""
+    conn.execute("INSERT INTO productos_fts(productos_fts) VALUES ('rebuild')")
+    conn.execute("INSERT INTO productos_fts(productos_fts) VALUES ('optimize')")
+    conn.commit()
+
+
+def _separar_terminos(texto):
+    """Divide la consulta en términos indexables (>= 3 caracteres) y términos cortos."""
+    largos, cortos = [], []
+    for termino in texto.split():
+        (largos if len(termino) >= MIN_TRIGRAMA else cortos).append(termino)
+    return largos, cortos
+
+
+def expresion_match(terminos):
+    """Arma la expresión MATCH: cada término como frase entre comillas, unidos con AND."""
+    return ' '.join('"' + t.replace('"', '""') + '"' for t in terminos)
+
+
+def condicion_busqueda(texto, alias='p'):
+    """Devuelve (sql, params) para filtrar productos por texto en un WHERE.
+
+    Los términos de 3 o más caracteres se resuelven con el índice FTS; los
+    más cortos se filtran con LIKE sobre código y nombre.
+    """
+    largos, cortos = _separar_terminos(texto)
+    condiciones, params = [], []
+
+    if largos:
+        condiciones.append(
+            f"{alias}.id_producto IN (SELECT rowid FROM productos_fts WHERE productos_fts MATCH ?)")
+        params.append(expresion_match(largos))
+
+    for termino in cortos:
+        condiciones.append(f"({alias}.codigo_producto LIKE ? OR {alias}.nombre_producto LIKE ?)")
+        params.extend(['%' + termino + '%'] * 2)
+
+    return ' AND '.join(condiciones) or '1', params
+
+
+def buscar_productos(conn, texto, limite=10):
+    """Busca productos para el POS ordenados por relevancia.
+
+    Primero la coincidencia exacta de código, luego los códigos que empiezan
+    con el texto y por último el ranking bm25 del índice.
+    """
+    largos, cortos = _separar_terminos(texto)
+    codigo = texto.strip().upper()
+    columnas = "p.id_producto, p.codigo_producto, p.nombre_producto, p.precio_venta, p.stock_actual"
+
+    if not largos:
+        # Consulta demasiado corta para trigramas: LIKE sobre código y nombre
+        where, params = condicion_busqueda(texto)
+        return conn.execute(
+            f"""
+            SELECT {columnas} FROM productos p
+            WHERE {where}
+            ORDER BY (p.codigo_producto = ?) DESC, (p.codigo_producto LIKE ?) DESC, p.nombre_producto
+            LIMIT ?
+            """,
+            (*params, codigo, codigo + '%', limite)
+        ).fetchall()
+
+    filtro_corto, params_cortos = '', []
+    for termino in cortos:
+        filtro_corto += " AND (p.codigo_producto LIKE ? OR p.nombre_producto LIKE ?)"
+        params_cortos.extend(['%' + termino + '%'] * 2)
+
+    pesos = ', '.join(str(p) for p in PESOS_BM25)
+    return conn.execute(
+        f"""
+        SELECT {columnas}
+        FROM productos_fts
+        JOIN productos p ON p.id_producto = productos_fts.rowid
+        WHERE productos_fts MATCH ?{filtro_corto}
+        ORDER BY (p.codigo_producto = ?) DESC, (p.codigo_producto LIKE ?) DESC,
+                 bm25(productos_fts, {pesos})
+        LIMIT ?
+        """,
+        (expresion_match(largos), *params_cortos, codigo, codigo + '%', limite)
+    ).fetchall()
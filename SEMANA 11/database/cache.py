@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheLRU:
+    """Caché LRU acotada con TTL, invalidada por versión de datos.
+
+    Cada lectura recibe la versión actual de los datos de origen (por ejemplo
+    catalogo_version); si cambió desde la última vez, la caché se vacía
+    completa antes de responder. Es segura entre hilos del mismo worker.
+    """
+
+    def __init__(self, max_items=512, ttl=60):
+        self.max_items = max_items
+        self.ttl = ttl
+        self.version = None
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0, 'invalidations': 0}
+
+    def _sincronizar_version(self, version):
+        if version != self.version:
+            if self._datos:
+                self.stats['invalidations'] += 1
+            self._datos.clear()
+            self.version = version
+
+    def get(self, clave, version):
+        """Devuelve el valor guardado o None si no está, expiró o la versión cambió."""
+        with self._lock:
+            self._sincronizar_version(version)
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                self.stats['misses'] += 1
+                return None
+
+            valor, expira = entrada
+            if expira < time.monotonic():
+                del self._datos[clave]
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+
+            self._datos.move_to_end(clave)
+            self.stats['hits'] += 1
+            return valor
+
+    def set(self, clave, valor, version):
+        with self._lock:
+            self._sincronizar_version(version)
+            self._datos[clave] = (valor, time.monotonic() + self.ttl)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_items:
+                self._datos.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def descartar(self, clave):
+        """Elimina una sola entrada (si existe)."""
+        with self._lock:
+            if self._datos.pop(clave, None) is not None:
+                self.stats['invalidations'] += 1
+
+    def invalidar(self):
+        """Vacía la caché de inmediato (cambios hechos por este mismo worker)."""
+        with self._lock:
+            if self._datos:
+                self.stats['invalidations'] += 1
+            self._datos.clear()
+            self.version = None
+
+    def snapshot(self):
+        with self._lock:
+            data = dict(self.stats)
+            data.update({'items': len(self._datos), 'max_items': self.max_items,
+                         'ttl': self.ttl, 'version': self.version})
+        return data
+
+
+def normalizar_consulta(texto):
+    """Clave de caché para una búsqueda: minúsculas y espacios colapsados."""
+    return ' '.join(texto.lower().split())
@@ -0,0 +1,68 @@
+"""Catálogo del POS para búsqueda local: snapshot versionado y deltas.
+
+El POS descarga una vez el catálogo vendible (id, código, nombre, precio,
+stock y las columnas de texto que indexa productos_fts) con la versión de
+catalogo_version en que se leyó, lo guarda en el navegador y busca ahí sin
+ir al servidor. Después pide sólo lo que cambió desde su versión:
+catalogo_cambios guarda para cada producto la última versión en que cambió
+(y si fue eliminado), así que el delta es una lectura por el índice de
+versión más las filas afectadas.
+
+Se incluyen todos los productos, también los que no tienen stock: una venta
+o una reposición sólo cambia el stock de la fila, y el POS ya deshabilita
+los productos agotados.
+
+La versión se lee ANTES que las filas: si entre ambas lecturas cambia algo,
+la fila llega ya actualizada y vuelve a llegar en el próximo delta
+(aplicarla dos veces no tiene efecto). Al revés se podrían perder cambios.
+"""
+import json
+
+from database.version_catalogo import leer_version_catalogo
+
+# descripcion, material y medida van para que la búsqueda local cubra las mismas columnas que el índice FTS
+COLUMNAS = ('id', 'codigo', 'nombre', 'precio', 'stock', 'descripcion', 'material', 'medida')
+
+_SELECT = ("p.id_producto, p.codigo_producto, p.nombre_producto, p.precio_venta, p.stock_actual, "
+           "p.descripcion, p.material, p.medida")
+
+
+def _fila(row):
+    return [row[0], row[1], row[2], float(row[3]), row[4], row[5] or '', row[6] or '', row[7] or '']
+
+
+def snapshot_catalogo(conn, version=None):
+    """{'version', 'columnas', 'filas'}: el catálogo completo en arreglos (más compacto que dicts)."""
+    if version is None:
+        version = leer_version_catalogo(conn)
+    filas = [_fila(row) for row in conn.execute(f"SELECT {_SELECT} FROM productos p ORDER BY p.id_producto")]
+    return {'version': version, 'columnas': list(COLUMNAS), 'filas': filas}
+
+
+def delta_catalogo(conn, desde, version=None):
+    """{'version', 'desde', 'columnas', 'filas', 'eliminados'} con lo cambiado después de `desde`.
+
+    Devuelve None si `desde` es posterior a la versión actual (la base se
+    restauró o se recreó): el cliente debe volver a pedir el snapshot.
+    """
+    if version is None:
+        version = leer_version_catalogo(conn)
+    if desde > version:
+        return None
+    filas, eliminados = [], []
+    if desde < version:
+        for row in conn.execute(f"""
+            SELECT c.id_producto, c.eliminado, {_SELECT}
+            FROM catalogo_cambios c
+            LEFT JOIN productos p ON p.id_producto = c.id_producto
+            WHERE c.version > ?
+        """, (desde,)):
+            if row[1] or row[2] is None:
+                eliminados.append(row[0])
+            else:
+                filas.append(_fila(row[2:]))
+    return {'version': version, 'desde': desde, 'columnas': list(COLUMNAS), 'filas': filas, 'eliminados': eliminados}
+
+
+def como_json(datos):
+    return json.dumps(datos, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
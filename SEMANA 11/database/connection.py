@@ -1,97 +1,316 @@
 import sqlite3
 import os
+import queue
+import threading
+import time
+
+from flask import g, has_app_context
+
+from database.migraciones import migrar, version_objetivo
+
+# Define la ruta de la base de datos (PERNOTODO_DB permite apuntar a otra copia)
+DATABASE = os.environ.get('PERNOTODO_DB', os.path.join(os.path.dirname(__file__), 'pernotodo.db'))
+
+# --- Configuración del pool de conexiones (por proceso / worker de gunicorn) ---
+POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 8))
+POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 5))
+
+# PRAGMAs que se aplican UNA sola vez, al crear cada conexión del pool
+PRAGMAS = {
+    'journal_mode': os.environ.get('DB_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('DB_SYNCHRONOUS', 'NORMAL'),
+    'cache_size': int(os.environ.get('DB_CACHE_SIZE', -16000)),     # negativo = KiB (16 MB)
+    'mmap_size': int(os.environ.get('DB_MMAP_SIZE', 64 * 1024 * 1024)),
+    'busy_timeout': int(os.environ.get('DB_BUSY_TIMEOUT_MS', 5000)),
+    # Ordenamientos y tablas temporales (GROUP BY, ORDER BY sin índice) en memoria, no en disco
+    'temp_store': os.environ.get('DB_TEMP_STORE', 'MEMORY'),
+    # Desactivadas como siempre: con ON, borrar un producto, proveedor o usuario con filas
+    # relacionadas (ventas, productos) falla con IntegrityError en lugar de borrarse
+    'foreign_keys': os.environ.get('DB_FOREIGN_KEYS', 'OFF'),
+}
+
+
+# Funciones que reciben el texto de cada sentencia SQL ejecutada (benchmarks, métricas).
+# Sólo se instala el trace callback si hay alguna registrada al abrir la conexión.
+_observadores_sql = []
+
+
+def observar_consultas(funcion):
+    """Registra `funcion(sql)` para las conexiones que se abran a partir de ahora."""
+    _observadores_sql.append(funcion)
+
+
+def _notificar_sql(sql):
+    for funcion in _observadores_sql:
+        funcion(sql)
+
+
+def apply_pragmas(conn, pragmas=None):
+    """Aplica los PRAGMAs configurados (y los observadores de SQL) a una conexión recién abierta."""
+    for pragma, value in (PRAGMAS if pragmas is None else pragmas).items():
+        conn.execute(f"PRAGMA {pragma} = {value}")
+    if _observadores_sql:
+        conn.set_trace_callback(_notificar_sql)
+
+
+# Funciones que reciben cada execute/executemany hecho con conexiones del pool
+_medidores_sql = []
+
+
+def medir_consultas(funcion):
+    """Registra `funcion(conn, sql, parametros, segundos)` para cada sentencia de una conexión del pool.
+
+    En executemany, `parametros` es None (la secuencia puede ser un generador ya consumido).
+    """
+    _medidores_sql.append(funcion)
+
+
+def _registrar_duracion(conn, sql, parametros, inicio):
+    if _medidores_sql:
+        duracion = time.perf_counter() - inicio
+        for funcion in _medidores_sql:
+            funcion(conn, sql, parametros, duracion)
+
+
+class CursorMedido(sqlite3.Cursor):
+    """Cursor que informa la duración de cada sentencia a los medidores registrados."""
+
+    def execute(self, sql, parameters=()):
+        inicio = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _registrar_duracion(self.connection, sql, parameters, inicio)
+
+    def executemany(self, sql, seq_of_parameters):
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _registrar_duracion(self.connection, sql, None, inicio)
+
+
+class PooledConnection(sqlite3.Connection):
+    """Conexión que vuelve al pool en lugar de cerrarse.
+
+    Las rutas siguen llamando a db.close() como antes; mientras la conexión
+    esté prestada a una petición, close() no hace nada y es el teardown de
+    Flask quien la devuelve al pool.
+    """
+
+    pooled = False
+
+    def cursor(self, factory=CursorMedido):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        inicio = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _registrar_duracion(self, sql, parameters, inicio)
+
+    def executemany(self, sql, seq_of_parameters):
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _registrar_duracion(self, sql, None, inicio)
+
+    def close(self):
+        if not self.pooled:
+            super().close()
+
+    def close_for_real(self):
+        super().close()
+
+
+class ConnectionPool:
+    """Pool acotado de conexiones SQLite con health check y estadísticas."""
+
+    def __init__(self, database, size=POOL_SIZE, timeout=POOL_TIMEOUT, pragmas=None):
+        self.database = database
+        self.size = size
+        self.timeout = timeout
+        self.pragmas = dict(PRAGMAS if pragmas is None else pragmas)
+        self.pid = os.getpid()
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self._created = 0
+        self.stats = {
+            'created': 0,
+            'reused': 0,
+            'checkouts': 0,
+            'in_use': 0,
+            'waits': 0,
+            'wait_time_ms': 0.0,
+            'discarded': 0,
+            'timeouts': 0,
+        }
+
+    def _connect(self):
+        conn = sqlite3.connect(self.database, factory=PooledConnection, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        apply_pragmas(conn, self.pragmas)
+        conn.pooled = True
+        return conn
+
+    def _healthy(self, conn):
+        try:
+            # Sin pasar por PooledConnection.execute: el ping no es SQL de la petición y no debe
+            # sumar en las métricas por ruta ni en el registro de consultas lentas
+            sqlite3.Connection.execute(conn, "SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _contar(self, **incrementos):
+        # Las peticiones de todos los hilos actualizan los contadores: += fuera del lock pierde cuentas
+        with self._lock:
+            for clave, valor in incrementos.items():
+                self.stats[clave] += valor
+
+    def acquire(self):
+        """Entrega una conexión sana; espera hasta `timeout` si el pool está agotado."""
+        conn = None
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                if self._created < self.size:
+                    self._created += 1
+                    self.stats['created'] += 1
+                    try:
+                        conn = self._connect()
+                    except sqlite3.Error:
+                        self._created -= 1
+                        raise
+            if conn is None:
+                inicio = time.perf_counter()
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    self._contar(waits=1, timeouts=1, wait_time_ms=(time.perf_counter() - inicio) * 1000)
+                    raise sqlite3.OperationalError(
+                        f"Pool de conexiones agotado ({self.size}) tras {self.timeout}s de espera")
+                self._contar(waits=1, wait_time_ms=(time.perf_counter() - inicio) * 1000)
+        else:
+            self._contar(reused=1)
+
+        if not self._healthy(conn):
+            self._discard(conn)
+            return self.acquire()
+
+        self._contar(checkouts=1, in_use=1)
+        return conn
+
+    def release(self, conn):
+        """Devuelve la conexión al pool, descartando cualquier transacción abierta."""
+        self._contar(in_use=-1)
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            self._discard(conn)
+
+    def _discard(self, conn):
+        with self._lock:
+            self.stats['discarded'] += 1
+            self._created -= 1
+        try:
+            conn.close_for_real()
+        except sqlite3.Error:
+            pass
+
+    def close_all(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    def snapshot(self):
+        """Estadísticas del pool para monitoreo."""
+        with self._lock:
+            data = dict(self.stats)
+            abiertas = self._created
+        data.update({
+            'size': self.size,
+            'open': abiertas,
+            'idle': self._idle.qsize(),
+            'pid': self.pid,
+        })
+        return data
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Pool del proceso actual (se recrea tras un fork de gunicorn)."""
+    global _pool
+    if _pool is None or _pool.pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool.pid != os.getpid():
+                _pool = ConnectionPool(DATABASE)
+    return _pool
 
-# Define la ruta de la base de datos
-DATABASE = os.path.join(os.path.dirname(__file__), 'pernotodo.db')
 
 def get_db():
-    """Establece la conexión a la base de datos y configura row_factory."""
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row 
-    return conn
+    """Devuelve la conexión de la petición actual (una por petición, tomada del pool).
+
+    Fuera de un contexto de Flask (scripts, init_db) se abre una conexión
+    independiente que sí se cierra con close().
+    """
+    if not has_app_context():
+        conn = sqlite3.connect(DATABASE)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    if 'db' not in g:
+        g.db = get_pool().acquire()
+    return g.db
+
+
+# Alias usado por las clases de models/
+get_db_connection = get_db
+
+
+def close_db(exception=None):
+    """Devuelve la conexión de la petición al pool (registrado como teardown)."""
+    db = g.pop('db', None)
+    if db is not None:
+        get_pool().release(db)
 
-def init_db():
-    """Crea tablas si no existen, añade columnas faltantes (ALTER TABLE) y garantiza la integridad de los datos."""
+
+def init_app(app):
+    """Registra el teardown que libera la conexión al terminar cada petición."""
+    app.teardown_appcontext(close_db)
+
+
+def init_db(verbose=False):
+    """Lleva el esquema a la última versión (database/migraciones).
+
+    Si la base ya está al día (PRAGMA user_version) no hace nada más que esa lectura.
+    """
     db = get_db()
-    cursor = db.cursor()
-    
-    # 1. Asegurar que la tabla de productos existe
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS productos (
-            id_producto INTEGER PRIMARY KEY AUTOINCREMENT,
-            codigo_producto VARCHAR(20) NOT NULL UNIQUE,
-            nombre_producto VARCHAR(150) NOT NULL,
-            descripcion TEXT,
-            material VARCHAR(50) NOT NULL,
-            tipo_rosca VARCHAR(30),
-            medida VARCHAR(20) NOT NULL,
-            unidad_medida VARCHAR(10) DEFAULT 'unidad',
-            precio_compra DECIMAL(10,2) NOT NULL,
-            precio_venta DECIMAL(10,2) NOT NULL,
-            stock_actual INTEGER DEFAULT 0,
-            stock_minimo INTEGER DEFAULT 10,
-            id_proveedor INTEGER,
-            id_categoria INTEGER,
-            fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            fecha_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (id_proveedor) REFERENCES proveedores(id_proveedor),
-            FOREIGN KEY (id_categoria) REFERENCES categorias(id_categoria)
-        );
-    """)
-    
-    # 2. Inicializar la tabla usuario si NO existe (basado en el error, asumimos que tenía 'password')
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS usuario (
-            id_usuario INTEGER PRIMARY KEY AUTOINCREMENT,
-            email TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL -- Asumimos que esta columna es la que causa el error NOT NULL
-        );
-    """)
-
-    # 3. MIGRACIÓN DE ESQUEMA (Añadir columnas sin perder datos)
-    
     try:
-        # Añade la columna 'password_hash' (si no existe)
-        cursor.execute("ALTER TABLE usuario ADD COLUMN password_hash TEXT")
-    except sqlite3.OperationalError:
-        pass 
-    
-    try:
-        # Añade la columna 'nombre' (si no existe)
-        cursor.execute("ALTER TABLE usuario ADD COLUMN nombre VARCHAR(100) DEFAULT 'Usuario'")
-    except sqlite3.OperationalError:
-        pass
-    
-    try:
-        # Añade la columna 'role' (si no existe)
-        cursor.execute("ALTER TABLE usuario ADD COLUMN role VARCHAR(20) DEFAULT 'Vendedor'")
-    except sqlite3.OperationalError:
-        pass
-    
-    db.commit()
-
-    # 4. Insertar usuarios de prueba (SOLUCIÓN AL INTEGRITY ERROR)
-    # Ahora el INSERT incluye la columna 'password' (la quinta ?) para cumplir con la restricción NOT NULL.
-    
-    INSERT_QUERY = "INSERT INTO usuario (email, password_hash, nombre, role, password) VALUES (?, ?, ?, ?, ?)"
-    
-    # Usuario Administrador
-    cursor.execute("SELECT id_usuario FROM usuario WHERE email = 'admin@pernotodo.com'")
-    if cursor.fetchone() is None:
-        # Usamos '12345' para password_hash Y para la columna antigua 'password'
-        cursor.execute(INSERT_QUERY, 
-                       ('admin@pernotodo.com', '12345', 'Juan Administrador', 'Administrador', '12345'))
-    
-    # Usuario Vendedor
-    cursor.execute("SELECT id_usuario FROM usuario WHERE email = 'vendedor@pernotodo.com'")
-    if cursor.fetchone() is None:
-        cursor.execute(INSERT_QUERY, 
-                       ('vendedor@pernotodo.com', '12345', 'Maria Vendedora', 'Vendedor', '12345'))
-        
-    db.commit()
-    db.close()
+        return migrar(db, verbose=verbose)
+    finally:
+        db.close()
+
 
 if __name__ == '__main__':
     os.makedirs(os.path.dirname(DATABASE), exist_ok=True)
-    init_db()
-    print("Base de datos 'pernotodo.db' inicializada y tablas actualizadas.")
\ No newline at end of file
+    aplicadas = init_db(verbose=True)
+    if aplicadas:
+        print(f"Base de datos {DATABASE} migrada a la versión {aplicadas[-1]}.")
+    else:
+        print(f"Base de datos {DATABASE} ya está en la versión {version_objetivo()}.")
\ No newline at end of file
@@ -0,0 +1,199 @@
+"""Registro de consultas lentas con su EXPLAIN QUERY PLAN.
+
+Cada sentencia de una conexión del pool que tarda más que el umbral
+(DB_SLOW_QUERY_MS) se escribe como una línea JSON en un log rotativo, con:
+  - el SQL normalizado y la "forma" de los parámetros (tipos y largos, nunca
+    los valores: pueden ser cédulas, emails o hashes)
+  - la ruta (endpoint) que la ejecutó y el tiempo en ms
+  - el plan de EXPLAIN QUERY PLAN, marcando los SCAN sin índice
+
+El plan de una misma sentencia se calcula como máximo una vez cada
+INTERVALO_PLAN segundos por worker, para no agravar una consulta que ya es
+lenta; se guardan los planes de las MAX_PLANES sentencias más recientes
+(las listas IN (...) y VALUES de largo variable generan SQL distintos).
+
+Cada worker escribe en su propio archivo (consultas_lentas.<pid>.log): si
+todos rotaran el mismo archivo, cada proceso lo haría por su cuenta y se
+perderían o duplicarían líneas. leer_registro junta los de todos. Los
+archivos sin cambios en DIAS_LOG días (workers de despliegues anteriores)
+se borran al arrancar.
+La duración medida es la del execute (hasta la primera fila), que en
+consultas con ORDER BY/GROUP BY incluye todo el trabajo de ordenación.
+"""
+import collections
+import glob
+import json
+import logging
+import logging.handlers
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from flask import request, has_request_context
+
+from database.cache import CacheLRU
+from database.connection import medir_consultas
+
+UMBRAL_MS = float(os.environ.get('DB_SLOW_QUERY_MS', 100))
+ARCHIVO_LOG = os.environ.get(
+    'DB_SLOW_QUERY_LOG', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs', 'consultas_lentas.log'))
+MAX_BYTES_LOG = int(os.environ.get('DB_SLOW_QUERY_LOG_BYTES', 5 * 1024 * 1024))
+ARCHIVOS_LOG = 5
+DIAS_LOG = 7
+INTERVALO_PLAN = 300
+MAX_PLANES = 500
+
+# Sólo estas sentencias admiten EXPLAIN QUERY PLAN de forma útil
+SENTENCIAS_CON_PLAN = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+logger = logging.getLogger('pernotodo.consultas_lentas')
+logger.propagate = False
+
+# sql normalizado -> (plan,); la versión no cambia nunca, sólo vencen por TTL o por tamaño
+_planes = CacheLRU(max_items=MAX_PLANES, ttl=INTERVALO_PLAN)
+_handler_pid = None
+_handler_lock = threading.Lock()
+# Últimas entradas de este worker, por si el archivo no es accesible
+recientes = collections.deque(maxlen=200)
+
+
+def normalizar_sql(sql):
+    return ' '.join(sql.split())
+
+
+def forma_parametros(parametros):
+    """Describe los parámetros sin exponer sus valores: ['int', 'str(10)', 'None', ...]."""
+    if parametros is None:
+        return 'executemany'
+
+    def forma(valor):
+        if isinstance(valor, (str, bytes)):
+            return f'{type(valor).__name__}({len(valor)})'
+        return type(valor).__name__
+
+    if isinstance(parametros, dict):
+        return {clave: forma(valor) for clave, valor in parametros.items()}
+    return [forma(valor) for valor in parametros]
+
+
+def plan_de(conn, sql, parametros):
+    """EXPLAIN QUERY PLAN de la sentencia (lista de líneas), o None si no aplica."""
+    if not sql.lstrip().upper().startswith(SENTENCIAS_CON_PLAN):
+        return None
+    try:
+        # sqlite3.Connection.execute directo: no debe volver a pasar por los medidores
+        filas = sqlite3.Connection.execute(conn, f"EXPLAIN QUERY PLAN {sql}", parametros or ()).fetchall()
+    except sqlite3.Error as e:
+        return [f'(sin plan: {e})']
+    return [fila[3] for fila in filas]
+
+
+def _plan_cacheado(conn, clave, sql, parametros):
+    guardado = _planes.get(clave, 0)
+    if guardado is not None:
+        return guardado[0]
+    plan = plan_de(conn, sql, parametros)
+    _planes.set(clave, (plan,), 0)
+    return plan
+
+
+def archivo_del_proceso(pid=None):
+    """logs/consultas_lentas.<pid>.log: el archivo de log de un worker."""
+    base, extension = os.path.splitext(ARCHIVO_LOG)
+    return f'{base}.{pid or os.getpid()}{extension}'
+
+
+def _archivos_de_log(rotados=False):
+    """Logs actuales de todos los workers (o también sus copias rotadas .1, .2, ...)."""
+    base, extension = os.path.splitext(ARCHIVO_LOG)
+    patron = f'{glob.escape(base)}.*{extension}'
+    return glob.glob(patron) + (glob.glob(patron + '.*') if rotados else [])
+
+
+def _asegurar_handler():
+    """Abre el archivo de este proceso (también tras un fork de gunicorn con --preload)."""
+    global _handler_pid
+    if _handler_pid == os.getpid():
+        return
+    with _handler_lock:
+        if _handler_pid == os.getpid():
+            return
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
+        try:
+            os.makedirs(os.path.dirname(ARCHIVO_LOG), exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                archivo_del_proceso(), maxBytes=MAX_BYTES_LOG, backupCount=ARCHIVOS_LOG,
+                encoding='utf-8', delay=True)
+        except OSError as e:
+            logging.getLogger(__name__).warning(
+                f"No se pudo abrir {archivo_del_proceso()} ({e}); consultas lentas sólo en memoria")
+            handler = logging.NullHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        _handler_pid = os.getpid()
+
+
+def registrar(conn, sql, parametros, duracion):
+    """Medidor para database.connection.medir_consultas."""
+    ms = duracion * 1000
+    if ms < UMBRAL_MS:
+        return
+
+    clave = normalizar_sql(sql)
+    plan = _plan_cacheado(conn, clave, sql, parametros)
+    entrada = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'ms': round(ms, 1),
+        'ruta': (request.endpoint or request.path) if has_request_context() else threading.current_thread().name,
+        'sql': clave,
+        'parametros': forma_parametros(parametros),
+        'plan': plan,
+        'scan_completo': any(linea.startswith('SCAN') and 'USING' not in linea for linea in plan or ()),
+        'pid': os.getpid(),
+    }
+    recientes.append(entrada)
+    _asegurar_handler()
+    logger.warning(json.dumps(entrada, ensure_ascii=False))
+
+
+def leer_registro(limite=100):
+    """Últimas `limite` entradas de los logs de todos los workers, la más reciente primero."""
+    archivos = _archivos_de_log()
+    if not archivos:
+        return list(reversed(recientes))[:limite]
+    entradas = []
+    for archivo in archivos:
+        ultimas = collections.deque(maxlen=limite)
+        try:
+            with open(archivo, encoding='utf-8') as f:
+                for linea in f:
+                    try:
+                        ultimas.append(json.loads(linea))
+                    except ValueError:
+                        continue
+        except OSError:
+            continue  # rotado o borrado mientras se leía
+        entradas.extend(ultimas)
+    entradas.sort(key=lambda entrada: entrada.get('fecha', ''), reverse=True)
+    return entradas[:limite]
+
+
+def _borrar_logs_viejos():
+    limite = time.time() - DIAS_LOG * 86400
+    for archivo in _archivos_de_log(rotados=True):
+        try:
+            if os.path.getmtime(archivo) < limite:
+                os.remove(archivo)
+        except OSError:
+            pass
+
+
+def init_app(app):
+    """Configura el log rotativo de este proceso y registra el medidor en las conexiones del pool."""
+    logger.setLevel(logging.WARNING)
+    _borrar_logs_viejos()
+    medir_consultas(registrar)
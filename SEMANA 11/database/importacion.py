@@ -0,0 +1,157 @@
+"""Importación y exportación masiva del catálogo de productos en CSV.
+
+Ambas operaciones trabajan fila por fila: la importación lee el archivo como
+stream y hace upsert por codigo_producto en lotes (executemany + commit por
+lote); la exportación recorre el cursor y va entregando trozos de texto,
+sin cargar la tabla completa en memoria.
+"""
+import csv
+import io
+
+COLUMNAS_CSV = (
+    'codigo_producto', 'nombre_producto', 'descripcion', 'material', 'tipo_rosca', 'medida',
+    'unidad_medida', 'precio_compra', 'precio_venta', 'stock_actual', 'stock_minimo',
+    'id_proveedor', 'id_categoria',
+)
+OBLIGATORIAS = ('codigo_producto', 'nombre_producto', 'material', 'medida', 'precio_compra', 'precio_venta')
+
+TAMANO_LOTE = 1000
+MAX_ERRORES_REPORTADOS = 500
+
+# Named params: en UPDATE, un valor opcional vacío conserva el valor actual
+UPSERT_SQL = """
+    INSERT INTO productos (
+        codigo_producto, nombre_producto, descripcion, material, tipo_rosca, medida,
+        unidad_medida, precio_compra, precio_venta, stock_actual, stock_minimo,
+        id_proveedor, id_categoria)
+    VALUES (
+        :codigo_producto, :nombre_producto, :descripcion, :material, :tipo_rosca, :medida,
+        COALESCE(:unidad_medida, 'unidad'), :precio_compra, :precio_venta,
+        COALESCE(:stock_actual, 0), COALESCE(:stock_minimo, 10), :id_proveedor, :id_categoria)
+    ON CONFLICT (codigo_producto) DO UPDATE SET
+        nombre_producto = excluded.nombre_producto,
+        descripcion = COALESCE(:descripcion, productos.descripcion),
+        material = excluded.material,
+        tipo_rosca = COALESCE(:tipo_rosca, productos.tipo_rosca),
+        medida = excluded.medida,
+        unidad_medida = COALESCE(:unidad_medida, productos.unidad_medida),
+        precio_compra = excluded.precio_compra,
+        precio_venta = excluded.precio_venta,
+        stock_actual = COALESCE(:stock_actual, productos.stock_actual),
+        stock_minimo = COALESCE(:stock_minimo, productos.stock_minimo),
+        id_proveedor = COALESCE(:id_proveedor, productos.id_proveedor),
+        id_categoria = COALESCE(:id_categoria, productos.id_categoria),
+        fecha_actualizacion = CURRENT_TIMESTAMP
+"""
+
+
+def validar_fila(fila, proveedores, categorias):
+    """Normaliza una fila del CSV. Devuelve (datos, None) o (None, mensaje_de_error)."""
+    datos = {}
+    for columna in COLUMNAS_CSV:
+        valor = (fila.get(columna) or '').strip()
+        datos[columna] = valor or None
+
+    faltantes = [c for c in OBLIGATORIAS if datos[c] is None]
+    if faltantes:
+        return None, f"Faltan columnas obligatorias: {', '.join(faltantes)}"
+
+    datos['codigo_producto'] = datos['codigo_producto'].upper()
+    try:
+        for columna in ('precio_compra', 'precio_venta'):
+            datos[columna] = round(float(datos[columna]), 2)
+            if datos[columna] < 0:
+                return None, f"{columna} no puede ser negativo"
+        for columna in ('stock_actual', 'stock_minimo', 'id_proveedor', 'id_categoria'):
+            if datos[columna] is not None:
+                datos[columna] = int(datos[columna])
+    except ValueError as e:
+        return None, f"Valor numérico inválido ({e})"
+
+    if datos['id_proveedor'] is not None and datos['id_proveedor'] not in proveedores:
+        return None, f"id_proveedor {datos['id_proveedor']} no existe"
+    if datos['id_categoria'] is not None and datos['id_categoria'] not in categorias:
+        return None, f"id_categoria {datos['id_categoria']} no existe"
+
+    return datos, None
+
+
+def importar_csv(conn, archivo, tamano_lote=TAMANO_LOTE):
+    """Importa productos desde un archivo de texto CSV (stream) con upsert por código.
+
+    Cada lote de `tamano_lote` filas válidas se escribe con executemany y se
+    confirma en su propia transacción. Devuelve un resumen con las filas
+    procesadas, importadas y los errores por número de fila.
+    """
+    lector = csv.DictReader(archivo)
+    resultado = {'procesadas': 0, 'importadas': 0, 'con_error': 0, 'errores': []}
+
+    encabezado = set(lector.fieldnames or [])
+    faltantes = [c for c in OBLIGATORIAS if c not in encabezado]
+    if faltantes:
+        resultado['errores'].append((1, f"El encabezado no tiene: {', '.join(faltantes)}"))
+        return resultado
+
+    # Las tablas de referencia son pequeñas: se validan en memoria en vez de fila por fila
+    proveedores = {row[0] for row in conn.execute("SELECT id_proveedor FROM proveedores")}
+    categorias = {row[0] for row in conn.execute("SELECT id_categoria FROM categorias")}
+
+    def registrar_error(numero, mensaje):
+        resultado['con_error'] += 1
+        if len(resultado['errores']) < MAX_ERRORES_REPORTADOS:
+            resultado['errores'].append((numero, mensaje))
+
+    def escribir(lote):
+        try:
+            conn.executemany(UPSERT_SQL, [datos for _, datos in lote])
+            conn.commit()
+            resultado['importadas'] += len(lote)
+        except Exception:
+            conn.rollback()
+            # Reintento fila por fila para identificar exactamente cuáles fallan
+            for numero, datos in lote:
+                try:
+                    conn.execute(UPSERT_SQL, datos)
+                    conn.commit()
+                    resultado['importadas'] += 1
+                except Exception as e:
+                    conn.rollback()
+                    registrar_error(numero, str(e))
+
+    lote = []
+    # La fila 1 es el encabezado
+    for numero, fila in enumerate(lector, start=2):
+        resultado['procesadas'] += 1
+        datos, error = validar_fila(fila, proveedores, categorias)
+        if error:
+            registrar_error(numero, error)
+            continue
+        lote.append((numero, datos))
+        if len(lote) >= tamano_lote:
+            escribir(lote)
+            lote = []
+    if lote:
+        escribir(lote)
+
+    return resultado
+
+
+def exportar_csv(conn, filas_por_trozo=500):
+    """Generador que entrega el catálogo completo como CSV, trozo a trozo."""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(COLUMNAS_CSV)
+
+    cursor = conn.execute(f"SELECT {', '.join(COLUMNAS_CSV)} FROM productos ORDER BY codigo_producto")
+    while True:
+        filas = cursor.fetchmany(filas_por_trozo)
+        if not filas:
+            break
+        escritor.writerows(tuple(fila) for fila in filas)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    resto = buffer.getvalue()
+    if resto:
+        yield resto
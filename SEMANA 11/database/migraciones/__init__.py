@@ -0,0 +1,62 @@
+"""Migraciones de esquema versionadas con PRAGMA user_version.
+
+Cada módulo mNNNN_<nombre>.py de este paquete define `aplicar(conn)` y
+lleva la base de la versión NNNN-1 a la NNNN. migrar() aplica en orden las
+que falten y deja user_version = NNNN tras cada una; si la base ya está al
+día sólo lee user_version y vuelve.
+
+Las bases creadas antes de este sistema tienen user_version = 0 y ya
+contienen parte del esquema, por eso las migraciones usan IF NOT EXISTS y
+comprueban columnas antes de añadirlas: deben poder aplicarse sobre
+cualquier estado anterior. Una migración publicada no se edita; los cambios
+van en una nueva.
+"""
+import importlib
+import pkgutil
+import re
+
+_PATRON = re.compile(r'^m(\d{4})_\w+$')
+
+
+def listar_migraciones():
+    """[(version, nombre_modulo)] ordenadas por versión."""
+    migraciones = []
+    for modulo in pkgutil.iter_modules(__path__):
+        coincide = _PATRON.match(modulo.name)
+        if coincide:
+            migraciones.append((int(coincide.group(1)), modulo.name))
+    migraciones.sort()
+    versiones = [version for version, _ in migraciones]
+    if versiones != list(range(1, len(versiones) + 1)):
+        raise RuntimeError(f"Migraciones con numeración inválida: {versiones}")
+    return migraciones
+
+
+def version_actual(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def version_objetivo():
+    migraciones = listar_migraciones()
+    return migraciones[-1][0] if migraciones else 0
+
+
+def migrar(conn, verbose=False):
+    """Aplica las migraciones pendientes. Devuelve la lista de versiones aplicadas."""
+    actual = version_actual(conn)
+    pendientes = [(v, nombre) for v, nombre in listar_migraciones() if v > actual]
+    aplicadas = []
+    for version, nombre in pendientes:
+        modulo = importlib.import_module(f'{__name__}.{nombre}')
+        if verbose:
+            print(f"  migración {version:04d}: {(modulo.__doc__ or nombre).strip().splitlines()[0]}")
+        conn.execute("BEGIN")
+        try:
+            modulo.aplicar(conn)
+            conn.execute(f"PRAGMA user_version = {version:d}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        aplicadas.append(version)
+    return aplicadas
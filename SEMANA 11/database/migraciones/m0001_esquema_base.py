@@ -0,0 +1,124 @@
+"""Esquema base: catálogo, usuarios, clientes y ventas, con los usuarios iniciales.
+
+Equivale a lo que init_db creaba al arrancar (productos, usuario y sus
+columnas añadidas con ALTER TABLE) más las tablas que la app consulta y
+que hasta ahora sólo existían en la base de producción.
+"""
+
+TABLAS = (
+    """
+    CREATE TABLE IF NOT EXISTS proveedores (
+        id_proveedor INTEGER PRIMARY KEY AUTOINCREMENT,
+        ruc VARCHAR(13) UNIQUE NOT NULL,
+        nombre_empresa VARCHAR(150) NOT NULL,
+        contacto VARCHAR(100),
+        telefono VARCHAR(20),
+        email VARCHAR(100),
+        direccion TEXT,
+        fecha_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS categorias (
+        id_categoria INTEGER PRIMARY KEY AUTOINCREMENT,
+        nombre_categoria VARCHAR(100) NOT NULL UNIQUE,
+        descripcion TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS productos (
+        id_producto INTEGER PRIMARY KEY AUTOINCREMENT,
+        codigo_producto VARCHAR(20) NOT NULL UNIQUE,
+        nombre_producto VARCHAR(150) NOT NULL,
+        descripcion TEXT,
+        material VARCHAR(50) NOT NULL,
+        tipo_rosca VARCHAR(30),
+        medida VARCHAR(20) NOT NULL,
+        unidad_medida VARCHAR(10) DEFAULT 'unidad',
+        precio_compra DECIMAL(10,2) NOT NULL,
+        precio_venta DECIMAL(10,2) NOT NULL,
+        stock_actual INTEGER DEFAULT 0,
+        stock_minimo INTEGER DEFAULT 10,
+        id_proveedor INTEGER,
+        id_categoria INTEGER,
+        fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        fecha_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (id_proveedor) REFERENCES proveedores(id_proveedor),
+        FOREIGN KEY (id_categoria) REFERENCES categorias(id_categoria)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS usuario (
+        id_usuario INTEGER PRIMARY KEY AUTOINCREMENT,
+        email TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL,
+        password_hash TEXT,
+        nombre VARCHAR(100) DEFAULT 'Usuario',
+        role VARCHAR(20) DEFAULT 'Vendedor'
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS clientes (
+        cedula VARCHAR(13) PRIMARY KEY,
+        nombres VARCHAR(100),
+        apellidos VARCHAR(100),
+        telefono VARCHAR(20),
+        email VARCHAR(100),
+        direccion TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ventas (
+        id_venta INTEGER PRIMARY KEY AUTOINCREMENT,
+        cedula_cliente VARCHAR(13),
+        id_empleado INTEGER NOT NULL,
+        id_local INTEGER,
+        fecha_venta TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        total DECIMAL(10,2) NOT NULL,
+        estado VARCHAR(20),
+        periodo_pago VARCHAR(20),
+        metodo_pago VARCHAR(20),
+        FOREIGN KEY (id_empleado) REFERENCES usuario(id_usuario)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS detalle_venta (
+        id_detalle INTEGER PRIMARY KEY AUTOINCREMENT,
+        id_venta INTEGER NOT NULL,
+        id_producto INTEGER NOT NULL,
+        cantidad INTEGER NOT NULL,
+        precio_unitario DECIMAL(10,2) NOT NULL,
+        subtotal DECIMAL(10,2) NOT NULL,
+        FOREIGN KEY (id_venta) REFERENCES ventas(id_venta),
+        FOREIGN KEY (id_producto) REFERENCES productos(id_producto)
+    )
+    """,
+)
+
+# Columnas que las bases antiguas de usuario no tenían (antes: ALTER TABLE dentro de try/except)
+COLUMNAS_USUARIO = (
+    ('password_hash', 'TEXT'),
+    ('nombre', "VARCHAR(100) DEFAULT 'Usuario'"),
+    ('role', "VARCHAR(20) DEFAULT 'Vendedor'"),
+)
+
+# Usuarios iniciales: '12345' en password_hash y en la columna antigua 'password' (NOT NULL)
+USUARIOS_INICIALES = (
+    ('admin@pernotodo.com', '12345', 'Juan Administrador', 'Administrador', '12345'),
+    ('vendedor@pernotodo.com', '12345', 'Maria Vendedora', 'Vendedor', '12345'),
+)
+
+
+def aplicar(conn):
+    for sql in TABLAS:
+        conn.execute(sql)
+
+    existentes = {fila[1] for fila in conn.execute("PRAGMA table_info(usuario)")}
+    for columna, definicion in COLUMNAS_USUARIO:
+        if columna not in existentes:
+            conn.execute(f"ALTER TABLE usuario ADD COLUMN {columna} {definicion}")
+
+    conn.executemany(
+        "INSERT OR IGNORE INTO usuario (email, password_hash, nombre, role, password) VALUES (?, ?, ?, ?, ?)",
+        USUARIOS_INICIALES
+    )
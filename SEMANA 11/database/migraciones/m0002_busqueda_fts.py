@@ -0,0 +1,41 @@
+"""Índice de búsqueda FTS5 sobre productos (se llena si no existía)."""
+
+COLUMNAS = 'codigo_producto, nombre_producto, descripcion, material, medida'
+NUEVAS = 'new.codigo_producto, new.nombre_producto, new.descripcion, new.material, new.medida'
+VIEJAS = 'old.codigo_producto, old.nombre_producto, old.descripcion, old.material, old.medida'
+
+
+def aplicar(conn):
+    existia = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'productos_fts'"
+    ).fetchone()
+
+    conn.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS productos_fts USING fts5(
+            {COLUMNAS},
+            content='productos', content_rowid='id_producto', tokenize='trigram'
+        )
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS productos_fts_ai AFTER INSERT ON productos BEGIN
+            INSERT INTO productos_fts(rowid, {COLUMNAS}) VALUES (new.id_producto, {NUEVAS});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS productos_fts_ad AFTER DELETE ON productos BEGIN
+            INSERT INTO productos_fts(productos_fts, rowid, {COLUMNAS})
+            VALUES ('delete', old.id_producto, {VIEJAS});
+        END
+    """)
+    # Sólo reindexa si cambió una columna indexada (los descuentos de stock no tocan el índice)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS productos_fts_au AFTER UPDATE OF {COLUMNAS} ON productos BEGIN
+            INSERT INTO productos_fts(productos_fts, rowid, {COLUMNAS})
+            VALUES ('delete', old.id_producto, {VIEJAS});
+            INSERT INTO productos_fts(rowid, {COLUMNAS}) VALUES (new.id_producto, {NUEVAS});
+        END
+    """)
+
+    if existia is None:
+        conn.execute("INSERT INTO productos_fts(productos_fts) VALUES ('rebuild')")
+        conn.execute("INSERT INTO productos_fts(productos_fts) VALUES ('optimize')")
@@ -0,0 +1,37 @@
+"""Versión del catálogo y registro de cambios por producto (triggers sobre productos)."""
+
+
+def aplicar(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS catalogo_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute("INSERT OR IGNORE INTO catalogo_version (id, version) VALUES (1, 0)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS catalogo_cambios (
+            id_producto INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL,
+            eliminado INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_catalogo_cambios_version ON catalogo_cambios (version)")
+
+    # DROP + CREATE: las bases que ya tenían una versión anterior de los triggers reciben esta.
+    # Upsert explícito y no INSERT OR REPLACE: SQLite ignora la política de conflicto del trigger
+    # cuando la sentencia que lo dispara trae su propio ON CONFLICT (el upsert de la importación CSV)
+    for nombre, evento, fila, eliminado in (('ai', 'INSERT', 'new', 0),
+                                           ('au', 'UPDATE', 'new', 0),
+                                           ('ad', 'DELETE', 'old', 1)):
+        conn.execute(f"DROP TRIGGER IF EXISTS catalogo_version_{nombre}")
+        conn.execute(f"""
+            CREATE TRIGGER catalogo_version_{nombre} AFTER {evento} ON productos BEGIN
+                UPDATE catalogo_version SET version = version + 1 WHERE id = 1;
+                INSERT INTO catalogo_cambios (id_producto, version, eliminado)
+                VALUES ({fila}.id_producto, (SELECT version FROM catalogo_version WHERE id = 1), {eliminado})
+                ON CONFLICT (id_producto) DO UPDATE SET
+                    version = excluded.version,
+                    eliminado = excluded.eliminado;
+            END
+        """)
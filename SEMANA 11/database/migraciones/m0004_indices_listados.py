@@ -0,0 +1,6 @@
+"""Índices para la paginación por clave de productos y proveedores."""
+
+
+def aplicar(conn):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_productos_nombre_id ON productos (nombre_producto, id_producto)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_proveedores_nombre_id ON proveedores (nombre_empresa, id_proveedor)")
@@ -0,0 +1,7 @@
+"""Índices del historial de ventas (rango de fechas, empleado y cliente)."""
+
+
+def aplicar(conn):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_ventas_fecha ON ventas (fecha_venta)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_ventas_empleado_fecha ON ventas (id_empleado, fecha_venta)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_ventas_cliente ON ventas (cedula_cliente)")
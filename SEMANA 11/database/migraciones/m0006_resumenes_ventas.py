@@ -0,0 +1,70 @@
+"""Tablas resumen de ventas para /reportes (se llenan con el historial existente)."""
+
+TABLAS = (
+    """
+    CREATE TABLE IF NOT EXISTS resumen_ventas_dia (
+        fecha DATE PRIMARY KEY,
+        num_ventas INTEGER NOT NULL DEFAULT 0,
+        unidades INTEGER NOT NULL DEFAULT 0,
+        ingresos DECIMAL(12,2) NOT NULL DEFAULT 0,
+        costo DECIMAL(12,2) NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS resumen_producto_dia (
+        fecha DATE NOT NULL,
+        id_producto INTEGER NOT NULL,
+        unidades INTEGER NOT NULL DEFAULT 0,
+        ingresos DECIMAL(12,2) NOT NULL DEFAULT 0,
+        costo DECIMAL(12,2) NOT NULL DEFAULT 0,
+        PRIMARY KEY (fecha, id_producto)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS resumen_empleado_dia (
+        fecha DATE NOT NULL,
+        id_empleado INTEGER NOT NULL,
+        num_ventas INTEGER NOT NULL DEFAULT 0,
+        unidades INTEGER NOT NULL DEFAULT 0,
+        ingresos DECIMAL(12,2) NOT NULL DEFAULT 0,
+        costo DECIMAL(12,2) NOT NULL DEFAULT 0,
+        PRIMARY KEY (fecha, id_empleado)
+    ) WITHOUT ROWID
+    """,
+)
+
+# Líneas de venta del historial; el costo usa el precio_compra actual (el histórico no se guarda)
+LINEAS = """
+    SELECT date(v.fecha_venta) AS fecha, v.id_venta, v.id_empleado, d.id_producto,
+           d.cantidad, d.subtotal, d.cantidad * COALESCE(p.precio_compra, 0) AS costo
+    FROM ventas v
+    JOIN detalle_venta d ON d.id_venta = v.id_venta
+    LEFT JOIN productos p ON p.id_producto = d.id_producto
+    WHERE v.estado = 'completada'
+"""
+
+
+def aplicar(conn):
+    existia = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'resumen_ventas_dia'"
+    ).fetchone()
+    for sql in TABLAS:
+        conn.execute(sql)
+    if existia is not None:
+        return
+
+    conn.execute(f"""
+        INSERT INTO resumen_ventas_dia (fecha, num_ventas, unidades, ingresos, costo)
+        SELECT fecha, COUNT(DISTINCT id_venta), SUM(cantidad), ROUND(SUM(subtotal), 2), ROUND(SUM(costo), 2)
+        FROM ({LINEAS}) GROUP BY fecha
+    """)
+    conn.execute(f"""
+        INSERT INTO resumen_producto_dia (fecha, id_producto, unidades, ingresos, costo)
+        SELECT fecha, id_producto, SUM(cantidad), ROUND(SUM(subtotal), 2), ROUND(SUM(costo), 2)
+        FROM ({LINEAS}) GROUP BY fecha, id_producto
+    """)
+    conn.execute(f"""
+        INSERT INTO resumen_empleado_dia (fecha, id_empleado, num_ventas, unidades, ingresos, costo)
+        SELECT fecha, id_empleado, COUNT(DISTINCT id_venta), SUM(cantidad), ROUND(SUM(subtotal), 2), ROUND(SUM(costo), 2)
+        FROM ({LINEAS}) GROUP BY fecha, id_empleado
+    """)
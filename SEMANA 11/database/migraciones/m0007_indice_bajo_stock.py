@@ -0,0 +1,10 @@
+"""Índice parcial de productos bajo stock mínimo."""
+
+
+def aplicar(conn):
+    # database/bajo_stock.py repite exactamente esta condición para que SQLite use el índice
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_productos_bajo_stock
+        ON productos (stock_actual - stock_minimo, id_producto)
+        WHERE stock_actual < stock_minimo
+    """)
@@ -0,0 +1,22 @@
+"""Índices para las claves foráneas y filtros más usados.
+
+- productos(id_proveedor), productos(id_categoria): filtros de /api/bajo_stock
+  y borrado/consulta por proveedor o categoría.
+- detalle_venta(id_venta): detalle de una venta y reconstrucción de resúmenes.
+- detalle_venta(id_producto): ventas de un producto.
+- ventas(cedula_cliente, fecha_venta): reemplaza a idx_ventas_cliente para que
+  el historial filtrado por cliente salga ordenado sin TEMP B-TREE.
+
+productos(codigo_producto) y ventas(fecha_venta) ya están cubiertos por la
+restricción UNIQUE y por idx_ventas_fecha (migración 0005).
+"""
+
+
+def aplicar(conn):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_productos_proveedor ON productos (id_proveedor)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_productos_categoria ON productos (id_categoria)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_detalle_venta_venta ON detalle_venta (id_venta)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_detalle_venta_producto ON detalle_venta (id_producto)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_ventas_cliente_fecha ON ventas (cedula_cliente, fecha_venta)")
+    conn.execute("DROP INDEX IF EXISTS idx_ventas_cliente")
+    conn.execute("ANALYZE")
@@ -0,0 +1,26 @@
+"""Versión de las tablas de referencia (categorías, proveedores, empleados) con triggers."""
+
+# tabla -> columnas cuyo UPDATE cambia la versión (las que muestran los desplegables)
+TABLAS = (
+    ('categorias', 'nombre_categoria'),
+    ('proveedores', 'nombre_empresa'),
+    ('usuario', 'nombre'),
+)
+
+
+def aplicar(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS referencias_version (
+            tabla TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+    for tabla, columnas in TABLAS:
+        conn.execute("INSERT OR IGNORE INTO referencias_version (tabla, version) VALUES (?, 0)", (tabla,))
+        for sufijo, evento in (('ai', 'INSERT'), ('ad', 'DELETE'), ('au', f"UPDATE OF {columnas}")):
+            conn.execute(f"DROP TRIGGER IF EXISTS referencias_version_{tabla}_{sufijo}")
+            conn.execute(f"""
+                CREATE TRIGGER referencias_version_{tabla}_{sufijo} AFTER {evento} ON {tabla} BEGIN
+                    UPDATE referencias_version SET version = version + 1 WHERE tabla = '{tabla}';
+                END
+            """)
@@ -0,0 +1,11 @@
+"""El trigger de versión de proveedores pasa a dispararse con el UPDATE de cualquier columna."""
+
+
+def aplicar(conn):
+    # El listado de proveedores muestra todas las columnas y usa esta versión para su ETag
+    conn.execute("DROP TRIGGER IF EXISTS referencias_version_proveedores_au")
+    conn.execute("""
+        CREATE TRIGGER referencias_version_proveedores_au AFTER UPDATE ON proveedores BEGIN
+            UPDATE referencias_version SET version = version + 1 WHERE tabla = 'proveedores';
+        END
+    """)
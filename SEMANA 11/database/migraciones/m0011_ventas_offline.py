@@ -0,0 +1,16 @@
+"""Claves de las ventas cobradas sin conexión en el POS, para no registrarlas dos veces.
+
+El POS reintenta las ventas encoladas hasta recibir respuesta; si una se
+registró pero la respuesta se perdió, el reintento trae la misma clave y
+finalizar_venta devuelve la venta ya registrada en lugar de crear otra.
+"""
+
+
+def aplicar(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ventas_offline (
+            clave TEXT PRIMARY KEY,
+            id_venta INTEGER NOT NULL REFERENCES ventas (id_venta) ON DELETE CASCADE,
+            total REAL NOT NULL
+        ) WITHOUT ROWID
+    """)
@@ -0,0 +1,80 @@
+import base64
+import json
+
+
+def codificar_cursor(valores):
+    """Convierte la clave de orden de una fila en un cursor opaco para la URL."""
+    crudo = json.dumps(list(valores), separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(crudo).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor, columnas):
+    """Devuelve la tupla de valores del cursor, o None si falta o no es válido."""
+    if not cursor:
+        return None
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(valores, list) or len(valores) != len(columnas):
+        return None
+    return tuple(valores)
+
+
+def pagina_keyset(conn, select_sql, where_sql, params, orden, por_pagina,
+                  despues=None, antes=None, descendente=False):
+    """Ejecuta una consulta paginada por clave (seek) en lugar de LIMIT/OFFSET.
+
+    `orden` son las columnas de la clave, la última debe ser única (ej.
+    ('p.nombre_producto', 'p.id_producto')); con `descendente` la lista va de
+    mayor a menor. `despues`/`antes` son cursores opacos de codificar_cursor.
+    Devuelve (filas, cursor_siguiente, cursor_anterior); los cursores son
+    None cuando no hay más páginas.
+    """
+    nombres = [col.split('.')[-1] for col in orden]
+    tupla = '(' + ', '.join(orden) + ')'
+    marcadores = '(' + ', '.join('?' * len(orden)) + ')'
+    condiciones = [f"({where_sql})"] if where_sql else []
+    params = list(params)
+
+    clave_despues = decodificar_cursor(despues, orden)
+    clave_antes = None if clave_despues else decodificar_cursor(antes, orden)
+
+    # Avanzar en el sentido de la lista es ">" (o "<" si es descendente); retroceder es lo contrario
+    avanza, retrocede = ('<', '>') if descendente else ('>', '<')
+    if clave_antes is not None:
+        condiciones.append(f"{tupla} {retrocede} {marcadores}")
+        params.extend(clave_antes)
+        direccion = 'ASC' if descendente else 'DESC'
+    else:
+        if clave_despues is not None:
+            condiciones.append(f"{tupla} {avanza} {marcadores}")
+            params.extend(clave_despues)
+        direccion = 'DESC' if descendente else 'ASC'
+
+    where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ''
+    orden_sql = ', '.join(f"{col} {direccion}" for col in orden)
+    filas = conn.execute(
+        f"{select_sql} {where} ORDER BY {orden_sql} LIMIT ?",
+        (*params, por_pagina + 1)
+    ).fetchall()
+
+    hay_mas = len(filas) > por_pagina
+    filas = filas[:por_pagina]
+    if clave_antes is not None:
+        filas.reverse()
+
+    def cursor_de(fila):
+        return codificar_cursor(fila[n] for n in nombres)
+
+    if not filas:
+        return filas, None, None
+
+    if clave_antes is not None:
+        siguiente = cursor_de(filas[-1])
+        anterior = cursor_de(filas[0]) if hay_mas else None
+    else:
+        siguiente = cursor_de(filas[-1]) if hay_mas else None
+        anterior = cursor_de(filas[0]) if clave_despues is not None else None
+    return filas, siguiente, anterior
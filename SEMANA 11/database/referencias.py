@@ -0,0 +1,69 @@
+"""Datos de referencia (tablas pequeñas de los desplegables) cacheados por worker.
+
+Categorías, proveedores y empleados cambian muy poco pero se consultan en
+cada formulario de productos, en el dashboard y en el historial. Se cargan
+una vez por worker y se sirven desde memoria mientras no cambie su versión.
+
+Igual que catalogo_version, referencias_version guarda un contador por
+tabla que incrementan triggers de INSERT, DELETE y UPDATE de las columnas
+mostradas (de cualquier columna en proveedores: su listado las muestra
+todas y usa la versión para el ETag). Leerlo es una sola consulta sobre
+una tabla de tres filas, así que un alta o baja hecha en otro worker se
+ve en la petición siguiente.
+"""
+import json
+
+from database.cache import CacheLRU
+
+# nombre -> consulta (los triggers de versión están en las migraciones 0009 y 0010)
+REFERENCIAS = {
+    'categorias': "SELECT id_categoria, nombre_categoria FROM categorias ORDER BY nombre_categoria",
+    'proveedores': "SELECT id_proveedor, nombre_empresa FROM proveedores ORDER BY nombre_empresa",
+    'empleados': "SELECT id_usuario, nombre FROM usuario ORDER BY nombre",
+}
+
+
+def leer_version_referencias(conn):
+    """Tupla con la versión de cada tabla de referencia (cambia si cambia cualquiera)."""
+    return tuple(row[0] for row in conn.execute("SELECT version FROM referencias_version ORDER BY tabla"))
+
+
+def leer_version_tabla(conn, tabla):
+    """Versión de una sola tabla de referencia (lectura por clave primaria)."""
+    row = conn.execute("SELECT version FROM referencias_version WHERE tabla = ?", (tabla,)).fetchone()
+    return row[0] if row else 0
+
+
+class CacheReferencias:
+    """Listas de referencia de este worker, recargadas cuando cambia referencias_version."""
+
+    def __init__(self, ttl=3600):
+        self._cache = CacheLRU(max_items=2 * len(REFERENCIAS) + 1, ttl=ttl)
+
+    def obtener(self, conn, nombre, version=None):
+        """Lista de dicts de la referencia `nombre` (no modificarla: es compartida)."""
+        if version is None:
+            version = leer_version_referencias(conn)
+        filas = self._cache.get(nombre, version)
+        if filas is None:
+            filas = [dict(row) for row in conn.execute(REFERENCIAS[nombre])]
+            self._cache.set(nombre, filas, version)
+        return filas
+
+    def como_json(self, conn, version=None):
+        """(version, cuerpo JSON con todas las referencias), serializado una vez por versión."""
+        if version is None:
+            version = leer_version_referencias(conn)
+        cuerpo = self._cache.get('__json__', version)
+        if cuerpo is None:
+            datos = {nombre: self.obtener(conn, nombre, version) for nombre in REFERENCIAS}
+            cuerpo = json.dumps(datos, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            self._cache.set('__json__', cuerpo, version)
+        return version, cuerpo
+
+    def invalidar(self):
+        """Descarta todo (cambios hechos por este worker; los demás lo notan por la versión)."""
+        self._cache.invalidar()
+
+    def snapshot(self):
+        return self._cache.snapshot()
@@ -0,0 +1,143 @@
+"""Tablas resumen de ventas (por día, por producto y día, por empleado y día).
+
+finalizar_venta las actualiza de forma incremental dentro de la misma
+transacción que registra la venta, así que los reportes nunca recorren
+ventas ni detalle_venta. reconstruir_resumenes las recalcula desde cero.
+"""
+
+
+def acumular_venta(conn, id_venta, id_empleado, detalle):
+    """Suma una venta recién registrada a las tablas resumen.
+
+    `detalle` es una lista de tuplas (id_producto, cantidad, precio_unitario,
+    subtotal, precio_compra). Debe llamarse en la misma transacción que el
+    INSERT de la venta.
+    """
+    fecha = conn.execute("SELECT date(fecha_venta) FROM ventas WHERE id_venta = ?", (id_venta,)).fetchone()[0]
+    unidades = sum(linea[1] for linea in detalle)
+    ingresos = round(sum(linea[3] for linea in detalle), 2)
+    costo = round(sum(linea[1] * linea[4] for linea in detalle), 2)
+
+    conn.execute(
+        """
+        INSERT INTO resumen_ventas_dia (fecha, num_ventas, unidades, ingresos, costo)
+        VALUES (?, 1, ?, ?, ?)
+        ON CONFLICT (fecha) DO UPDATE SET
+            num_ventas = num_ventas + 1,
+            unidades = unidades + excluded.unidades,
+            ingresos = ROUND(ingresos + excluded.ingresos, 2),
+            costo = ROUND(costo + excluded.costo, 2)
+        """,
+        (fecha, unidades, ingresos, costo)
+    )
+    conn.execute(
+        """
+        INSERT INTO resumen_empleado_dia (fecha, id_empleado, num_ventas, unidades, ingresos, costo)
+        VALUES (?, ?, 1, ?, ?, ?)
+        ON CONFLICT (fecha, id_empleado) DO UPDATE SET
+            num_ventas = num_ventas + 1,
+            unidades = unidades + excluded.unidades,
+            ingresos = ROUND(ingresos + excluded.ingresos, 2),
+            costo = ROUND(costo + excluded.costo, 2)
+        """,
+        (fecha, id_empleado, unidades, ingresos, costo)
+    )
+    conn.executemany(
+        """
+        INSERT INTO resumen_producto_dia (fecha, id_producto, unidades, ingresos, costo)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (fecha, id_producto) DO UPDATE SET
+            unidades = unidades + excluded.unidades,
+            ingresos = ROUND(ingresos + excluded.ingresos, 2),
+            costo = ROUND(costo + excluded.costo, 2)
+        """,
+        [(fecha, linea[0], linea[1], linea[3], round(linea[1] * linea[4], 2)) for linea in detalle]
+    )
+
+
+def reconstruir_resumenes(conn):
+    """Recalcula las tablas resumen a partir de todo el historial (backfill).
+
+    El costo histórico no se guarda en detalle_venta, así que se usa el
+    precio_compra actual de cada producto.
+    """
+    conn.execute("DELETE FROM resumen_ventas_dia")
+    conn.execute("DELETE FROM resumen_producto_dia")
+    conn.execute("DELETE FROM resumen_empleado_dia")
+
+    lineas = """
+        SELECT date(v.fecha_venta) AS fecha, v.id_venta, v.id_empleado, d.id_producto,
+               d.cantidad, d.subtotal, d.cantidad * COALESCE(p.precio_compra, 0) AS costo
+        FROM ventas v
+        JOIN detalle_venta d ON d.id_venta = v.id_venta
+        LEFT JOIN productos p ON p.id_producto = d.id_producto
+        WHERE v.estado = 'completada'
+    """
+    conn.execute(f"""
+        INSERT INTO resumen_ventas_dia (fecha, num_ventas, unidades, ingresos, costo)
+        SELECT fecha, COUNT(DISTINCT id_venta), SUM(cantidad), ROUND(SUM(subtotal), 2), ROUND(SUM(costo), 2)
+        FROM ({lineas}) GROUP BY fecha
+    """)
+    conn.execute(f"""
+        INSERT INTO resumen_producto_dia (fecha, id_producto, unidades, ingresos, costo)
+        SELECT fecha, id_producto, SUM(cantidad), ROUND(SUM(subtotal), 2), ROUND(SUM(costo), 2)
+        FROM ({lineas}) GROUP BY fecha, id_producto
+    """)
+    conn.execute(f"""
+        INSERT INTO resumen_empleado_dia (fecha, id_empleado, num_ventas, unidades, ingresos, costo)
+        SELECT fecha, id_empleado, COUNT(DISTINCT id_venta), SUM(cantidad), ROUND(SUM(subtotal), 2), ROUND(SUM(costo), 2)
+        FROM ({lineas}) GROUP BY fecha, id_empleado
+    """)
+    conn.commit()
+
+
+def reporte_rango(conn, desde, hasta, top=10):
+    """Totales, serie diaria, productos más vendidos y ventas por empleado entre dos fechas (incluidas)."""
+    totales = conn.execute(
+        """
+        SELECT COALESCE(SUM(num_ventas), 0) AS num_ventas, COALESCE(SUM(unidades), 0) AS unidades,
+               COALESCE(SUM(ingresos), 0) AS ingresos, COALESCE(SUM(costo), 0) AS costo,
+               COALESCE(SUM(ingresos) - SUM(costo), 0) AS margen
+        FROM resumen_ventas_dia WHERE fecha BETWEEN ? AND ?
+        """,
+        (desde, hasta)
+    ).fetchone()
+
+    por_dia = conn.execute(
+        """
+        SELECT fecha, num_ventas, unidades, ingresos, costo, ingresos - costo AS margen
+        FROM resumen_ventas_dia WHERE fecha BETWEEN ? AND ?
+        ORDER BY fecha
+        """,
+        (desde, hasta)
+    ).fetchall()
+
+    productos = conn.execute(
+        """
+        SELECT r.id_producto, p.codigo_producto, p.nombre_producto,
+               SUM(r.unidades) AS unidades, SUM(r.ingresos) AS ingresos,
+               SUM(r.ingresos) - SUM(r.costo) AS margen
+        FROM resumen_producto_dia r
+        LEFT JOIN productos p ON p.id_producto = r.id_producto
+        WHERE r.fecha BETWEEN ? AND ?
+        GROUP BY r.id_producto
+        ORDER BY ingresos DESC
+        LIMIT ?
+        """,
+        (desde, hasta, top)
+    ).fetchall()
+
+    empleados = conn.execute(
+        """
+        SELECT r.id_empleado, u.nombre, SUM(r.num_ventas) AS num_ventas,
+               SUM(r.ingresos) AS ingresos, SUM(r.ingresos) - SUM(r.costo) AS margen
+        FROM resumen_empleado_dia r
+        LEFT JOIN usuario u ON u.id_usuario = r.id_empleado
+        WHERE r.fecha BETWEEN ? AND ?
+        GROUP BY r.id_empleado
+        ORDER BY ingresos DESC
+        """,
+        (desde, hasta)
+    ).fetchall()
+
+    return {'totales': totales, 'por_dia': por_dia, 'productos': productos, 'empleados': empleados}
@@ -0,0 +1,300 @@
+import asyncio
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from database.connection import DATABASE, apply_pragmas
+from database.reportes import acumular_venta
+
+# --- Configuración del group commit ---
+VENTAS_MAX_LOTE = int(os.environ.get('VENTAS_MAX_LOTE', 32))
+VENTAS_MAX_ESPERA_MS = float(os.environ.get('VENTAS_MAX_ESPERA_MS', 5))
+
+
+class VentaRechazada(Exception):
+    """La venta no se registró porque una o más líneas del carrito no son válidas."""
+
+    def __init__(self, lineas):
+        super().__init__(f"{len(lineas)} línea(s) del carrito no se pueden vender.")
+        self.lineas = lineas
+
+
+def agrupar_carrito(items):
+    """Suma las cantidades de líneas repetidas del mismo producto. Devuelve {id_producto: cantidad}."""
+    cantidades = {}
+    for item in items:
+        cantidades[item['id']] = cantidades.get(item['id'], 0) + item['cantidad']
+    return cantidades
+
+
+def registrar_venta(conn, venta):
+    """Registra la venta completa con operaciones de conjunto y devuelve {'id_venta', 'total'}.
+
+    `venta` es un dict con: cedula_cliente, id_empleado, id_local, estado e
+    'items' (lista de dicts con id y cantidad). Los precios se toman de la
+    tabla productos, no del cliente. Si alguna línea no existe, tiene una
+    cantidad inválida o no hay stock suficiente se lanza VentaRechazada con
+    todas las líneas fallidas y no se escribe nada.
+
+    Si trae 'clave_offline' (ventas encoladas por el POS sin conexión) y esa
+    clave ya se registró, devuelve la venta existente con 'repetida': True.
+    'fecha_venta' (opcional, UTC) es la fecha en que se cobró sin conexión;
+    si falta se usa CURRENT_TIMESTAMP.
+    """
+    clave = venta.get('clave_offline')
+    if clave:
+        row = conn.execute("SELECT id_venta, total FROM ventas_offline WHERE clave = ?", (clave,)).fetchone()
+        if row:
+            return {'id_venta': row[0], 'total': row[1], 'repetida': True}
+
+    cantidades = agrupar_carrito(venta['items'])
+    ids = list(cantidades)
+
+    # 1. Precios y stock de todo el carrito en una sola consulta
+    marcadores = ', '.join('?' * len(ids))
+    productos = {
+        row['id_producto']: row
+        for row in conn.execute(
+            f"SELECT id_producto, precio_venta, precio_compra, stock_actual FROM productos WHERE id_producto IN ({marcadores})",
+            ids
+        )
+    }
+
+    # 2. Validación de todo el carrito antes de escribir
+    fallidas = []
+    for id_producto, cantidad in cantidades.items():
+        producto = productos.get(id_producto)
+        if cantidad <= 0:
+            fallidas.append({'id': id_producto, 'motivo': 'cantidad_invalida', 'solicitado': cantidad})
+        elif producto is None:
+            fallidas.append({'id': id_producto, 'motivo': 'no_existe', 'solicitado': cantidad})
+        elif producto['stock_actual'] < cantidad:
+            fallidas.append({'id': id_producto, 'motivo': 'stock_insuficiente',
+                             'solicitado': cantidad, 'disponible': producto['stock_actual']})
+    if fallidas:
+        raise VentaRechazada(fallidas)
+
+    detalle = []
+    total = 0.0
+    for id_producto, cantidad in cantidades.items():
+        precio = float(productos[id_producto]['precio_venta'])
+        subtotal = round(precio * cantidad, 2)
+        total += subtotal
+        detalle.append((id_producto, cantidad, precio, subtotal))
+    total = round(total, 2)
+
+    # 3. Venta maestra
+    result = conn.execute(
+        """
+        INSERT INTO ventas (
+            cedula_cliente, id_empleado, id_local, fecha_venta, total, estado,
+            periodo_pago, metodo_pago
+        )
+        VALUES (?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP), ?, ?, 'Contado', 'Efectivo')
+        """,
+        (venta['cedula_cliente'], venta['id_empleado'], venta['id_local'], venta.get('fecha_venta'),
+         total, venta['estado'])
+    )
+    id_venta = result.lastrowid
+
+    # 4. Detalle completo con executemany
+    conn.executemany(
+        """
+        INSERT INTO detalle_venta (id_venta, id_producto, cantidad, precio_unitario, subtotal)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        [(id_venta, *linea) for linea in detalle]
+    )
+
+    # 5. CRÍTICO: Descontar stock de todo el carrito en un solo UPDATE
+    valores = ', '.join('(?, ?)' for _ in cantidades)
+    params = [v for par in cantidades.items() for v in par]
+    conn.execute(
+        f"""
+        WITH carrito(id_producto, cantidad) AS (VALUES {valores})
+        UPDATE productos
+        SET stock_actual = stock_actual - (
+            SELECT cantidad FROM carrito WHERE carrito.id_producto = productos.id_producto)
+        WHERE id_producto IN (SELECT id_producto FROM carrito)
+          AND stock_actual >= (
+            SELECT cantidad FROM carrito WHERE carrito.id_producto = productos.id_producto)
+        """,
+        params
+    )
+    # changes() en lugar de rowcount: sqlite3 no informa filas para sentencias que empiezan con WITH
+    actualizados = conn.execute("SELECT changes()").fetchone()[0]
+    if actualizados != len(cantidades):
+        # No debería ocurrir: el escritor tiene el bloqueo de escritura desde la validación
+        raise sqlite3.IntegrityError("El stock cambió durante el registro de la venta.")
+
+    # 6. Tablas resumen de reportes, en la misma transacción
+    acumular_venta(conn, id_venta, venta['id_empleado'], [
+        (*linea, float(productos[linea[0]]['precio_compra'] or 0)) for linea in detalle
+    ])
+
+    if clave:
+        conn.execute("INSERT INTO ventas_offline (clave, id_venta, total) VALUES (?, ?, ?)", (clave, id_venta, total))
+
+    return {'id_venta': id_venta, 'total': total}
+
+
+class VentaPendiente:
+    """Una venta en cola; la petición que la envió espera en `listo`."""
+
+    def __init__(self, venta, al_terminar=None):
+        self.venta = venta
+        self.listo = threading.Event()
+        self.resultado = None
+        self.error = None
+        # Llamada desde el hilo escritor al terminar (modo asyncio: despierta al event loop)
+        self.al_terminar = al_terminar
+
+
+class EscritorVentas:
+    """Escritor dedicado (uno por proceso) que agrupa ventas concurrentes.
+
+    Las peticiones encolan su venta y esperan. Un hilo toma hasta `max_lote`
+    ventas (o las que lleguen en `max_espera_ms`), las escribe dentro de una
+    sola transacción BEGIN IMMEDIATE y hace un único COMMIT. Cada venta va en
+    su propio SAVEPOINT, así que el fallo de una no arrastra a las demás.
+    """
+
+    def __init__(self, database, max_lote=VENTAS_MAX_LOTE, max_espera_ms=VENTAS_MAX_ESPERA_MS):
+        self.database = database
+        self.max_lote = max_lote
+        self.max_espera = max_espera_ms / 1000.0
+        self.pid = os.getpid()
+        self._cola = queue.Queue()
+        self._conn = None
+        self.stats = {'lotes': 0, 'ventas': 0, 'repetidas': 0, 'fallidas': 0, 'max_lote_visto': 0}
+        self._hilo = threading.Thread(target=self._bucle, name='escritor-ventas', daemon=True)
+        self._hilo.start()
+
+    def enviar(self, venta):
+        """Encola la venta y bloquea hasta que se confirme. Devuelve el resultado de registrar_venta o relanza el error."""
+        pendiente = VentaPendiente(venta)
+        self._cola.put(pendiente)
+        pendiente.listo.wait()
+        if pendiente.error is not None:
+            raise pendiente.error
+        return pendiente.resultado
+
+    async def enviar_async(self, venta):
+        """Como enviar(), pero la corrutina espera sin ocupar un hilo (modo ASGI)."""
+        loop = asyncio.get_running_loop()
+        futuro = loop.create_future()
+
+        def despertar():
+            if not futuro.done():
+                futuro.set_result(None)
+
+        def avisar():
+            try:
+                loop.call_soon_threadsafe(despertar)
+            except RuntimeError:
+                pass  # el event loop ya se cerró (apagado del worker)
+
+        pendiente = VentaPendiente(venta, al_terminar=avisar)
+        self._cola.put(pendiente)
+        await futuro
+        if pendiente.error is not None:
+            raise pendiente.error
+        return pendiente.resultado
+
+    def _conexion(self):
+        if self._conn is None:
+            # isolation_level=None: las transacciones se controlan a mano (BEGIN IMMEDIATE)
+            self._conn = sqlite3.connect(self.database, isolation_level=None, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            apply_pragmas(self._conn)
+        return self._conn
+
+    def _tomar_lote(self):
+        lote = [self._cola.get()]
+        limite = time.monotonic() + self.max_espera
+        while len(lote) < self.max_lote:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                lote.append(self._cola.get(timeout=restante))
+            except queue.Empty:
+                break
+        return lote
+
+    def _bucle(self):
+        while True:
+            lote = self._tomar_lote()
+            try:
+                self._escribir_lote(lote)
+            except Exception as e:
+                # Fallo de BEGIN/COMMIT: ninguna venta del lote quedó registrada
+                for pendiente in lote:
+                    if pendiente.error is None:
+                        self.stats['fallidas'] += 1
+                    pendiente.resultado = None
+                    pendiente.error = e
+                self._descartar_conexion()
+            finally:
+                for pendiente in lote:
+                    pendiente.listo.set()
+                    if pendiente.al_terminar is not None:
+                        pendiente.al_terminar()
+
+    def _escribir_lote(self, lote):
+        conn = self._conexion()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for pendiente in lote:
+                conn.execute("SAVEPOINT venta")
+                try:
+                    pendiente.resultado = registrar_venta(conn, pendiente.venta)
+                    conn.execute("RELEASE SAVEPOINT venta")
+                except Exception as e:
+                    conn.execute("ROLLBACK TO SAVEPOINT venta")
+                    conn.execute("RELEASE SAVEPOINT venta")
+                    pendiente.error = e
+                    self.stats['fallidas'] += 1
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+        # Sólo las ventas confirmadas en el COMMIT: las que volvieron a su savepoint ya están en 'fallidas'
+        registradas = [p.resultado for p in lote if p.error is None]
+        repetidas = sum(1 for resultado in registradas if resultado.get('repetida'))
+        self.stats['lotes'] += 1
+        self.stats['ventas'] += len(registradas) - repetidas
+        self.stats['repetidas'] += repetidas
+        self.stats['max_lote_visto'] = max(self.stats['max_lote_visto'], len(lote))
+
+    def _descartar_conexion(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+            self._conn = None
+
+    def snapshot(self):
+        data = dict(self.stats)
+        data.update({'pendientes': self._cola.qsize(), 'max_lote': self.max_lote,
+                     'max_espera_ms': self.max_espera * 1000, 'pid': self.pid})
+        return data
+
+
+_escritor = None
+_escritor_lock = threading.Lock()
+
+
+def get_escritor():
+    """Escritor de ventas del proceso actual (se recrea tras un fork de gunicorn)."""
+    global _escritor
+    if _escritor is None or _escritor.pid != os.getpid():
+        with _escritor_lock:
+            if _escritor is None or _escritor.pid != os.getpid():
+                _escritor = EscritorVentas(DATABASE)
+    return _escritor
@@ -0,0 +1,22 @@
+"""Contador de versión del catálogo compartido por todos los workers.
+
+Cada INSERT, UPDATE (incluidos los descuentos de stock) o DELETE sobre
+productos incrementa catalogo_version.version mediante triggers, así que
+cualquier proceso puede saber con una lectura por clave primaria si el
+catálogo cambió desde la última vez que lo miró. Además, catalogo_cambios
+guarda para cada producto la versión en que cambió por última vez (y si fue
+eliminado), lo que permite refrescar sólo las filas modificadas.
+"""
+
+
+def leer_version_catalogo(conn):
+    """Versión actual del catálogo (0 si aún no hay fila de versión)."""
+    row = conn.execute("SELECT version FROM catalogo_version WHERE id = 1").fetchone()
+    return row[0] if row else 0
+
+
+def cambios_desde(conn, version):
+    """Productos modificados después de `version`: lista de (id_producto, eliminado)."""
+    return conn.execute(
+        "SELECT id_producto, eliminado FROM catalogo_cambios WHERE version > ?", (version,)
+    ).fetchall()
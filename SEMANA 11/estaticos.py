@@ -0,0 +1,247 @@
+"""Archivos estáticos con huella en el nombre, precomprimidos y con variantes de imagen.
+
+`python -m estaticos` (paso de build en render.yaml) copia static/ a
+static/dist/ con el hash del contenido en el nombre (css/style.3f9c2a1b0d.css)
+y escribe static/dist/manifest.json con la correspondencia. Además:
+  - los .css/.js/.svg se precomprimen a .gz (y .br si está el paquete brotli)
+  - las imágenes .jpg/.png se reducen a ANCHOS_IMAGEN en AVIF, WebP y JPEG
+    (si está Pillow); en el CSS, cada declaración con url() a una imagen
+    así se repite con image-set() para que el navegador elija el formato
+  - las url() del CSS se reescriben a los nombres con huella
+
+En la app, url_for('static', filename='css/style.css') resuelve al nombre
+con huella si hay manifiesto (sin él, al archivo original, como antes), y
+los archivos de dist/ se sirven con Cache-Control immutable de un año y
+en la codificación precomprimida que acepte el navegador. Como el nombre
+cambia con el contenido, nunca hace falta invalidar la caché.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+
+from flask import request, send_from_directory
+from markupsafe import Markup
+
+try:
+    import brotli
+except ImportError:  # opcional: sin él sólo se genera .gz
+    brotli = None
+
+try:
+    from PIL import Image
+except ImportError:  # opcional: sin Pillow las imágenes se copian tal cual
+    Image = None
+
+ORIGEN = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+CARPETA_DIST = 'dist'
+MANIFIESTO = 'manifest.json'
+
+EXTENSIONES_TEXTO = {'.css', '.js', '.svg', '.json', '.txt', '.map'}
+EXTENSIONES_IMAGEN = {'.jpg', '.jpeg', '.png'}
+ANCHOS_IMAGEN = (640, 1280, 1920)
+# (formato de Pillow, extensión, tipo MIME, opciones); el orden es el de preferencia en image-set()
+FORMATOS_IMAGEN = (
+    ('AVIF', '.avif', 'image/avif', {'quality': 55}),
+    ('WEBP', '.webp', 'image/webp', {'quality': 80, 'method': 6}),
+    ('JPEG', '.jpg', 'image/jpeg', {'quality': 82, 'progressive': True, 'optimize': True}),
+)
+MAX_AGE_INMUTABLE = 365 * 24 * 3600
+
+_URL_CSS = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+_DECLARACION_CSS = re.compile(r"""[\w-]+\s*:[^;{}]*url\([^;{}]*;""")
+
+
+def huella(datos):
+    return hashlib.sha256(datos).hexdigest()[:10]
+
+
+def con_huella(ruta, datos, sufijo=''):
+    """'images/a.jpg' -> 'images/a<sufijo>.<hash>.jpg'."""
+    base, extension = posixpath.splitext(ruta)
+    return f'{base}{sufijo}.{huella(datos)}{extension}'
+
+
+def _escribir(destino, ruta, datos):
+    archivo = os.path.join(destino, *ruta.split('/'))
+    os.makedirs(os.path.dirname(archivo), exist_ok=True)
+    with open(archivo, 'wb') as f:
+        f.write(datos)
+    return archivo
+
+
+def _precomprimir(archivo, datos):
+    """Escribe .gz (y .br) junto al archivo si ahorran algo. Devuelve las extensiones creadas."""
+    creadas = []
+    variantes = [('.gz', gzip.compress(datos, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variantes.append(('.br', brotli.compress(datos, quality=11)))
+    for extension, comprimido in variantes:
+        if len(comprimido) < len(datos) * 0.9:
+            with open(archivo + extension, 'wb') as f:
+                f.write(comprimido)
+            creadas.append(extension)
+    return creadas
+
+
+def _variantes_imagen(ruta, archivo_origen, destino):
+    """Genera las reducciones de una imagen: {mime: [[ancho, ruta_con_huella], ...]}."""
+    variantes = {}
+    with Image.open(archivo_origen) as imagen:
+        imagen.load()
+        if imagen.mode not in ('RGB', 'RGBA'):
+            imagen = imagen.convert('RGB')
+        anchos = [ancho for ancho in ANCHOS_IMAGEN if ancho < imagen.width] or [imagen.width]
+        base = posixpath.splitext(ruta)[0]
+        for ancho in anchos:
+            alto = round(imagen.height * ancho / imagen.width)
+            reducida = imagen.resize((ancho, alto), Image.LANCZOS)
+            for formato, extension, mime, opciones in FORMATOS_IMAGEN:
+                copia = reducida.convert('RGB') if formato == 'JPEG' else reducida
+                archivo_tmp = os.path.join(destino, f'.tmp{extension}')
+                try:
+                    copia.save(archivo_tmp, formato, **opciones)
+                except (KeyError, OSError, ValueError):
+                    # Pillow compilado sin soporte para este formato (AVIF en versiones antiguas)
+                    continue
+                with open(archivo_tmp, 'rb') as f:
+                    datos = f.read()
+                os.remove(archivo_tmp)
+                ruta_variante = con_huella(f'{base}{extension}', datos, sufijo=f'.{ancho}w')
+                _escribir(destino, ruta_variante, datos)
+                variantes.setdefault(mime, []).append([ancho, ruta_variante])
+    return variantes
+
+
+def _reescribir_css(ruta, texto, archivos, variantes):
+    """Apunta las url() del CSS a los nombres con huella y añade image-set() con las variantes."""
+    carpeta = posixpath.dirname(ruta)
+
+    def resolver(url):
+        if url.startswith(('data:', 'http:', 'https:', '//', '#', '/')):
+            return None
+        return posixpath.normpath(posixpath.join(carpeta, url.split('?')[0].split('#')[0]))
+
+    def relativa(destino):
+        return posixpath.relpath(destino, carpeta or '.')
+
+    def a_huella(coincide):
+        objetivo = resolver(coincide.group(2))
+        if objetivo not in archivos:
+            return coincide.group(0)
+        return f"url('{relativa(archivos[objetivo])}')"
+
+    def a_image_set(coincide):
+        objetivo = resolver(coincide.group(2))
+        if objetivo not in variantes:
+            return coincide.group(0)
+        opciones = [f'url("{relativa(lista[-1][1])}") type("{mime}")' for mime, lista in variantes[objetivo].items()]
+        return f"image-set({', '.join(opciones)})"
+
+    def declaracion(coincide):
+        original = _URL_CSS.sub(a_huella, coincide.group(0))
+        moderna = _URL_CSS.sub(a_image_set, coincide.group(0))
+        # La copia con image-set va después: los navegadores que no la entienden se quedan con la primera
+        return original if moderna == coincide.group(0) else f'{original}\n    {moderna}'
+
+    return _DECLARACION_CSS.sub(declaracion, texto)
+
+
+def construir(origen=ORIGEN, verbose=False):
+    """Regenera static/dist y su manifiesto. Devuelve el manifiesto."""
+    destino = os.path.join(origen, CARPETA_DIST)
+    if os.path.isdir(destino):
+        shutil.rmtree(destino)
+    os.makedirs(destino)
+
+    rutas = []
+    for carpeta, subcarpetas, nombres in os.walk(origen):
+        subcarpetas[:] = [s for s in subcarpetas if os.path.join(carpeta, s) != destino]
+        for nombre in nombres:
+            rutas.append(os.path.relpath(os.path.join(carpeta, nombre), origen).replace(os.sep, '/'))
+
+    archivos, variantes, comprimidos = {}, {}, {}
+    # Primero lo que no es texto: el CSS necesita conocer los nombres finales de las imágenes
+    for ruta in sorted(rutas, key=lambda r: posixpath.splitext(r)[1] in EXTENSIONES_TEXTO):
+        archivo_origen = os.path.join(origen, *ruta.split('/'))
+        with open(archivo_origen, 'rb') as f:
+            datos = f.read()
+        extension = posixpath.splitext(ruta)[1].lower()
+
+        if extension == '.css':
+            datos = _reescribir_css(ruta, datos.decode('utf-8'), archivos, variantes).encode('utf-8')
+        elif extension in EXTENSIONES_IMAGEN and Image is not None:
+            variantes[ruta] = _variantes_imagen(ruta, archivo_origen, destino)
+
+        archivos[ruta] = con_huella(ruta, datos)
+        archivo = _escribir(destino, archivos[ruta], datos)
+        if extension in EXTENSIONES_TEXTO:
+            comprimidos[ruta] = _precomprimir(archivo, datos)
+        if verbose:
+            extra = ''.join(f' {mime.split("/")[1]}x{len(lista)}' for mime, lista in variantes.get(ruta, {}).items())
+            extra += ''.join(f' {ext}' for ext in comprimidos.get(ruta, ()))
+            print(f"  {ruta} -> {archivos[ruta]}{extra}")
+
+    manifiesto = {'archivos': archivos, 'variantes': variantes}
+    with open(os.path.join(destino, MANIFIESTO), 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, indent=2, ensure_ascii=False)
+    return manifiesto
+
+
+def cargar_manifiesto(origen=ORIGEN):
+    try:
+        with open(os.path.join(origen, CARPETA_DIST, MANIFIESTO), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'archivos': {}, 'variantes': {}}
+
+
+def init_app(app):
+    """Resuelve url_for('static', ...) con el manifiesto y sirve dist/ como inmutable y precomprimido."""
+    manifiesto = cargar_manifiesto(app.static_folder)
+    archivos = manifiesto['archivos']
+    prefijo = CARPETA_DIST + '/'
+
+    @app.url_defaults
+    def resolver_estatico(endpoint, values):
+        if endpoint == 'static' and values.get('filename') in archivos:
+            values['filename'] = prefijo + archivos[values['filename']]
+
+    def servir_estatico(filename):
+        if not filename.startswith(prefijo):
+            return app.send_static_file(filename)
+        respuesta = None
+        for codificacion, extension in (('br', '.br'), ('gzip', '.gz')):
+            if request.accept_encodings[codificacion] and os.path.isfile(
+                    os.path.join(app.static_folder, *(filename + extension).split('/'))):
+                respuesta = send_from_directory(app.static_folder, filename + extension,
+                                                mimetype=mimetypes.guess_type(filename)[0],
+                                                max_age=MAX_AGE_INMUTABLE)
+                respuesta.headers['Content-Encoding'] = codificacion
+                break
+        if respuesta is None:
+            respuesta = send_from_directory(app.static_folder, filename, max_age=MAX_AGE_INMUTABLE)
+        respuesta.cache_control.public = True
+        respuesta.cache_control.immutable = True
+        respuesta.vary.add('Accept-Encoding')
+        return respuesta
+
+    def srcset_estatico(ruta, mime='image/webp'):
+        """'url 640w, url 1280w, ...' de las variantes de una imagen, para <img srcset> / <source>."""
+        from flask import url_for
+        lista = manifiesto['variantes'].get(ruta, {}).get(mime, [])
+        return Markup(', '.join(f"{url_for('static', filename=prefijo + r)} {ancho}w" for ancho, r in lista))
+
+    app.view_functions['static'] = servir_estatico
+    app.jinja_env.globals['srcset_estatico'] = srcset_estatico
+
+
+if __name__ == '__main__':
+    print(f"Generando {os.path.join(ORIGEN, CARPETA_DIST)}"
+          f"{'' if Image else ' (sin Pillow: sin variantes de imagen)'}{'' if brotli else ' (sin brotli: sólo .gz)'}")
+    resultado = construir(verbose=True)
+    print(f"{len(resultado['archivos'])} archivos en el manifiesto.")
@@ -0,0 +1,163 @@
+"""Métricas de la aplicación en formato de texto de Prometheus.
+
+Por ruta (endpoint de Flask) se acumulan:
+  - histograma de latencia de la petición
+  - peticiones por código de estado y errores (5xx)
+  - histograma de sentencias SQL por petición y tiempo total en SQL
+
+Las sentencias se miden en las conexiones del pool (database.connection),
+así que cuentan todo lo que la petición ejecuta con get_db(). Los contadores
+son por proceso: con varios workers de gunicorn cada uno expone los suyos.
+Registrar una petición cuesta un par de bisect y sumas bajo un lock.
+"""
+import bisect
+import threading
+import time
+
+from flask import g, request, has_request_context
+
+from database.connection import medir_consultas
+
+PREFIJO = 'pernotodo'
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_CONSULTAS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Histograma:
+    """Histograma acumulativo con buckets fijos (le = "menor o igual que")."""
+
+    __slots__ = ('buckets', 'conteos', 'suma', 'total')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.conteos = [0] * len(buckets)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        indice = bisect.bisect_left(self.buckets, valor)
+        if indice < len(self.conteos):
+            self.conteos[indice] += 1
+        self.suma += valor
+        self.total += 1
+
+    def lineas(self, nombre, etiquetas):
+        acumulado = 0
+        for limite, conteo in zip(self.buckets, self.conteos):
+            acumulado += conteo
+            yield f'{nombre}_bucket{{{etiquetas},le="{limite}"}} {acumulado}'
+        yield f'{nombre}_bucket{{{etiquetas},le="+Inf"}} {self.total}'
+        yield f'{nombre}_sum{{{etiquetas}}} {self.suma:.6f}'
+        yield f'{nombre}_count{{{etiquetas}}} {self.total}'
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RegistroMetricas:
+    """Contadores por ruta de este proceso."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencia = {}      # (endpoint, metodo) -> Histograma
+        self.peticiones = {}    # (endpoint, metodo, estado) -> int
+        self.errores = {}       # endpoint -> int
+        self.consultas = {}     # endpoint -> Histograma
+        self.tiempo_sql = {}    # endpoint -> segundos
+        self.inicio = time.time()
+
+    def registrar(self, endpoint, metodo, estado, duracion, consultas, tiempo_sql):
+        with self._lock:
+            histograma = self.latencia.get((endpoint, metodo))
+            if histograma is None:
+                histograma = self.latencia[(endpoint, metodo)] = Histograma(BUCKETS_LATENCIA)
+            histograma.observar(duracion)
+
+            clave = (endpoint, metodo, estado)
+            self.peticiones[clave] = self.peticiones.get(clave, 0) + 1
+            if estado >= 500:
+                self.errores[endpoint] = self.errores.get(endpoint, 0) + 1
+
+            histograma = self.consultas.get(endpoint)
+            if histograma is None:
+                histograma = self.consultas[endpoint] = Histograma(BUCKETS_CONSULTAS)
+            histograma.observar(consultas)
+            self.tiempo_sql[endpoint] = self.tiempo_sql.get(endpoint, 0.0) + tiempo_sql
+
+    def exportar(self, extras=()):
+        """Texto de exposición de Prometheus (text/plain; version=0.0.4).
+
+        `extras` es una secuencia de (nombre, tipo, ayuda, valor) para gauges
+        o contadores sin etiquetas (pool de conexiones, escritor, cachés).
+        """
+        lineas = []
+
+        def cabecera(nombre, tipo, ayuda):
+            lineas.append(f'# HELP {PREFIJO}_{nombre} {ayuda}')
+            lineas.append(f'# TYPE {PREFIJO}_{nombre} {tipo}')
+
+        with self._lock:
+            cabecera('http_request_duration_seconds', 'histogram', 'Latencia de las peticiones por ruta.')
+            for (endpoint, metodo), histograma in sorted(self.latencia.items()):
+                etiquetas = f'endpoint="{_escapar(endpoint)}",method="{metodo}"'
+                lineas.extend(histograma.lineas(f'{PREFIJO}_http_request_duration_seconds', etiquetas))
+
+            cabecera('http_requests_total', 'counter', 'Peticiones atendidas por ruta, método y estado.')
+            for (endpoint, metodo, estado), total in sorted(self.peticiones.items()):
+                lineas.append(f'{PREFIJO}_http_requests_total'
+                              f'{{endpoint="{_escapar(endpoint)}",method="{metodo}",status="{estado}"}} {total}')
+
+            cabecera('http_errors_total', 'counter', 'Respuestas 5xx por ruta.')
+            for endpoint, total in sorted(self.errores.items()):
+                lineas.append(f'{PREFIJO}_http_errors_total{{endpoint="{_escapar(endpoint)}"}} {total}')
+
+            cabecera('sql_statements_per_request', 'histogram', 'Sentencias SQL ejecutadas por petición.')
+            for endpoint, histograma in sorted(self.consultas.items()):
+                lineas.extend(histograma.lineas(f'{PREFIJO}_sql_statements_per_request',
+                                                f'endpoint="{_escapar(endpoint)}"'))
+
+            cabecera('sql_duration_seconds_total', 'counter', 'Tiempo total en SQL por ruta.')
+            for endpoint, segundos in sorted(self.tiempo_sql.items()):
+                lineas.append(f'{PREFIJO}_sql_duration_seconds_total{{endpoint="{_escapar(endpoint)}"}} {segundos:.6f}')
+
+        cabecera('process_start_time_seconds', 'gauge', 'Inicio del proceso (epoch).')
+        lineas.append(f'{PREFIJO}_process_start_time_seconds {self.inicio:.0f}')
+        for nombre, tipo, ayuda, valor in extras:
+            cabecera(nombre, tipo, ayuda)
+            lineas.append(f'{PREFIJO}_{nombre} {valor}')
+
+        return '\n'.join(lineas) + '\n'
+
+
+registro = RegistroMetricas()
+
+
+def _medir_sql(conn, sql, parametros, duracion):
+    """Medidor de database.connection: acumula en la petición en curso."""
+    if has_request_context():
+        g.sql_consultas = g.get('sql_consultas', 0) + 1
+        g.sql_tiempo = g.get('sql_tiempo', 0.0) + duracion
+
+
+def init_app(app):
+    """Registra los hooks de Flask y el medidor de SQL de las conexiones del pool."""
+    medir_consultas(_medir_sql)
+
+    @app.before_request
+    def _iniciar_medicion():
+        g.metricas_inicio = time.perf_counter()
+
+    @app.after_request
+    def _registrar_peticion(response):
+        inicio = g.get('metricas_inicio')
+        if inicio is not None:
+            registro.registrar(
+                request.endpoint or 'desconocido',
+                request.method,
+                response.status_code,
+                time.perf_counter() - inicio,
+                g.get('sql_consultas', 0),
+                g.get('sql_tiempo', 0.0),
+            )
+        return response
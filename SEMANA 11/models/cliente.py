@@ -4,6 +4,8 @@ class Cliente:
     """
     Clase que representa un cliente en el sistema
     """
+
+    __slots__ = ('id', 'nombre', 'apellido', 'telefono', 'email', 'direccion', 'ruc_ci', 'tipo')
     
     def __init__(self, id=None, nombre=None, apellido=None, telefono=None, 
                  email=None, direccion=None, ruc_ci=None, tipo='minorista'):
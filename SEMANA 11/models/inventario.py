@@ -1,99 +1,210 @@
+import threading
+
 from models.producto import Producto
 from database.connection import get_db_connection
+from database.version_catalogo import leer_version_catalogo, cambios_desde
 
 class Inventario:
     """
     Clase que gestiona el inventario de productos utilizando un diccionario en memoria
-    para optimizar las operaciones frecuentes, mientras mantiene persistencia en la base de datos
+    para optimizar las operaciones frecuentes, mientras mantiene persistencia en la base de datos.
+
+    Se carga de forma perezosa en el primer acceso y se mantiene coherente entre workers
+    comparando la versión del catálogo (catalogo_version): si otro proceso cambió productos,
+    sólo se vuelven a leer las filas modificadas (catalogo_cambios), no el catálogo completo.
     """
-    
+
+    # Máximo de ids por consulta IN (...) al refrescar filas
+    TAMANO_BLOQUE = 500
+
     def __init__(self):
         self.productos = {}  # Diccionario para búsquedas rápidas por ID
-        self.cargar_inventario()
-    
+        self.por_codigo = {}  # codigo_producto -> id_producto
+        self.bajo_stock = set()  # ids con stock_actual < stock_minimo (se mantiene en cada cambio)
+        self.version = None  # None = todavía no cargado
+        self._lock = threading.RLock()
+        self.stats = {'cargas_completas': 0, 'sincronizaciones': 0, 'filas_refrescadas': 0}
+
+    def _guardar_en_memoria(self, producto):
+        anterior = self.productos.get(producto.id_producto)
+        if anterior is not None and anterior.codigo_producto != producto.codigo_producto:
+            self.por_codigo.pop(anterior.codigo_producto, None)
+        self.productos[producto.id_producto] = producto
+        self.por_codigo[producto.codigo_producto] = producto.id_producto
+        self._marcar_stock(producto)
+
+    def _marcar_stock(self, producto):
+        if producto.stock_actual < producto.stock_minimo:
+            self.bajo_stock.add(producto.id_producto)
+        else:
+            self.bajo_stock.discard(producto.id_producto)
+
+    def _quitar_de_memoria(self, producto_id):
+        producto = self.productos.pop(producto_id, None)
+        if producto is not None:
+            self.por_codigo.pop(producto.codigo_producto, None)
+        self.bajo_stock.discard(producto_id)
+
+    def _leer_filas(self, conn, ids):
+        columnas = ', '.join(Producto.COLUMNAS)
+        ids = list(ids)
+        for i in range(0, len(ids), self.TAMANO_BLOQUE):
+            bloque = ids[i:i + self.TAMANO_BLOQUE]
+            marcadores = ', '.join('?' * len(bloque))
+            yield from conn.execute(
+                f"SELECT {columnas} FROM productos WHERE id_producto IN ({marcadores})", bloque)
+
     def cargar_inventario(self):
         """
         Carga todos los productos desde la base de datos al diccionario en memoria
         """
-        productos_db = Producto.obtener_todos()
-        self.productos = {producto.id: producto for producto in productos_db}
-    
-    def añadir_producto(self, producto):
+        conn = get_db_connection()
+        with self._lock:
+            # La versión se lee ANTES que las filas: un cambio concurrente se verá en la próxima sincronización
+            version = leer_version_catalogo(conn)
+            self.productos = {}
+            self.por_codigo = {}
+            self.bajo_stock = set()
+            for row in conn.execute(f"SELECT {', '.join(Producto.COLUMNAS)} FROM productos"):
+                self._guardar_en_memoria(Producto.desde_fila(row))
+            self.version = version
+            self.stats['cargas_completas'] += 1
+        conn.close()
+
+    def sincronizar(self):
         """
-        Añade un nuevo producto al inventario
+        Pone el diccionario al día con la base de datos: carga completa la primera vez
+        y, después, sólo las filas que cambiaron desde la última versión vista
         """
-        producto.guardar()  # Guarda en la base de datos
-        self.productos[producto.id] = producto  # Actualiza el diccionario en memoria
-        return producto.id
-    
+        with self._lock:
+            vista = self.version
+        if vista is None:
+            self.cargar_inventario()
+            return
+
+        conn = get_db_connection()
+        version = leer_version_catalogo(conn)
+        if version != vista:
+            with self._lock:
+                if version != self.version:
+                    cambios = cambios_desde(conn, self.version)
+                    for producto_id, eliminado in cambios:
+                        if eliminado:
+                            self._quitar_de_memoria(producto_id)
+                    vigentes = [producto_id for producto_id, eliminado in cambios if not eliminado]
+                    for row in self._leer_filas(conn, vigentes):
+                        self._guardar_en_memoria(Producto.desde_fila(row))
+                    self.version = version
+                    self.stats['sincronizaciones'] += 1
+                    self.stats['filas_refrescadas'] += len(cambios)
+        conn.close()
+
+    def refrescar_producto(self, producto_id):
+        """
+        Vuelve a leer un producto desde la base de datos (write-through tras escribirlo)
+        """
+        conn = get_db_connection()
+        row = next(self._leer_filas(conn, [producto_id]), None)
+        conn.close()
+        with self._lock:
+            if row is None:
+                self._quitar_de_memoria(producto_id)
+            else:
+                self._guardar_en_memoria(Producto.desde_fila(row))
+
+    def añadir_producto(self, datos):
+        """
+        Añade un nuevo producto al inventario (base de datos + memoria). Devuelve el id
+        """
+        columnas = [c for c in Producto.COLUMNAS if c != 'id_producto']
+        conn = get_db_connection()
+        cursor = conn.execute(
+            f"INSERT INTO productos ({', '.join(columnas)}) VALUES ({', '.join('?' * len(columnas))})",
+            [datos.get(c) for c in columnas]
+        )
+        producto_id = cursor.lastrowid
+        conn.commit()
+        conn.close()
+        self.refrescar_producto(producto_id)
+        return producto_id
+
     def eliminar_producto(self, producto_id):
         """
         Elimina un producto del inventario por ID
         """
-        if producto_id in self.productos:
-            producto = self.productos[producto_id]
-            producto.eliminar()  # Elimina de la base de datos
-            del self.productos[producto_id]  # Elimina del diccionario en memoria
-            return True
-        return False
-    
+        conn = get_db_connection()
+        cursor = conn.execute("DELETE FROM productos WHERE id_producto = ?", (producto_id,))
+        conn.commit()
+        conn.close()
+        with self._lock:
+            self._quitar_de_memoria(producto_id)
+        return cursor.rowcount > 0
+
     def actualizar_producto(self, producto_id, **kwargs):
         """
         Actualiza los atributos de un producto
         """
-        if producto_id in self.productos:
-            producto = self.productos[producto_id]
-            
-            # Actualizar los atributos proporcionados
-            for key, value in kwargs.items():
-                if hasattr(producto, key):
-                    setattr(producto, key, value)
-            
-            producto.guardar()  # Guarda los cambios en la base de datos
-            return True
-        return False
-    
+        columnas = [c for c in kwargs if c in Producto.COLUMNAS and c != 'id_producto']
+        if not columnas:
+            return False
+
+        conn = get_db_connection()
+        cursor = conn.execute(
+            f"UPDATE productos SET {', '.join(c + ' = ?' for c in columnas)}, "
+            f"fecha_actualizacion = CURRENT_TIMESTAMP WHERE id_producto = ?",
+            [kwargs[c] for c in columnas] + [producto_id]
+        )
+        conn.commit()
+        conn.close()
+        self.refrescar_producto(producto_id)
+        return cursor.rowcount > 0
+
     def buscar_por_nombre(self, nombre):
         """
-        Busca productos por nombre (usa búsqueda en base de datos para coincidencias parciales)
+        Busca productos por nombre (coincidencia parcial, sin distinguir mayúsculas)
         """
-        return Producto.buscar_por_nombre(nombre)
-    
+        self.sincronizar()
+        nombre = nombre.lower()
+        return [p for p in self.productos.values() if nombre in p.nombre_producto.lower()]
+
     def obtener_producto(self, producto_id):
         """
         Obtiene un producto por ID
         """
+        self.sincronizar()
         return self.productos.get(producto_id)
-    
+
+    def obtener_por_codigo(self, codigo_producto):
+        """
+        Obtiene un producto por su código (None si no existe)
+        """
+        self.sincronizar()
+        producto_id = self.por_codigo.get(codigo_producto)
+        return self.productos.get(producto_id) if producto_id is not None else None
+
     def obtener_todos(self):
         """
         Obtiene todos los productos del inventario
         """
+        self.sincronizar()
         return list(self.productos.values())
-    
+
     def obtener_productos_bajo_stock(self):
         """
-        Obtiene productos con stock por debajo del mínimo
+        Obtiene productos con stock por debajo del mínimo, mayor déficit primero
         """
-        return [p for p in self.productos.values() if p.stock < p.stock_minimo]
-    
+        self.sincronizar()
+        productos = [self.productos[producto_id] for producto_id in self.bajo_stock]
+        return sorted(productos, key=lambda p: (p.stock_actual - p.stock_minimo, p.id_producto))
+
     def contar_productos_bajo_stock(self):
         """
         Cuenta los productos con stock por debajo del mínimo
         """
-        count = 0
-        for producto in self.productos.values():
-            if producto.stock < producto.stock_minimo:
-                count += 1
-        return count
-    
-    def actualizar_stock(self, producto_id, cantidad):
-        """
-        Actualiza el stock de un producto
-        """
-        if producto_id in self.productos:
-            producto = self.productos[producto_id]
-            producto.stock += cantidad
-            producto.guardar()
-            return True
-        return False
\ No newline at end of file
+        self.sincronizar()
+        return len(self.bajo_stock)
+
+    def snapshot(self):
+        data = dict(self.stats)
+        data.update({'productos': len(self.productos), 'bajo_stock': len(self.bajo_stock), 'version': self.version})
+        return data
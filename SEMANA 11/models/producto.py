@@ -1,4 +1,18 @@
+import sys
+
+
 class Producto:
+    # Columnas de la tabla productos que se cargan en memoria (mismo orden que __init__)
+    COLUMNAS = ('id_producto', 'codigo_producto', 'nombre_producto', 'descripcion',
+                'material', 'tipo_rosca', 'medida', 'unidad_medida', 'precio_compra',
+                'precio_venta', 'stock_actual', 'stock_minimo', 'id_proveedor', 'id_categoria')
+
+    # Sin __dict__ por instancia: el catálogo completo vive en memoria en cada worker
+    __slots__ = COLUMNAS
+
+    # Columnas con pocos valores distintos: se internan para compartir una sola cadena
+    COLUMNAS_REPETIDAS = ('material', 'tipo_rosca', 'medida', 'unidad_medida')
+
     def __init__(self, id_producto, codigo_producto, nombre_producto, descripcion,
                  material, tipo_rosca, medida, unidad_medida, precio_compra,
                  precio_venta, stock_actual, stock_minimo, id_proveedor, id_categoria):
@@ -15,4 +29,14 @@ class Producto:
         self.stock_actual = stock_actual
         self.stock_minimo = stock_minimo
         self.id_proveedor = id_proveedor
-        self.id_categoria = id_categoria
\ No newline at end of file
+        self.id_categoria = id_categoria
+
+    @classmethod
+    def desde_fila(cls, row):
+        """Crea un Producto a partir de una fila (sqlite3.Row) con las COLUMNAS."""
+        producto = cls(*(row[c] for c in cls.COLUMNAS))
+        for columna in cls.COLUMNAS_REPETIDAS:
+            valor = getattr(producto, columna)
+            if isinstance(valor, str):
+                setattr(producto, columna, sys.intern(valor))
+        return producto
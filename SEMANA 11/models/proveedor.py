@@ -4,6 +4,8 @@ class Proveedor:
     """
     Clase que representa un proveedor en el sistema
     """
+
+    __slots__ = ('id', 'nombre', 'contacto', 'telefono', 'email', 'direccion', 'ruc')
     
     def __init__(self, id=None, nombre=None, contacto=None, telefono=None, 
                  email=None, direccion=None, ruc=None):
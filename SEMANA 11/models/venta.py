@@ -5,6 +5,8 @@ class Venta:
     """
     Clase que representa una venta en el sistema
     """
+
+    __slots__ = ('id', 'cliente_id', 'fecha', 'total', 'estado', 'tipo_pago', 'detalles')
     
     def __init__(self, id=None, cliente_id=None, fecha=None, total=0, 
                  estado='completada', tipo_pago='efectivo', detalles=None):
@@ -0,0 +1,289 @@
+/*
+ * Catálogo local y cola de ventas del POS (funciona sin conexión).
+ *
+ * - Descarga una vez /api/catalogo/snapshot, lo guarda en IndexedDB y busca
+ *   ahí: el autocompletado no espera al servidor en cada tecla.
+ * - Cada INTERVALO_DELTA_MS (y al volver la conexión o tras una venta) pide
+ *   /api/catalogo/delta?since=<versión> y aplica sólo lo que cambió.
+ * - Busca con las mismas reglas que el servidor (subcadena en las columnas
+ *   del índice FTS), así que en línea y sin conexión se encuentra lo mismo.
+ * - Si al cobrar no hay conexión, la venta queda en localStorage con una
+ *   clave única y su fecha, y se envía a finalizar_venta cuando vuelve la
+ *   red. El servidor usa la clave para no registrarla dos veces si un
+ *   reintento llega después de una respuesta perdida, y la fecha para
+ *   registrarla el día en que se cobró.
+ *
+ * Uso: CatalogoPOS.iniciar({snapshot, delta, checkout}) y luego
+ * CatalogoPOS.buscar(texto), CatalogoPOS.cobrar(cuerpo).
+ */
+(function () {
+    'use strict';
+
+    const BASE_IDB = 'pernotodo_pos';
+    const ALMACEN_IDB = 'catalogo';
+    const CLAVE_COLA = 'pos_ventas_pendientes';
+    const CLAVE_RECHAZADAS = 'pos_ventas_rechazadas';
+    const INTERVALO_DELTA_MS = 30000;
+    // Mismo orden que COLUMNAS de database/catalogo_pos.py
+    const COLUMNAS = ['id', 'codigo', 'nombre', 'precio', 'stock', 'descripcion', 'material', 'medida'];
+    // Como database/busqueda.py: MIN_TRIGRAMA y PESOS_BM25 (código, nombre, descripción, material, medida)
+    const MIN_TRIGRAMA = 3;
+    const PESOS = [10, 5, 1, 1, 1];
+
+    let urls = {};
+    let version = null;
+    let productos = new Map();   // id -> {...COLUMNAS, _campos: textos en minúsculas para buscar}
+    let enviando = false;
+    const oyentes = [];
+
+    // --- IndexedDB (un solo registro con la versión y las filas) ---
+
+    function abrirBase() {
+        return new Promise((resolve, reject) => {
+            const peticion = indexedDB.open(BASE_IDB, 1);
+            peticion.onupgradeneeded = () => peticion.result.createObjectStore(ALMACEN_IDB);
+            peticion.onsuccess = () => resolve(peticion.result);
+            peticion.onerror = () => reject(peticion.error);
+        });
+    }
+
+    async function leerGuardado() {
+        const base = await abrirBase();
+        return new Promise((resolve, reject) => {
+            const peticion = base.transaction(ALMACEN_IDB).objectStore(ALMACEN_IDB).get('snapshot');
+            // Un snapshot guardado con otras columnas (versión anterior del POS) se descarta
+            peticion.onsuccess = () => {
+                const guardado = peticion.result;
+                resolve(guardado && String(guardado.columnas) === String(COLUMNAS) ? guardado : null);
+            };
+            peticion.onerror = () => reject(peticion.error);
+        });
+    }
+
+    async function guardar() {
+        const base = await abrirBase();
+        const filas = Array.from(productos.values(), p => COLUMNAS.map(columna => p[columna]));
+        return new Promise((resolve, reject) => {
+            const tx = base.transaction(ALMACEN_IDB, 'readwrite');
+            tx.objectStore(ALMACEN_IDB).put({version: version, columnas: COLUMNAS, filas: filas}, 'snapshot');
+            tx.oncomplete = () => resolve();
+            tx.onerror = () => reject(tx.error);
+        });
+    }
+
+    // --- Catálogo en memoria ---
+
+    function minusculas(texto) {
+        return String(texto || '').toLowerCase();
+    }
+
+    function ponerFila(fila) {
+        const [id, codigo, nombre, precio, stock, descripcion, material, medida] = fila;
+        productos.set(id, {id, codigo, nombre, precio, stock, descripcion, material, medida,
+                           _campos: [codigo, nombre, descripcion, material, medida].map(minusculas)});
+    }
+
+    function comprobarColumnas(datos) {
+        if (String(datos.columnas) !== String(COLUMNAS)) throw new Error('columnas del catálogo desconocidas');
+    }
+
+    async function descargarSnapshot() {
+        const respuesta = await fetch(urls.snapshot, {credentials: 'same-origin'});
+        if (!respuesta.ok) throw new Error(`snapshot: HTTP ${respuesta.status}`);
+        const datos = await respuesta.json();
+        comprobarColumnas(datos);
+        productos = new Map();
+        datos.filas.forEach(ponerFila);
+        version = datos.version;
+        await guardar();
+    }
+
+    async function sincronizar() {
+        if (version === null) return descargarSnapshot();
+        const respuesta = await fetch(`${urls.delta}?since=${version}`, {credentials: 'same-origin'});
+        if (respuesta.status === 410) return descargarSnapshot();
+        if (!respuesta.ok) throw new Error(`delta: HTTP ${respuesta.status}`);
+        const delta = await respuesta.json();
+        comprobarColumnas(delta);
+        delta.filas.forEach(ponerFila);
+        delta.eliminados.forEach(id => productos.delete(id));
+        const cambio = delta.version !== version;
+        version = delta.version;
+        if (cambio) await guardar();
+    }
+
+    function sincronizarEnSegundoPlano() {
+        sincronizar().catch(error => console.warn('Catálogo local sin actualizar:', error.message));
+    }
+
+    /* Misma búsqueda que buscar_productos del servidor: cada término de 3 o
+       más caracteres debe aparecer como subcadena (igual que el índice
+       trigram) en código, nombre, descripción, material o medida; los más
+       cortos, en código o nombre (el LIKE del servidor). Orden: código
+       exacto, código que empieza con el texto y luego relevancia. bm25 no se
+       reproduce: se suman los pesos de las columnas donde aparece cada
+       término y se desempata por nombre. */
+    function buscar(texto, limite = 10) {
+        const terminos = minusculas(texto).split(/\s+/).filter(Boolean);
+        if (terminos.length === 0) return [];
+        const largos = terminos.filter(t => t.length >= MIN_TRIGRAMA);
+        const cortos = terminos.filter(t => t.length < MIN_TRIGRAMA);
+        const codigo = minusculas(texto.trim());
+        const encontrados = [];
+        for (const p of productos.values()) {
+            const campos = p._campos;
+            if (!cortos.every(t => campos[0].includes(t) || campos[1].includes(t))) continue;
+            let puntaje = 0;
+            for (const t of largos) {
+                const peso = campos.reduce((suma, campo, i) => suma + (campo.includes(t) ? PESOS[i] : 0), 0);
+                if (peso === 0) { puntaje = -1; break; }
+                puntaje += peso;
+            }
+            if (puntaje < 0) continue;
+            const orden = campos[0] === codigo ? 0 : (campos[0].startsWith(codigo) ? 1 : 2);
+            encontrados.push({p, orden, puntaje});
+        }
+        // Nombre en orden binario, como el ORDER BY nombre_producto de SQLite
+        encontrados.sort((a, b) => a.orden - b.orden || b.puntaje - a.puntaje ||
+                                   (a.p.nombre < b.p.nombre ? -1 : a.p.nombre > b.p.nombre ? 1 : 0));
+        return encontrados.slice(0, limite)
+            .map(({p: {id, codigo, nombre, precio, stock}}) => ({id, codigo, nombre, precio, stock}));
+    }
+
+    function descontarLocal(carrito) {
+        carrito.forEach(item => {
+            const p = productos.get(item.id);
+            if (p) p.stock = Math.max(0, p.stock - item.cantidad);
+        });
+    }
+
+    // --- Cola de ventas sin conexión ---
+
+    function leerLista(clave) {
+        try {
+            return JSON.parse(localStorage.getItem(clave)) || [];
+        } catch (e) {
+            return [];
+        }
+    }
+
+    function escribirLista(clave, lista) {
+        localStorage.setItem(clave, JSON.stringify(lista));
+        avisar();
+    }
+
+    function nuevaClave() {
+        if (window.crypto && crypto.randomUUID) return crypto.randomUUID();
+        return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 12)}`;
+    }
+
+    function avisar() {
+        const estado = {pendientes: leerLista(CLAVE_COLA).length, rechazadas: leerLista(CLAVE_RECHAZADAS),
+                        enLinea: navigator.onLine, version: version, productos: productos.size};
+        oyentes.forEach(funcion => funcion(estado));
+    }
+
+    async function enviarPendientes() {
+        if (enviando) return;
+        enviando = true;
+        try {
+            let cola = leerLista(CLAVE_COLA);
+            while (cola.length > 0) {
+                const venta = cola[0];
+                let respuesta;
+                try {
+                    respuesta = await fetch(urls.checkout, {
+                        method: 'POST', credentials: 'same-origin',
+                        headers: {'Content-Type': 'application/json'},
+                        body: JSON.stringify(venta.cuerpo),
+                    });
+                } catch (e) {
+                    break;  // sigue sin conexión: se reintenta más tarde
+                }
+                if (respuesta.status >= 500 || respuesta.redirected) break;
+                if (!respuesta.ok) {
+                    // 400/409: el servidor la rechazó (p. ej. stock agotado mientras se estaba offline)
+                    const detalle = await respuesta.json().catch(() => ({}));
+                    escribirLista(CLAVE_RECHAZADAS, leerLista(CLAVE_RECHAZADAS).concat(
+                        [{...venta, motivo: detalle.message || `HTTP ${respuesta.status}`, lineas: detalle.lineas_fallidas}]));
+                }
+                cola = leerLista(CLAVE_COLA).filter(v => v.clave !== venta.clave);
+                escribirLista(CLAVE_COLA, cola);
+            }
+        } finally {
+            enviando = false;
+            avisar();
+        }
+        sincronizarEnSegundoPlano();
+    }
+
+    /* Envía la venta. Devuelve {estado: 'registrada', resultado} o, si no hay
+       conexión, {estado: 'encolada'}. Las respuestas de error del servidor se
+       lanzan como antes (Error con .respuesta y .datos). */
+    async function cobrar(cuerpo) {
+        const clave = nuevaClave();
+        const venta = {clave: clave, fecha: new Date().toISOString(), cuerpo: {...cuerpo, clave_offline: clave}};
+        let respuesta;
+        try {
+            respuesta = await fetch(urls.checkout, {
+                method: 'POST', credentials: 'same-origin',
+                headers: {'Content-Type': 'application/json'},
+                body: JSON.stringify(venta.cuerpo),
+            });
+        } catch (e) {
+            respuesta = null;
+        }
+        if (respuesta === null || respuesta.status >= 502) {
+            // Al reenviarla, el servidor la registra con la fecha en que se cobró
+            venta.cuerpo.fecha = venta.fecha;
+            escribirLista(CLAVE_COLA, leerLista(CLAVE_COLA).concat([venta]));
+            descontarLocal(cuerpo.carrito);
+            return {estado: 'encolada'};
+        }
+        if (respuesta.redirected) {
+            // fetch siguió la redirección al login: la sesión expiró
+            throw new Error('La sesión expiró. Inicie sesión de nuevo para cobrar.');
+        }
+        const datos = await respuesta.json();
+        if (!respuesta.ok) {
+            const error = new Error(datos.message || `Error del servidor (${respuesta.status})`);
+            error.respuesta = respuesta;
+            error.datos = datos;
+            throw error;
+        }
+        descontarLocal(cuerpo.carrito);
+        return {estado: 'registrada', resultado: datos};
+    }
+
+    async function iniciar(opciones) {
+        urls = opciones;
+        try {
+            const guardado = await leerGuardado();
+            if (guardado) {
+                version = guardado.version;
+                guardado.filas.forEach(ponerFila);
+            }
+        } catch (e) {
+            console.warn('IndexedDB no disponible; el catálogo local vive sólo en esta página.', e);
+        }
+        avisar();
+        if (navigator.onLine) {
+            await sincronizar().catch(error => console.warn('No se pudo actualizar el catálogo local:', error.message));
+            enviarPendientes();
+        }
+        window.addEventListener('online', () => { enviarPendientes(); avisar(); });
+        window.addEventListener('offline', avisar);
+        setInterval(() => { if (navigator.onLine) sincronizarEnSegundoPlano(); }, INTERVALO_DELTA_MS);
+        avisar();
+    }
+
+    window.CatalogoPOS = {
+        iniciar: iniciar,
+        buscar: buscar,
+        cobrar: cobrar,
+        enviarPendientes: enviarPendientes,
+        listo: () => version !== null,
+        alCambiar: funcion => oyentes.push(funcion),
+        descartarRechazadas: () => escribirLista(CLAVE_RECHAZADAS, []),
+    };
+})();
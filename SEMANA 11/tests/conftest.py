@@ -0,0 +1,129 @@
+"""Fixtures compartidas: bases SQLite desechables migradas a la última versión.
+
+La app lee PERNOTODO_DB y la ruta del log de consultas lentas al importarse,
+así que se apuntan a un directorio temporal antes de cualquier import de la
+app: los tests nunca tocan database/pernotodo.db ni logs/.
+"""
+import os
+import sqlite3
+import tempfile
+
+import pytest
+
+_TEMPORAL = tempfile.mkdtemp(prefix='pernotodo_tests_')
+os.environ['PERNOTODO_DB'] = os.path.join(_TEMPORAL, 'app.db')
+os.environ['DB_SLOW_QUERY_LOG'] = os.path.join(_TEMPORAL, 'consultas_lentas.log')
+
+from database.migraciones import migrar  # noqa: E402
+
+# Usuarios que crea la migración 0001
+ADMIN = 'admin@pernotodo.com'
+VENDEDOR = 'vendedor@pernotodo.com'
+
+
+def abrir_base(ruta):
+    conn = sqlite3.connect(str(ruta))
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+@pytest.fixture
+def ruta_base(tmp_path):
+    """Archivo de una base nueva, ya migrada."""
+    ruta = tmp_path / 'pernotodo.db'
+    conn = abrir_base(ruta)
+    migrar(conn)
+    conn.close()
+    return ruta
+
+
+@pytest.fixture
+def nueva_base(tmp_path):
+    """nueva_base(nombre) -> conexión a un archivo vacío (sin migrar) en tmp_path; se cierra al terminar."""
+    conexiones = []
+
+    def abrir(nombre='vacia.db'):
+        conexion = abrir_base(tmp_path / nombre)
+        conexiones.append(conexion)
+        return conexion
+    yield abrir
+    for conexion in conexiones:
+        conexion.close()
+
+
+@pytest.fixture
+def conn(ruta_base):
+    conexion = abrir_base(ruta_base)
+    yield conexion
+    conexion.close()
+
+
+@pytest.fixture
+def nuevo_producto():
+    """nuevo_producto(conn, codigo, **columnas) -> id_producto (con commit)."""
+    def crear(conn, codigo, nombre=None, precio_venta=1.0, stock_actual=100, **columnas):
+        datos = {
+            'codigo_producto': codigo,
+            'nombre_producto': nombre or f'Producto {codigo}',
+            'material': 'acero',
+            'medida': 'M6x20',
+            'precio_compra': round(precio_venta / 2, 2),
+            'precio_venta': precio_venta,
+            'stock_actual': stock_actual,
+        }
+        datos.update(columnas)
+        cursor = conn.execute(
+            f"INSERT INTO productos ({', '.join(datos)}) VALUES ({', '.join('?' * len(datos))})",
+            list(datos.values()))
+        conn.commit()
+        return cursor.lastrowid
+    return crear
+
+
+@pytest.fixture
+def nueva_venta():
+    """nueva_venta((id_producto, cantidad), ..., **campos) -> dict de venta para registrar_venta/EscritorVentas."""
+    def crear(*items, **campos):
+        venta = {'cedula_cliente': '9999999999', 'id_empleado': 1, 'id_local': 1, 'estado': 'completada',
+                 'items': [{'id': id_producto, 'cantidad': cantidad} for id_producto, cantidad in items]}
+        venta.update(campos)
+        return venta
+    return crear
+
+
+@pytest.fixture(scope='session')
+def app():
+    """La app Flask sobre la base temporal PERNOTODO_DB, migrada una sola vez por sesión."""
+    from database.connection import init_db
+    init_db()
+    from app import app as aplicacion
+    aplicacion.config['TESTING'] = True
+    return aplicacion
+
+
+def cliente_con_sesion(app, email):
+    cliente = app.test_client()
+    with cliente.session_transaction() as sesion:
+        sesion['email'] = email
+    return cliente
+
+
+@pytest.fixture
+def cliente(app):
+    """Test client con la sesión del vendedor inicial."""
+    return cliente_con_sesion(app, VENDEDOR)
+
+
+@pytest.fixture
+def cliente_admin(app):
+    """Test client con la sesión del administrador inicial."""
+    return cliente_con_sesion(app, ADMIN)
+
+
+@pytest.fixture
+def base_app(app):
+    """Conexión a la base de la app (fuera de una petición: no sale del pool), para preparar datos."""
+    from database.connection import get_db
+    db = get_db()
+    yield db
+    db.close()
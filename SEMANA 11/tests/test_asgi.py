@@ -0,0 +1,75 @@
+import asyncio
+import json
+
+import pytest
+
+
+@pytest.fixture
+def asgi(app):
+    import asgi
+    return asgi
+
+
+def llamar(aplicacion, metodo, ruta, cuerpo=b'', cookie=None):
+    """Ejecuta una petición HTTP contra la app ASGI. Devuelve (status, cuerpo)."""
+    cabeceras = [(b'content-type', b'application/json')]
+    if cookie:
+        cabeceras.append((b'cookie', cookie.encode('latin-1')))
+    scope = {'type': 'http', 'method': metodo, 'path': ruta, 'root_path': '', 'query_string': b'',
+             'headers': cabeceras, 'http_version': '1.1', 'scheme': 'http'}
+    mensajes = [{'type': 'http.request', 'body': cuerpo, 'more_body': False}]
+    enviados = []
+
+    async def receive():
+        return mensajes.pop(0) if mensajes else {'type': 'http.disconnect'}
+
+    async def send(mensaje):
+        enviados.append(mensaje)
+
+    asyncio.run(aplicacion(scope, receive, send))
+    return enviados[0]['status'], b''.join(m.get('body', b'') for m in enviados[1:])
+
+
+def test_cobro_no_retiene_conexion_mientras_espera(asgi, cliente, base_app, nuevo_producto, monkeypatch):
+    from app import cache_usuarios
+    from database.connection import get_pool
+    from database.ventas_writer import get_escritor
+
+    id_producto = nuevo_producto(base_app, 'ASGI-1', stock_actual=5)
+    # Sin g.user en caché: load_logged_in_user toma la conexión de la petición
+    cache_usuarios.invalidar()
+    prestadas_antes = get_pool().snapshot()['in_use']
+
+    escritor = get_escritor()
+    enviar_original = escritor.enviar_async
+    prestadas_durante = []
+
+    async def enviar_midiendo(venta):
+        prestadas_durante.append(get_pool().snapshot()['in_use'])
+        return await enviar_original(venta)
+
+    monkeypatch.setattr(escritor, 'enviar_async', enviar_midiendo)
+    cuerpo = json.dumps({'carrito': [{'id': id_producto, 'cantidad': 2}]}).encode()
+    status, respuesta = llamar(asgi.app, 'POST', '/api/finalizar_venta', cuerpo,
+                               cookie=f"session={cliente.get_cookie('session').value}")
+
+    assert status == 200 and json.loads(respuesta)['success']
+    assert prestadas_durante == [prestadas_antes]
+    assert get_pool().snapshot()['in_use'] == prestadas_antes
+
+
+def test_error_de_base_en_cobro_se_registra(asgi, cliente, monkeypatch, caplog):
+    import sqlite3
+    from database.ventas_writer import get_escritor
+
+    async def enviar_con_error(venta):
+        raise sqlite3.OperationalError('database is locked')
+
+    monkeypatch.setattr(get_escritor(), 'enviar_async', enviar_con_error)
+    cuerpo = json.dumps({'carrito': [{'id': 1, 'cantidad': 1}]}).encode()
+    status, _ = llamar(asgi.app, 'POST', '/api/finalizar_venta', cuerpo,
+                       cookie=f"session={cliente.get_cookie('session').value}")
+
+    assert status == 500
+    registro = [r for r in caplog.records if 'finalizar_venta' in r.getMessage()]
+    assert registro and registro[0].exc_info is not None
@@ -0,0 +1,73 @@
+from database.busqueda import buscar_productos, condicion_busqueda
+
+
+def ids_fts(conn, termino):
+    return {row[0] for row in conn.execute(
+        "SELECT rowid FROM productos_fts WHERE productos_fts MATCH ?", (f'"{termino}"',))}
+
+
+def integro(conn):
+    # Falla con SQLITE_CORRUPT_VTAB si el índice no coincide con la tabla productos
+    conn.execute("INSERT INTO productos_fts(productos_fts, rank) VALUES ('integrity-check', 1)")
+    return True
+
+
+def test_triggers_mantienen_el_indice(conn, nuevo_producto):
+    id_producto = nuevo_producto(conn, 'TOR-100', 'Tornillo autorroscante', material='galvanizado')
+    assert ids_fts(conn, 'autorroscante') == {id_producto}
+    assert ids_fts(conn, 'galvan') == {id_producto}
+
+    conn.execute("UPDATE productos SET nombre_producto = 'Tornillo drywall' WHERE id_producto = ?", (id_producto,))
+    conn.commit()
+    assert ids_fts(conn, 'autorroscante') == set()
+    assert ids_fts(conn, 'drywall') == {id_producto}
+
+    # Un descuento de stock no toca columnas indexadas
+    conn.execute("UPDATE productos SET stock_actual = stock_actual - 1 WHERE id_producto = ?", (id_producto,))
+    conn.commit()
+    assert ids_fts(conn, 'drywall') == {id_producto}
+
+    conn.execute("DELETE FROM productos WHERE id_producto = ?", (id_producto,))
+    conn.commit()
+    assert ids_fts(conn, 'drywall') == set()
+    assert integro(conn)
+
+
+def test_busqueda_por_subcadena_en_columnas_indexadas(conn, nuevo_producto):
+    perno = nuevo_producto(conn, 'PER-001', 'Perno hexagonal', medida='M8x20', descripcion='Rosca fina')
+    nuevo_producto(conn, 'TUE-001', 'Tuerca hexagonal', medida='M6x10')
+
+    assert [r['id_producto'] for r in buscar_productos(conn, '8x20')] == [perno]
+    assert [r['id_producto'] for r in buscar_productos(conn, 'rosca fina')] == [perno]
+    assert len(buscar_productos(conn, 'hexagonal')) == 2
+
+
+def test_codigo_exacto_primero(conn, nuevo_producto):
+    nuevo_producto(conn, 'ARA-010', 'Arandela ARA-001 compatible')
+    exacto = nuevo_producto(conn, 'ARA-001', 'Arandela plana')
+
+    assert buscar_productos(conn, 'ara-001')[0]['id_producto'] == exacto
+
+
+def test_terminos_cortos_usan_like_sobre_codigo_y_nombre(conn, nuevo_producto):
+    m6 = nuevo_producto(conn, 'PER-M6', 'Perno M6')
+    nuevo_producto(conn, 'PER-002', 'Perno largo', medida='M6x90')  # 'M6' sólo en medida
+
+    # Menos de 3 caracteres: el trigram no puede buscarlo, se filtra con LIKE
+    assert [r['id_producto'] for r in buscar_productos(conn, 'm6')] == [m6]
+    sql, params = condicion_busqueda('m6')
+    assert 'MATCH' not in sql and params == ['%m6%', '%m6%']
+
+
+def test_terminos_largos_y_cortos_combinados(conn, nuevo_producto):
+    m6 = nuevo_producto(conn, 'PER-M6', 'Perno carrocero M6')
+    nuevo_producto(conn, 'PER-M8', 'Perno carrocero M8')
+
+    assert [r['id_producto'] for r in buscar_productos(conn, 'carrocero m6')] == [m6]
+    sql, params = condicion_busqueda('carrocero m6')
+    assert 'MATCH' in sql and params == ['"carrocero"', '%m6%', '%m6%']
+
+
+def test_comillas_en_la_consulta(conn, nuevo_producto):
+    id_producto = nuevo_producto(conn, 'CAÑ-001', 'Caño 1/2" galvanizado')
+    assert [r['id_producto'] for r in buscar_productos(conn, '1/2"')] == [id_producto]
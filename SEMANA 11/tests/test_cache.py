@@ -0,0 +1,85 @@
+import pytest
+
+from database import cache as modulo_cache
+from database.cache import CacheLRU, normalizar_consulta
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    """Reloj monotónico manual para probar el TTL sin esperar."""
+    ahora = [1000.0]
+    monkeypatch.setattr(modulo_cache.time, 'monotonic', lambda: ahora[0])
+    return ahora
+
+
+def test_acierto_con_la_misma_version():
+    cache = CacheLRU(max_items=4, ttl=60)
+    cache.set('perno', ['P-1'], version=7)
+    assert cache.get('perno', 7) == ['P-1']
+    assert cache.get('tuerca', 7) is None
+    assert (cache.stats['hits'], cache.stats['misses']) == (1, 1)
+
+
+def test_cambio_de_version_vacia_la_cache():
+    cache = CacheLRU(max_items=4, ttl=60)
+    cache.set('perno', ['P-1'], version=7)
+    cache.set('tuerca', ['T-1'], version=7)
+
+    # Otro worker cambió el catálogo: nada de la versión anterior sirve
+    assert cache.get('perno', 8) is None
+    assert cache.snapshot()['items'] == 0
+    assert cache.stats['invalidations'] == 1
+    # Volver a la versión vieja tampoco recupera lo descartado
+    assert cache.get('tuerca', 7) is None
+
+
+def test_expulsa_el_menos_usado():
+    cache = CacheLRU(max_items=2, ttl=60)
+    cache.set('a', 1, version=1)
+    cache.set('b', 2, version=1)
+    cache.get('a', 1)
+    cache.set('c', 3, version=1)
+    assert cache.get('b', 1) is None
+    assert (cache.get('a', 1), cache.get('c', 1)) == (1, 3)
+    assert cache.stats['evictions'] == 1
+
+
+def test_ttl(reloj):
+    cache = CacheLRU(max_items=4, ttl=30)
+    cache.set('perno', 1, version=1)
+    reloj[0] += 29
+    assert cache.get('perno', 1) == 1
+    reloj[0] += 2
+    assert cache.get('perno', 1) is None
+    assert cache.stats['expired'] == 1
+
+
+def test_invalidar_y_descartar():
+    cache = CacheLRU(max_items=4, ttl=60)
+    cache.set('a', 1, version=1)
+    cache.set('b', 2, version=1)
+    cache.descartar('a')
+    assert cache.get('a', 1) is None and cache.get('b', 1) == 2
+    cache.invalidar()
+    assert cache.get('b', 1) is None
+
+
+def test_normalizar_consulta():
+    assert normalizar_consulta('  Perno   HEX\tM6 ') == 'perno hex m6'
+
+
+def test_busqueda_del_pos_ve_cambios_de_otro_worker(cliente, base_app, nuevo_producto):
+    from app import cache_busqueda
+
+    id_producto = nuevo_producto(base_app, 'LRU-1', 'Abrazadera cromada')
+    primera = cliente.get('/api/buscar_productos?q=abrazadera').get_json()
+    assert [p['id'] for p in primera] == [id_producto]
+    aciertos = cache_busqueda.stats['hits']
+    assert cliente.get('/api/buscar_productos?q=  ABRAZADERA ').get_json() == primera
+    assert cache_busqueda.stats['hits'] == aciertos + 1
+
+    # Escritura directa en la base, como la de otro worker: sólo sube catalogo_version
+    base_app.execute("UPDATE productos SET precio_venta = 9.5 WHERE id_producto = ?", (id_producto,))
+    base_app.commit()
+    segunda = cliente.get('/api/buscar_productos?q=abrazadera').get_json()
+    assert segunda[0]['precio'] == 9.5
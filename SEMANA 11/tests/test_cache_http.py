@@ -0,0 +1,57 @@
+def test_lista_de_productos_304_con_el_mismo_etag(cliente):
+    respuesta = cliente.get('/productos')
+    assert respuesta.status_code == 200
+    etag = respuesta.headers['ETag']
+    assert 'private' in respuesta.headers['Cache-Control'] and 'no-cache' in respuesta.headers['Cache-Control']
+    assert 'Cookie' in respuesta.headers['Vary']
+
+    repetida = cliente.get('/productos', headers={'If-None-Match': etag})
+    assert repetida.status_code == 304
+    assert repetida.data == b''
+    assert repetida.headers['ETag'] == etag
+
+
+def test_cambio_del_catalogo_cambia_el_etag(cliente, base_app, nuevo_producto):
+    etag = cliente.get('/productos').headers['ETag']
+    nuevo_producto(base_app, 'ETAG-1')
+
+    respuesta = cliente.get('/productos', headers={'If-None-Match': etag})
+    assert respuesta.status_code == 200
+    assert respuesta.headers['ETag'] != etag
+
+
+def test_etag_depende_de_quien_pide_y_de_los_parametros(cliente, cliente_admin):
+    etag = cliente.get('/productos').headers['ETag']
+    assert cliente_admin.get('/productos', headers={'If-None-Match': etag}).status_code == 200
+    assert cliente.get('/productos?q=perno', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_no_responde_304_con_mensajes_flash_pendientes(cliente):
+    etag = cliente.get('/productos').headers['ETag']
+    with cliente.session_transaction() as sesion:
+        sesion['_flashes'] = [('success', 'Producto agregado exitosamente.')]
+
+    # La plantilla es la que muestra y consume el mensaje: hay que renderizarla
+    respuesta = cliente.get('/productos', headers={'If-None-Match': etag})
+    assert respuesta.status_code == 200
+    assert 'Producto agregado exitosamente.' in respuesta.get_data(as_text=True)
+    # Ya consumido, la misma página vuelve a ser 304
+    assert cliente.get('/productos', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_proveedores_cambian_con_su_version(cliente_admin, base_app):
+    etag = cliente_admin.get('/proveedores').headers['ETag']
+    assert cliente_admin.get('/proveedores', headers={'If-None-Match': etag}).status_code == 304
+
+    base_app.execute("INSERT INTO proveedores (ruc, nombre_empresa) VALUES ('0990000000001', 'Pernos del Pacífico')")
+    base_app.commit()
+    assert cliente_admin.get('/proveedores', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_referencias_cacheables_un_minuto(cliente):
+    respuesta = cliente.get('/api/referencias')
+    assert respuesta.status_code == 200
+    assert respuesta.cache_control.max_age == 60
+    repetida = cliente.get('/api/referencias', headers={'If-None-Match': respuesta.headers['ETag']})
+    assert repetida.status_code == 304
+    assert repetida.cache_control.max_age == 60
@@ -0,0 +1,114 @@
+import pytest
+
+from database.catalogo_pos import COLUMNAS, delta_catalogo, snapshot_catalogo
+from database.version_catalogo import leer_version_catalogo
+
+
+def por_id(filas):
+    return {fila[0]: dict(zip(COLUMNAS, fila)) for fila in filas}
+
+
+def test_snapshot_con_version_y_filas(conn, nuevo_producto):
+    id_producto = nuevo_producto(conn, 'SNP-1', 'Arandela plana', precio_venta=0.25, stock_actual=0)
+    snapshot = snapshot_catalogo(conn)
+    assert snapshot['version'] == leer_version_catalogo(conn)
+    assert snapshot['columnas'] == list(COLUMNAS)
+    # Los productos agotados también van: el POS sólo los deshabilita
+    fila = por_id(snapshot['filas'])[id_producto]
+    assert fila['codigo'] == 'SNP-1'
+    assert fila['precio'] == 0.25 and fila['stock'] == 0
+    # Las columnas de texto nulas llegan como '' para la búsqueda local
+    assert fila['descripcion'] == ''
+
+
+def test_delta_en_el_limite_de_version(conn, nuevo_producto):
+    quieto = nuevo_producto(conn, 'DLT-1')
+    cambiado = nuevo_producto(conn, 'DLT-2')
+    borrado = nuevo_producto(conn, 'DLT-3')
+    version = leer_version_catalogo(conn)
+
+    delta = delta_catalogo(conn, version)
+    assert delta['filas'] == [] and delta['eliminados'] == []
+
+    conn.execute("UPDATE productos SET stock_actual = 3 WHERE id_producto = ?", (cambiado,))
+    conn.commit()
+    delta = delta_catalogo(conn, version)
+    assert delta['version'] == version + 1
+    assert list(por_id(delta['filas'])) == [cambiado]
+    assert por_id(delta['filas'])[cambiado]['stock'] == 3
+
+    conn.execute("DELETE FROM productos WHERE id_producto = ?", (borrado,))
+    conn.commit()
+    delta = delta_catalogo(conn, version + 1)
+    assert delta['filas'] == [] and delta['eliminados'] == [borrado]
+    # Desde la versión original llegan ambos cambios, y nada del producto sin cambios
+    delta = delta_catalogo(conn, version)
+    assert quieto not in por_id(delta['filas'])
+    assert set(por_id(delta['filas'])) | set(delta['eliminados']) == {cambiado, borrado}
+
+
+def test_delta_desde_version_futura(conn):
+    version = leer_version_catalogo(conn)
+    assert delta_catalogo(conn, version + 1) is None
+
+
+def test_endpoint_delta_valida_since(cliente, base_app):
+    version = leer_version_catalogo(base_app)
+    assert cliente.get('/api/catalogo/delta').status_code == 400
+    assert cliente.get('/api/catalogo/delta?since=-1').status_code == 400
+    assert cliente.get('/api/catalogo/delta?since=abc').status_code == 400
+
+    respuesta = cliente.get(f'/api/catalogo/delta?since={version + 5}')
+    assert respuesta.status_code == 410
+    assert respuesta.get_json()['version'] == version
+
+    respuesta = cliente.get(f'/api/catalogo/delta?since={version}')
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()['filas'] == []
+
+
+def test_endpoint_snapshot_y_etag(cliente, base_app):
+    respuesta = cliente.get('/api/catalogo/snapshot', headers={'Accept-Encoding': 'identity'})
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()['version'] == leer_version_catalogo(base_app)
+    etag = respuesta.headers['ETag']
+    repetida = cliente.get('/api/catalogo/snapshot', headers={'If-None-Match': etag, 'Accept-Encoding': 'identity'})
+    assert repetida.status_code == 304
+    # Otro cuerpo (comprimido) tiene otro ETag fuerte
+    gzip = cliente.get('/api/catalogo/snapshot', headers={'If-None-Match': etag, 'Accept-Encoding': 'gzip'})
+    assert gzip.status_code == 200
+    assert gzip.headers['Content-Encoding'] == 'gzip'
+    assert gzip.headers['ETag'] != etag
+
+
+def test_reintento_de_venta_offline_es_idempotente(cliente, base_app, nuevo_producto):
+    id_producto = nuevo_producto(base_app, 'OFF-1', precio_venta=2.0, stock_actual=10)
+    cuerpo = {
+        'carrito': [{'id': id_producto, 'cantidad': 3}],
+        'clave_offline': 'pos-1-0001',
+        'fecha': '2026-03-14T15:09:26.000Z',
+    }
+
+    primera = cliente.post('/api/finalizar_venta', json=cuerpo).get_json()
+    assert primera['success'] and not primera.get('repetida')
+    segunda = cliente.post('/api/finalizar_venta', json=cuerpo).get_json()
+    assert segunda['success'] and segunda['repetida'] is True
+    assert segunda['id_venta'] == primera['id_venta']
+    assert segunda['total'] == primera['total'] == 6.0
+
+    stock = base_app.execute("SELECT stock_actual FROM productos WHERE id_producto = ?", (id_producto,)).fetchone()[0]
+    assert stock == 7
+    fecha = base_app.execute("SELECT fecha_venta FROM ventas WHERE id_venta = ?", (primera['id_venta'],)).fetchone()[0]
+    assert fecha == '2026-03-14 15:09:26'
+    ventas = base_app.execute("SELECT COUNT(*) FROM ventas_offline WHERE clave = 'pos-1-0001'").fetchone()[0]
+    assert ventas == 1
+
+
+@pytest.mark.parametrize('cuerpo', [
+    {'clave_offline': 'pos-1-0002', 'fecha': 'ayer'},
+    {'clave_offline': 'x' * 65},
+])
+def test_venta_offline_invalida(cliente, base_app, nuevo_producto, cuerpo):
+    id_producto = nuevo_producto(base_app, f"INV-{len(cuerpo['clave_offline'])}")
+    respuesta = cliente.post('/api/finalizar_venta', json=dict(cuerpo, carrito=[{'id': id_producto, 'cantidad': 1}]))
+    assert respuesta.status_code == 400
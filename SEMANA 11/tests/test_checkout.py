@@ -0,0 +1,63 @@
+import pytest
+
+from database.ventas_writer import registrar_venta, VentaRechazada
+
+
+def stock(conn, id_producto):
+    return conn.execute("SELECT stock_actual FROM productos WHERE id_producto = ?", (id_producto,)).fetchone()[0]
+
+
+def test_totales_con_precios_del_servidor(conn, nuevo_producto, nueva_venta):
+    a = nuevo_producto(conn, 'A', precio_venta=0.35, stock_actual=10)
+    b = nuevo_producto(conn, 'B', precio_venta=12.99, stock_actual=10)
+
+    # Líneas repetidas del mismo producto se suman en una sola
+    resultado = registrar_venta(conn, nueva_venta((a, 3), (b, 1), (a, 2)))
+    conn.commit()
+
+    assert resultado['total'] == 14.74
+    detalle = conn.execute(
+        "SELECT id_producto, cantidad, precio_unitario, subtotal FROM detalle_venta WHERE id_venta = ? "
+        "ORDER BY id_producto", (resultado['id_venta'],)).fetchall()
+    assert [tuple(fila) for fila in detalle] == [(a, 5, 0.35, 1.75), (b, 1, 12.99, 12.99)]
+    assert conn.execute("SELECT total FROM ventas WHERE id_venta = ?", (resultado['id_venta'],)).fetchone()[0] == 14.74
+    assert (stock(conn, a), stock(conn, b)) == (5, 9)
+
+
+def test_resumenes_se_acumulan_en_la_misma_venta(conn, nuevo_producto, nueva_venta):
+    a = nuevo_producto(conn, 'A', precio_venta=2.0, stock_actual=10)
+    registrar_venta(conn, nueva_venta((a, 2)))
+    registrar_venta(conn, nueva_venta((a, 1)))
+    conn.commit()
+
+    fila = conn.execute("SELECT num_ventas, unidades, ingresos, costo FROM resumen_ventas_dia").fetchone()
+    assert tuple(fila) == (2, 3, 6.0, 3.0)
+
+
+def test_rechazo_informa_todas_las_lineas_y_no_escribe(conn, nuevo_producto, nueva_venta):
+    a = nuevo_producto(conn, 'A', stock_actual=3)
+    b = nuevo_producto(conn, 'B', stock_actual=10)
+    c = nuevo_producto(conn, 'C', stock_actual=10)
+
+    with pytest.raises(VentaRechazada) as error:
+        registrar_venta(conn, nueva_venta((a, 2), (a, 2), (b, 1), (c, 0), (999, 1)))
+    conn.rollback()
+
+    assert sorted(error.value.lineas, key=lambda linea: linea['id']) == [
+        {'id': a, 'motivo': 'stock_insuficiente', 'solicitado': 4, 'disponible': 3},
+        {'id': c, 'motivo': 'cantidad_invalida', 'solicitado': 0},
+        {'id': 999, 'motivo': 'no_existe', 'solicitado': 1},
+    ]
+    assert conn.execute("SELECT COUNT(*) FROM ventas").fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM detalle_venta").fetchone()[0] == 0
+    assert (stock(conn, a), stock(conn, b)) == (3, 10)
+
+
+def test_venta_de_todo_el_stock(conn, nuevo_producto, nueva_venta):
+    a = nuevo_producto(conn, 'A', stock_actual=4)
+    registrar_venta(conn, nueva_venta((a, 4)))
+    conn.commit()
+    assert stock(conn, a) == 0
+
+    with pytest.raises(VentaRechazada):
+        registrar_venta(conn, nueva_venta((a, 1)))
@@ -0,0 +1,70 @@
+import gzip
+
+import pytest
+from flask import request
+
+import compresion
+
+
+def test_elegir_codificacion_respeta_q(app):
+    with app.test_request_context(headers={'Accept-Encoding': 'gzip, br;q=0'}):
+        assert compresion.elegir_codificacion(request.accept_encodings) == 'gzip'
+    with app.test_request_context(headers={'Accept-Encoding': 'identity'}):
+        assert compresion.elegir_codificacion(request.accept_encodings) is None
+
+
+def test_html_gzip_con_etag_debil(cliente):
+    plano = cliente.get('/productos', headers={'Accept-Encoding': 'identity'})
+    comprimido = cliente.get('/productos', headers={'Accept-Encoding': 'gzip'})
+
+    assert comprimido.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in comprimido.headers['Vary']
+    assert gzip.decompress(comprimido.data) == plano.data
+    # Mismo valor de ETag, pero débil: el cuerpo comprimido no es idéntico byte a byte
+    assert comprimido.headers['ETag'] == 'W/' + plano.headers['ETag']
+
+
+@pytest.mark.parametrize('codificacion', ['gzip', 'br'])
+def test_if_none_match_con_etag_debil(cliente, codificacion):
+    if codificacion == 'br':
+        pytest.importorskip('brotli')
+    cabeceras = {'Accept-Encoding': codificacion}
+    etag_debil = cliente.get('/productos', headers=cabeceras).headers['ETag']
+    assert etag_debil.startswith('W/')
+
+    # El navegador devuelve el ETag débil tal cual; la comparación débil lo reconoce
+    repetida = cliente.get('/productos', headers={**cabeceras, 'If-None-Match': etag_debil})
+    assert repetida.status_code == 304
+    assert 'Content-Encoding' not in repetida.headers
+    assert repetida.data == b''
+
+    # Y el fuerte de una respuesta sin comprimir también vale para la comprimida
+    fuerte = cliente.get('/productos', headers={'Accept-Encoding': 'identity'}).headers['ETag']
+    assert cliente.get('/productos', headers={**cabeceras, 'If-None-Match': fuerte}).status_code == 304
+
+
+def test_brotli_preferido_si_se_acepta(cliente):
+    brotli = pytest.importorskip('brotli')
+    plano = cliente.get('/productos', headers={'Accept-Encoding': 'identity'})
+    respuesta = cliente.get('/productos', headers={'Accept-Encoding': 'gzip, deflate, br'})
+    assert respuesta.headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(respuesta.data) == plano.data
+
+
+def test_respuestas_pequenas_sin_comprimir(cliente):
+    respuesta = cliente.get('/api/buscar_productos?q=zzzz-inexistente', headers={'Accept-Encoding': 'gzip'})
+    assert respuesta.status_code == 200
+    assert 'Content-Encoding' not in respuesta.headers
+    assert 'Accept-Encoding' in respuesta.headers['Vary']
+    assert respuesta.get_json() == []
+
+
+def test_exportacion_csv_en_streaming_comprimida(cliente_admin, base_app, nuevo_producto):
+    nuevo_producto(base_app, 'GZ-CSV-1', 'Perno con ñ')
+    plano = cliente_admin.get('/productos/exportar', headers={'Accept-Encoding': 'identity'})
+    respuesta = cliente_admin.get('/productos/exportar', headers={'Accept-Encoding': 'gzip'})
+    assert respuesta.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in respuesta.headers
+    texto = gzip.decompress(respuesta.data).decode('utf-8')
+    assert texto == plano.get_data(as_text=True)
+    assert 'GZ-CSV-1' in texto
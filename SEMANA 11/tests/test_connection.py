@@ -0,0 +1,19 @@
+from database import connection
+from database.connection import ConnectionPool
+
+
+def test_ping_del_pool_no_se_mide(ruta_base, monkeypatch):
+    medidas = []
+    monkeypatch.setattr(connection, '_medidores_sql', [lambda conn, sql, parametros, segundos: medidas.append(sql)])
+    pool = ConnectionPool(str(ruta_base), size=1)
+
+    for _ in range(3):
+        # Desde la segunda vuelta la conexión sale reutilizada y pasa por el health check
+        conn = pool.acquire()
+        conn.execute("SELECT COUNT(*) FROM productos").fetchone()
+        pool.release(conn)
+    pool.close_all()
+
+    # Los PRAGMA de _connect se miden una vez por conexión; el ping, nunca
+    assert [sql for sql in medidas if not sql.startswith('PRAGMA')] == ["SELECT COUNT(*) FROM productos"] * 3
+    assert pool.snapshot()['reused'] == 2
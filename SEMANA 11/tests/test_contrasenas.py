@@ -0,0 +1,83 @@
+import hashlib
+
+import pytest
+
+from contrasenas import Contrasenas, HasherScrypt
+
+LEGADO = 'legado@pernotodo.com'
+
+
+def hash_legado(password):
+    return hashlib.sha256(password.encode('utf-8')).hexdigest()[:24]
+
+
+@pytest.fixture
+def contrasenas():
+    # Costo bajo para que los tests no tarden; el formato es el mismo
+    return Contrasenas(HasherScrypt(n=2 ** 10))
+
+
+def test_hash_legado_correcto_pide_rehash(contrasenas):
+    correcta, nuevo_hash = contrasenas.verificar('secreto', hash_legado('secreto'))
+
+    assert correcta
+    assert nuevo_hash.startswith('scrypt$n=1024,r=8,p=1$')
+    assert contrasenas.verificar('secreto', nuevo_hash) == (True, None)
+
+
+def test_hash_legado_incorrecto_no_pide_rehash(contrasenas):
+    assert contrasenas.verificar('otra', hash_legado('secreto')) == (False, None)
+
+
+def test_scrypt_con_otro_costo_pide_rehash(contrasenas):
+    anterior = HasherScrypt(n=2 ** 11).calcular('secreto')
+
+    correcta, nuevo_hash = contrasenas.verificar('secreto', anterior)
+
+    assert correcta and nuevo_hash.startswith('scrypt$n=1024,')
+
+
+@pytest.mark.parametrize('codificado', ['scrypt$n=1024$roto', 'sin-formato', '', None])
+def test_hash_malformado_o_vacio_es_incorrecto(contrasenas, codificado):
+    assert contrasenas.verificar('secreto', codificado) == (False, None)
+
+
+def hash_guardado(base_app):
+    return base_app.execute("SELECT password_hash FROM usuario WHERE email = ?", (LEGADO,)).fetchone()[0]
+
+
+def iniciar_sesion(app, password):
+    # Cliente nuevo en cada inicio: sin sesión previa que redirija al dashboard
+    return app.test_client().post('/login', data={'email': LEGADO, 'password': password})
+
+
+@pytest.fixture
+def usuario_legado(base_app):
+    base_app.execute(
+        "INSERT INTO usuario (email, password_hash, nombre, role, password) VALUES (?, ?, ?, ?, ?)",
+        (LEGADO, hash_legado('secreto'), 'Usuario Legado', 'Vendedor', 'secreto'))
+    base_app.commit()
+    yield
+    base_app.execute("DELETE FROM usuario WHERE email = ?", (LEGADO,))
+    base_app.commit()
+
+
+def test_login_con_hash_legado_lo_guarda_en_scrypt(app, base_app, usuario_legado):
+    respuesta = iniciar_sesion(app, 'secreto')
+
+    assert respuesta.status_code == 302
+    rehecho = hash_guardado(base_app)
+    assert rehecho.startswith('scrypt$')
+
+    # El siguiente inicio verifica con scrypt y no vuelve a escribir
+    respuesta = iniciar_sesion(app, 'secreto')
+    assert respuesta.status_code == 302
+    assert hash_guardado(base_app) == rehecho
+
+
+def test_login_incorrecto_no_toca_el_hash(app, base_app, usuario_legado):
+    respuesta = iniciar_sesion(app, 'equivocada')
+
+    assert respuesta.status_code == 200
+    assert 'Email o contraseña incorrectos.' in respuesta.get_data(as_text=True)
+    assert hash_guardado(base_app) == hash_legado('secreto')
@@ -0,0 +1,133 @@
+import io
+
+from database.importacion import COLUMNAS_CSV, exportar_csv, importar_csv
+
+ENCABEZADO = ','.join(COLUMNAS_CSV)
+
+
+def csv_de(*filas):
+    """Arma un CSV con el encabezado completo; cada fila es un dict con las columnas a llenar."""
+    lineas = [ENCABEZADO]
+    for fila in filas:
+        lineas.append(','.join(str(fila.get(c, '')) for c in COLUMNAS_CSV))
+    return io.StringIO('\n'.join(lineas) + '\n')
+
+
+def fila(codigo, **valores):
+    base = {'codigo_producto': codigo, 'nombre_producto': f'Perno {codigo}', 'material': 'acero',
+            'medida': 'M6x20', 'precio_compra': '0.50', 'precio_venta': '1.00'}
+    base.update(valores)
+    return base
+
+
+def producto(conn, codigo):
+    return conn.execute("SELECT * FROM productos WHERE codigo_producto = ?", (codigo,)).fetchone()
+
+
+def test_inserta_y_actualiza_por_codigo(conn):
+    resultado = importar_csv(conn, csv_de(fila('imp-1', stock_actual=7, descripcion='Zincado'), fila('IMP-2')))
+    assert resultado == {'procesadas': 2, 'importadas': 2, 'con_error': 0, 'errores': []}
+    # El código se normaliza a mayúsculas y los opcionales ausentes toman el valor por defecto
+    assert producto(conn, 'IMP-1')['stock_actual'] == 7
+    assert producto(conn, 'IMP-2')['stock_actual'] == 0
+    assert producto(conn, 'IMP-2')['unidad_medida'] == 'unidad'
+
+    id_original = producto(conn, 'IMP-1')['id_producto']
+    resultado = importar_csv(conn, csv_de(fila('IMP-1', nombre_producto='Perno renombrado', precio_venta='2.5')))
+    assert resultado['importadas'] == 1
+    actualizado = producto(conn, 'IMP-1')
+    assert actualizado['id_producto'] == id_original
+    assert actualizado['nombre_producto'] == 'Perno renombrado'
+    assert actualizado['precio_venta'] == 2.5
+    # Un opcional vacío en el CSV conserva lo que ya había
+    assert actualizado['stock_actual'] == 7
+    assert actualizado['descripcion'] == 'Zincado'
+
+
+def test_errores_de_validacion_con_numero_de_fila(conn):
+    resultado = importar_csv(conn, csv_de(
+        fila('VAL-1'),
+        fila('VAL-2', precio_venta='-3'),
+        fila('VAL-3', nombre_producto=''),
+        fila('VAL-4', stock_actual='muchos'),
+        fila('VAL-5', id_proveedor=999999),
+    ))
+    assert resultado['procesadas'] == 5
+    assert resultado['importadas'] == 1
+    assert resultado['con_error'] == 4
+    # La fila 1 es el encabezado: la primera fila de datos es la 2
+    assert [numero for numero, _ in resultado['errores']] == [3, 4, 5, 6]
+    assert 'precio_venta' in resultado['errores'][0][1]
+    assert 'nombre_producto' in resultado['errores'][1][1]
+    assert 'id_proveedor' in resultado['errores'][3][1]
+    assert producto(conn, 'VAL-1') is not None
+    assert producto(conn, 'VAL-2') is None
+
+
+def test_encabezado_incompleto(conn):
+    resultado = importar_csv(conn, io.StringIO('codigo_producto,nombre_producto\nX-1,Perno\n'))
+    assert resultado['procesadas'] == 0
+    assert resultado['errores'][0][0] == 1
+    assert 'precio_venta' in resultado['errores'][0][1]
+
+
+def test_lote_fallido_se_reintenta_fila_por_fila(conn):
+    # stock_actual fuera de rango para SQLite: pasa la validación pero falla al escribir el lote
+    filas = [fila(f'LOT-{i}') for i in range(5)]
+    filas[2]['stock_actual'] = '99999999999999999999'
+    resultado = importar_csv(conn, csv_de(*filas), tamano_lote=10)
+
+    assert resultado['importadas'] == 4
+    assert resultado['con_error'] == 1
+    assert resultado['errores'][0][0] == 4
+    codigos = {row[0] for row in conn.execute(
+        "SELECT codigo_producto FROM productos WHERE codigo_producto LIKE 'LOT-%'")}
+    assert codigos == {'LOT-0', 'LOT-1', 'LOT-3', 'LOT-4'}
+    assert not conn.in_transaction
+
+
+def test_varios_lotes(conn):
+    resultado = importar_csv(conn, csv_de(*[fila(f'MUL-{i}') for i in range(25)]), tamano_lote=10)
+    assert resultado['importadas'] == 25
+    total = conn.execute("SELECT COUNT(*) FROM productos WHERE codigo_producto LIKE 'MUL-%'").fetchone()[0]
+    assert total == 25
+
+
+def test_exportar_e_importar_de_vuelta(conn, nuevo_producto):
+    nuevo_producto(conn, 'EXP-1', 'Tuerca, hexagonal "fina"', descripcion='Con coma, y comillas')
+    texto = ''.join(exportar_csv(conn))
+    assert texto.startswith(ENCABEZADO)
+
+    resultado = importar_csv(conn, io.StringIO(texto))
+    assert resultado['con_error'] == 0
+    assert resultado['importadas'] == resultado['procesadas']
+    assert producto(conn, 'EXP-1')['nombre_producto'] == 'Tuerca, hexagonal "fina"'
+
+
+def subir(cliente, contenido):
+    return cliente.post('/productos/importar', data={'archivo': (io.BytesIO(contenido), 'productos.csv')},
+                        content_type='multipart/form-data')
+
+
+def test_ruta_importar_con_bom_de_excel(cliente_admin, base_app):
+    # Werkzeug guarda la subida en un SpooledTemporaryFile; Excel antepone el BOM
+    texto = csv_de(fila('WEB-1', nombre_producto='Tornillo ñandú', stock_actual=4), fila('WEB-2')).getvalue()
+    respuesta = subir(cliente_admin, texto.replace('\n', '\r\n').encode('utf-8-sig'))
+    assert respuesta.status_code == 200
+    assert 'Importación terminada: 2 productos importados, 0 filas con error.' in respuesta.get_data(as_text=True)
+    assert producto(base_app, 'WEB-1')['nombre_producto'] == 'Tornillo ñandú'
+    assert producto(base_app, 'WEB-1')['stock_actual'] == 4
+
+
+def test_ruta_importar_archivo_no_utf8(cliente_admin, base_app):
+    texto = csv_de(fila('WEB-LATIN', nombre_producto='Tornillo ñandú')).getvalue()
+    respuesta = subir(cliente_admin, texto.encode('latin-1'))
+    assert respuesta.status_code == 200
+    assert 'Error al importar el archivo' in respuesta.get_data(as_text=True)
+    assert producto(base_app, 'WEB-LATIN') is None
+
+
+def test_ruta_importar_solo_admin(cliente, base_app):
+    respuesta = subir(cliente, csv_de(fila('WEB-VEND')).getvalue().encode())
+    assert respuesta.status_code in (302, 403)
+    assert producto(base_app, 'WEB-VEND') is None
@@ -0,0 +1,21 @@
+import sqlite3
+
+import metricas
+
+
+def test_error_de_busqueda_se_registra_y_se_cuenta(app, cliente, monkeypatch, caplog):
+    import app as modulo_app
+
+    def busqueda_con_error(db, query):
+        raise sqlite3.OperationalError('database is locked')
+
+    monkeypatch.setattr(modulo_app, 'respuesta_busqueda', busqueda_con_error)
+    errores_antes = metricas.registro.errores.get('buscar_productos_api', 0)
+
+    respuesta = cliente.get('/api/buscar_productos?q=perno')
+
+    assert respuesta.status_code == 500
+    assert metricas.registro.errores['buscar_productos_api'] == errores_antes + 1
+    # El contador no dice qué falló: el log conserva el mensaje y el traceback
+    registro = [r for r in caplog.records if 'búsqueda' in r.getMessage()]
+    assert registro and registro[0].exc_info[1].args == ('database is locked',)
@@ -0,0 +1,90 @@
+import importlib
+
+import pytest
+
+from database.migraciones import listar_migraciones, migrar, version_actual, version_objetivo
+
+
+def esquema(conn):
+    """Objetos del esquema (sin tablas internas de SQLite), comparables entre bases."""
+    return sorted(
+        (tipo, nombre, ' '.join((sql or '').split()))
+        for tipo, nombre, sql in conn.execute(
+            "SELECT type, name, sql FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'")
+    )
+
+
+def aplicar_hasta(conn, hasta):
+    """Lleva una base vacía a la versión `hasta` como lo habría hecho un despliegue anterior."""
+    for version, nombre in listar_migraciones():
+        if version > hasta:
+            break
+        importlib.import_module(f'database.migraciones.{nombre}').aplicar(conn)
+        conn.execute(f"PRAGMA user_version = {version:d}")
+        conn.commit()
+
+
+def test_numeracion_continua():
+    versiones = [version for version, _ in listar_migraciones()]
+    assert versiones == list(range(1, version_objetivo() + 1))
+
+
+def test_desde_cero_aplica_todas_en_orden(nueva_base):
+    conn = nueva_base()
+    assert version_actual(conn) == 0
+    assert migrar(conn) == list(range(1, version_objetivo() + 1))
+    assert version_actual(conn) == version_objetivo()
+    # Una base al día no vuelve a aplicar nada
+    assert migrar(conn) == []
+    emails = {row[0] for row in conn.execute("SELECT email FROM usuario")}
+    assert {'admin@pernotodo.com', 'vendedor@pernotodo.com'} <= emails
+
+
+@pytest.mark.parametrize('desde', [1, 3, 8])
+def test_desde_version_intermedia(nueva_base, conn, desde):
+    # conn: base migrada de una vez desde cero, para comparar
+    intermedia = nueva_base()
+    aplicar_hasta(intermedia, desde)
+    assert migrar(intermedia) == list(range(desde + 1, version_objetivo() + 1))
+    assert version_actual(intermedia) == version_objetivo()
+    assert esquema(intermedia) == esquema(conn)
+
+
+def test_base_antigua_sin_columnas_de_usuario(nueva_base):
+    # Bases de antes del sistema de migraciones: user_version = 0 y usuario con menos columnas
+    conn = nueva_base()
+    conn.execute("""
+        CREATE TABLE usuario (
+            id_usuario INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL
+        )
+    """)
+    conn.execute("INSERT INTO usuario (email, password) VALUES ('viejo@pernotodo.com', 'x')")
+    conn.commit()
+
+    migrar(conn)
+    columnas = {row[1] for row in conn.execute("PRAGMA table_info(usuario)")}
+    assert {'password_hash', 'nombre', 'role'} <= columnas
+    viejo = conn.execute("SELECT nombre, role FROM usuario WHERE email = 'viejo@pernotodo.com'").fetchone()
+    assert tuple(viejo) == ('Usuario', 'Vendedor')
+
+
+def test_migracion_fallida_no_avanza_la_version(nueva_base, monkeypatch):
+    conn = nueva_base()
+    aplicar_hasta(conn, 1)
+    _, nombre = listar_migraciones()[1]
+    modulo = importlib.import_module(f'database.migraciones.{nombre}')
+
+    def aplicar_con_error(conexion):
+        conexion.execute("CREATE TABLE a_medias (id INTEGER)")
+        raise RuntimeError('falla a propósito')
+
+    monkeypatch.setattr(modulo, 'aplicar', aplicar_con_error)
+    with pytest.raises(RuntimeError):
+        migrar(conn)
+    assert version_actual(conn) == 1
+    assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'a_medias'").fetchone() is None
+
+    monkeypatch.undo()
+    assert migrar(conn) == list(range(2, version_objetivo() + 1))
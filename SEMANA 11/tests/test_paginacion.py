@@ -0,0 +1,91 @@
+import pytest
+
+from database.paginacion import codificar_cursor, decodificar_cursor, pagina_keyset
+
+SELECT = "SELECT p.id_producto, p.nombre_producto FROM productos p"
+ORDEN = ('p.nombre_producto', 'p.id_producto')
+
+
+@pytest.fixture
+def catalogo(conn, nuevo_producto):
+    # Nombres repetidos: el id desempata y ninguna fila se pierde ni se repite entre páginas
+    for i in range(23):
+        nuevo_producto(conn, f'P-{i:03d}', f'Producto {i % 7}')
+    return [row[0] for row in conn.execute(f"{SELECT} ORDER BY p.nombre_producto, p.id_producto")]
+
+
+def ids(filas):
+    return [fila['id_producto'] for fila in filas]
+
+
+def paginas_hacia_adelante(conn, por_pagina, **opciones):
+    paginas, despues = [], None
+    while True:
+        filas, siguiente, _ = pagina_keyset(conn, SELECT, '', [], ORDEN, por_pagina, despues=despues, **opciones)
+        paginas.append(ids(filas))
+        if siguiente is None:
+            return paginas
+        despues = siguiente
+
+
+def test_recorrido_completo_sin_huecos_ni_repetidos(conn, catalogo):
+    paginas = paginas_hacia_adelante(conn, 5)
+    assert [len(p) for p in paginas] == [5, 5, 5, 5, 3]
+    assert sum(paginas, []) == catalogo
+
+
+def test_antes_devuelve_la_pagina_anterior(conn, catalogo):
+    paginas = paginas_hacia_adelante(conn, 5)
+    despues = None
+    cursores = []
+    for _ in range(3):
+        filas, siguiente, anterior = pagina_keyset(conn, SELECT, '', [], ORDEN, 5, despues=despues)
+        cursores.append(anterior)
+        despues = siguiente
+
+    # Desde la tercera página, 'antes' vuelve a la segunda y luego a la primera
+    filas, siguiente, anterior = pagina_keyset(conn, SELECT, '', [], ORDEN, 5, antes=cursores[2])
+    assert ids(filas) == paginas[1]
+    filas, siguiente_2, anterior = pagina_keyset(conn, SELECT, '', [], ORDEN, 5, antes=anterior)
+    assert ids(filas) == paginas[0]
+    assert anterior is None
+    # Y el cursor 'siguiente' de una página alcanzada hacia atrás avanza otra vez
+    filas, _, _ = pagina_keyset(conn, SELECT, '', [], ORDEN, 5, despues=siguiente_2)
+    assert ids(filas) == paginas[1]
+
+
+def test_primera_pagina_no_tiene_anterior(conn, catalogo):
+    filas, siguiente, anterior = pagina_keyset(conn, SELECT, '', [], ORDEN, 5)
+    assert ids(filas) == catalogo[:5]
+    assert anterior is None and siguiente is not None
+
+
+def test_descendente(conn, catalogo):
+    paginas = paginas_hacia_adelante(conn, 4, descendente=True)
+    assert sum(paginas, []) == catalogo[::-1]
+
+    filas, siguiente, _ = pagina_keyset(conn, SELECT, '', [], ORDEN, 4, descendente=True)
+    filas, _, anterior = pagina_keyset(conn, SELECT, '', [], ORDEN, 4, despues=siguiente, descendente=True)
+    filas, _, _ = pagina_keyset(conn, SELECT, '', [], ORDEN, 4, antes=anterior, descendente=True)
+    assert ids(filas) == catalogo[::-1][:4]
+
+
+def test_con_filtro(conn, catalogo):
+    where, params = "p.nombre_producto = ?", ['Producto 3']
+    esperado = [row[0] for row in conn.execute(
+        f"{SELECT} WHERE {where} ORDER BY p.id_producto", params)]
+    filas, siguiente, _ = pagina_keyset(conn, SELECT, where, params, ORDEN, 2)
+    resto, fin, _ = pagina_keyset(conn, SELECT, where, params, ORDEN, 2, despues=siguiente)
+    assert ids(filas) + ids(resto) == esperado and fin is None
+
+
+def test_cursor_ida_y_vuelta():
+    cursor = codificar_cursor(['Perno ñ "M6"', 42])
+    assert decodificar_cursor(cursor, ORDEN) == ('Perno ñ "M6"', 42)
+
+
+@pytest.mark.parametrize('cursor', ['', None, 'no-es-base64!', codificar_cursor([1, 2, 3]), codificar_cursor('x')])
+def test_cursor_invalido_vuelve_al_inicio(conn, catalogo, cursor):
+    assert decodificar_cursor(cursor, ORDEN) is None
+    filas, _, anterior = pagina_keyset(conn, SELECT, '', [], ORDEN, 5, despues=cursor)
+    assert ids(filas) == catalogo[:5] and anterior is None
@@ -0,0 +1,83 @@
+"""Regresión de planes con pytest: benchmarks.planes sobre una base sintética pequeña.
+
+El recorrido corre en un proceso aparte: la app y el observador de SQL
+tienen que importarse con PERNOTODO_DB apuntando a la base sembrada, no a
+la base temporal del resto de los tests.
+"""
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+PROYECTO = Path(__file__).resolve().parent.parent
+
+# Suficiente para superar FILAS_TABLA_GRANDE en productos, clientes, ventas y detalle
+TAMANOS = ('--productos', '3000', '--ventas', '4000', '--clientes', '1500', '--dias', '60')
+
+# Comparación de tuplas del cursor keyset: (a, b) > (?, ?)
+_KEYSET = re.compile(r'\(\s*[\w.]+\s*,\s*[\w.]+\s*\)\s*[<>]\s*\(\s*\?\s*,\s*\?\s*\)')
+
+
+def ejecutar(*argumentos):
+    return subprocess.run([sys.executable, '-m', *argumentos], cwd=PROYECTO,
+                          capture_output=True, text=True, timeout=300)
+
+
+@pytest.fixture(scope='module')
+def revision(tmp_path_factory):
+    """(proceso de benchmarks.planes, informe JSON con el plan de cada sentencia)."""
+    carpeta = tmp_path_factory.mktemp('planes')
+    base, salida = carpeta / 'planes.db', carpeta / 'planes.json'
+    sembrado = ejecutar('benchmarks.dataset', str(base), *TAMANOS)
+    assert sembrado.returncode == 0, sembrado.stderr
+    proceso = ejecutar('benchmarks.planes', str(base), '-o', str(salida))
+    informe = json.loads(salida.read_text(encoding='utf-8')) if salida.exists() else []
+    return proceso, informe
+
+
+def sentencias(informe, rutas=None, contiene=None):
+    return [entrada for entrada in informe
+            if (rutas is None or entrada['ruta'] in rutas)
+            and (contiene is None or re.search(contiene, entrada['sql']))]
+
+
+def test_sin_regresiones_en_rutas_calientes(revision):
+    proceso, informe = revision
+    assert proceso.returncode == 0, proceso.stdout[-3000:] + proceso.stderr[-3000:]
+    fallos = [(e['ruta'], e['problemas'], e['sql']) for e in informe if e['caliente'] and e['problemas']]
+    assert fallos == []
+
+
+def test_paginas_keyset_buscan_por_indice(revision):
+    _, informe = revision
+    keyset = [e for e in informe if _KEYSET.search(e['sql'])]
+    rutas = {e['ruta'] for e in keyset}
+    assert {'listar_productos', 'listar_proveedores', 'historial_ventas_api'} <= rutas
+    for entrada in keyset:
+        tabla_principal = entrada['plan'][0] if 'LIST SUBQUERY 1' not in entrada['plan'] else ''
+        # Una página después del cursor entra al índice por el cursor; nunca recorre la tabla
+        assert not any(re.match(r'SCAN \w+$', linea) for linea in entrada['plan']), entrada
+        if tabla_principal:
+            assert 'USING INDEX' in tabla_principal or 'PRIMARY KEY' in tabla_principal, entrada
+
+
+def test_busquedas_fts_usan_el_indice_trigram(revision):
+    _, informe = revision
+    busquedas = sentencias(informe, contiene=r'productos_fts MATCH')
+    assert {'buscar_productos_api', 'listar_productos'} <= {e['ruta'] for e in busquedas}
+    for entrada in busquedas:
+        assert any('productos_fts VIRTUAL TABLE INDEX' in linea for linea in entrada['plan']), entrada
+        assert not any(re.match(r'SCAN (p|productos)$', linea) for linea in entrada['plan']), entrada
+
+
+def test_bajo_stock_conserva_indexed_by(revision):
+    _, informe = revision
+    consultas = sentencias(informe, rutas={'bajo_stock_api'}, contiene=r'FROM productos')
+    assert consultas
+    for entrada in consultas:
+        # Sin INDEXED BY, con filtro de proveedor SQLite elige idx_productos_proveedor y ordena aparte
+        assert 'INDEXED BY idx_productos_bajo_stock' in entrada['sql'], entrada['sql']
+        assert 'USING INDEX idx_productos_bajo_stock' in entrada['plan'][0], entrada
@@ -0,0 +1,65 @@
+import threading
+
+import pytest
+
+from database.ventas_writer import EscritorVentas, VentaRechazada
+
+
+@pytest.fixture
+def escritor(ruta_base):
+    # Espera larga: las ventas enviadas a la vez caen en el mismo lote
+    return EscritorVentas(str(ruta_base), max_espera_ms=200)
+
+
+def enviar_a_la_vez(escritor, ventas):
+    resultados = [None] * len(ventas)
+
+    def enviar(i):
+        try:
+            resultados[i] = escritor.enviar(ventas[i])
+        except Exception as e:
+            resultados[i] = e
+
+    hilos = [threading.Thread(target=enviar, args=(i,)) for i in range(len(ventas))]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return resultados
+
+
+def test_ventas_concurrentes_en_un_solo_lote(escritor, conn, nuevo_producto, nueva_venta):
+    a = nuevo_producto(conn, 'A-1', precio_venta=2.5, stock_actual=10)
+    b = nuevo_producto(conn, 'B-1', precio_venta=1.0, stock_actual=10)
+
+    resultados = enviar_a_la_vez(escritor, [
+        nueva_venta((a, 1)), nueva_venta((b, 2)), nueva_venta((a, 3), (b, 1))])
+
+    assert [r['total'] for r in resultados] == [2.5, 2.0, 8.5]
+    assert len({r['id_venta'] for r in resultados}) == 3
+    assert escritor.stats['lotes'] == 1
+    assert escritor.stats['ventas'] == 3
+    assert conn.execute("SELECT stock_actual FROM productos WHERE id_producto = ?", (a,)).fetchone()[0] == 6
+    assert conn.execute("SELECT stock_actual FROM productos WHERE id_producto = ?", (b,)).fetchone()[0] == 7
+
+
+def test_venta_rechazada_no_arrastra_al_lote(escritor, conn, nuevo_producto, nueva_venta):
+    a = nuevo_producto(conn, 'A-2', stock_actual=5)
+
+    resultados = enviar_a_la_vez(escritor, [nueva_venta((a, 2)), nueva_venta((a, 50)), nueva_venta((a, 1))])
+
+    rechazadas = [r for r in resultados if isinstance(r, VentaRechazada)]
+    assert len(rechazadas) == 1
+    assert rechazadas[0].lineas[0]['motivo'] == 'stock_insuficiente'
+    assert conn.execute("SELECT COUNT(*) FROM ventas").fetchone()[0] == 2
+    assert conn.execute("SELECT stock_actual FROM productos WHERE id_producto = ?", (a,)).fetchone()[0] == 2
+    # Sólo cuentan las confirmadas: la que volvió a su savepoint está en 'fallidas'
+    assert escritor.stats['ventas'] == 2
+    assert escritor.stats['fallidas'] == 1
+
+
+def test_enviar_relanza_el_error_de_la_venta(escritor, conn, nuevo_producto, nueva_venta):
+    with pytest.raises(VentaRechazada) as error:
+        escritor.enviar(nueva_venta((123456, 1)))
+    assert error.value.lineas == [{'id': 123456, 'motivo': 'no_existe', 'solicitado': 1}]
+    assert escritor.stats['ventas'] == 0